@@ -1,27 +1,96 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
-from core.database import init_db
+from sqlmodel import Session
+
+from core.database import init_db, engine, async_engine
+from core.core_scoring_rules import seed_scoring_rules
+from core.core_partition import ensure_journey_partitions
+from core.core_outbox import start_outbox_workers, stop_outbox_workers
+from core.core_password import shutdown_password_pool
+from core.core_refresh_token import start_refresh_token_sync, stop_refresh_token_sync
+from core.core_metrics import start_request, finish_request
+from core.core_rate_limit import check_rate_limit, rate_limit_store
 from endpoints.endpoint_auth import router as auth_router
 from endpoints.endpoint_user import router as user_router
 from endpoints.endpoint_company import router as company_router
 from endpoints.endpoint_journey import router as journey_router
+from endpoints.endpoint_monitoring import router as monitoring_router
+from endpoints.endpoint_monitoring import metrics_router
+from endpoints.endpoint_scoring import router as scoring_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    with Session(engine) as session:
+        seed_scoring_rules(session)
+        # Partitions des mois a venir (sans effet si journey n'est pas partitionnee)
+        ensure_journey_partitions(session)
     print("DB initialized")
+    start_outbox_workers()
+    start_refresh_token_sync()
     yield 
     print("Shutting down...")
+    stop_outbox_workers()
+    stop_refresh_token_sync()
+    shutdown_password_pool()
+    await async_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
+
+
+# Declare avant `request_metrics` : les reponses 429 sont aussi mesurees
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    """Refuse (429) les requetes au-dela des limites de debit (core_rate_limit)."""
+    arguments = (
+        request.method,
+        request.url.path,
+        request.client.host if request.client else None,
+        request.headers.get("authorization"),
+    )
+    if rate_limit_store is not None and rate_limit_store.blocking:
+        retry_after = await run_in_threadpool(check_rate_limit, *arguments)
+    else:
+        retry_after = check_rate_limit(*arguments)
+    if retry_after is not None:
+        return JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(retry_after)},
+        )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    """Mesure latence, temps SQL et nombre de requetes SQL de chaque requete."""
+    stats = start_request()
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    response.headers["Server-Timing"] = finish_request(
+        stats,
+        request.method,
+        getattr(route, "path", None),
+        response.status_code,
+        time.perf_counter() - started,
+    )
+    return response
+
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(company_router)
 app.include_router(journey_router)
+app.include_router(scoring_router)
+app.include_router(monitoring_router)
+app.include_router(metrics_router)
 
@@ -0,0 +1,496 @@
+"""
+Benchmark des chemins critiques de l'API.
+
+Deux étapes :
+
+    # 1. Jeu de données réaliste (entreprises, utilisateurs, trajets)
+    python benchmarks/bench_api.py seed --reset --users 20000 --journeys 1000000
+
+    # 2. Mesure p50 / p99 et débit, résultats en JSON
+    python benchmarks/bench_api.py run --requests 2000 --concurrency 32
+
+La base utilisée est DATABASE_URL (SQLite `benchmarks/bench.db` par défaut,
+ou un PostgreSQL local). Par défaut, l'application est appelée en processus
+(transport ASGI, sans réseau) ; `--base-url` mesure un serveur uvicorn déjà
+démarré sur la même base.
+
+Toutes les requêtes venant de la même adresse, la limitation de débit
+(core_rate_limit) est désactivée en processus, sauf si RATE_LIMIT_ENABLED
+est défini dans l'environnement ; avec `--base-url`, lancer le serveur avec
+RATE_LIMIT_ENABLED=false.
+
+Chaque exécution écrit `benchmarks/results/api-<commit>.json`. Pour comparer
+deux commits :
+
+    python benchmarks/bench_api.py run --compare benchmarks/results/api-<ancien>.json
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Avant load_dotenv : prioritaire sur .env, pas sur l'environnement
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(ROOT, ".env"))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(ROOT, 'benchmarks', 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+
+BENCH_PASSWORD = "benchmark"
+ADMIN_USERNAME = "bench_admin"
+SEED_CHUNK_SIZE = 10000
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Répartition des modes de transport dans le jeu de données
+TRANSPORT_WEIGHTS = {
+    "marche": 0.2,
+    "velo": 0.25,
+    "transport_commun": 0.35,
+    "voiture": 0.2,
+}
+REJECTED_RATIO = 0.05
+
+SCENARIOS = (
+    "token",
+    "create_journey",
+    "list_validated",
+    "statistics",
+    "admin_users",
+    "admin_companies",
+)
+
+
+# ---------------------------------------------------------------------------
+# Jeu de données
+# ---------------------------------------------------------------------------
+
+
+def _journey_rows(user_ids: list[int], count: int, rng: random.Random):
+    """Génère `count` trajets répartis sur les 365 derniers jours."""
+    from core.core_score import DEFAULT_COMPILED_RULES, compute_journey_score
+    from models.model_detection_source import DetectionSource
+    from models.model_journey_status import JourneyStatus
+    from models.model_transport_type import TransportType
+
+    transports = [TransportType(name) for name in TRANSPORT_WEIGHTS]
+    weights = list(TRANSPORT_WEIGHTS.values())
+    now = datetime.utcnow()
+
+    for _ in range(count):
+        transport = rng.choices(transports, weights)[0]
+        distance = round(rng.lognormvariate(1.5, 0.8), 2)
+        duration = max(1, int(distance * rng.uniform(2, 12)))
+        departure = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        rejected = rng.random() < REJECTED_RATIO
+        yield {
+            "id_user": rng.choice(user_ids),
+            "status": JourneyStatus.REJECTED if rejected else JourneyStatus.VALIDATED,
+            "detection_source": DetectionSource.MANUAL,
+            "place_departure": "Bench departure",
+            "place_arrival": "Bench arrival",
+            "time_departure": departure,
+            "time_arrival": departure + timedelta(minutes=duration),
+            "distance_km": distance,
+            "duration_minutes": duration,
+            "transport_type": transport,
+            "score_journey": compute_journey_score(transport, distance, DEFAULT_COMPILED_RULES),
+            "score_version": DEFAULT_COMPILED_RULES.version,
+            "created_at": departure,
+            "validated_at": departure,
+            "rejected_at": departure if rejected else None,
+        }
+
+
+def _insert_chunks(session, table, rows) -> int:
+    """Insère des lignes par paquets (executemany), un commit par paquet."""
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= SEED_CHUNK_SIZE:
+            session.execute(table.insert(), chunk)
+            session.commit()
+            total += len(chunk)
+            chunk = []
+            print(f"  {table.name}: {total}", end="\r", flush=True)
+    if chunk:
+        session.execute(table.insert(), chunk)
+        session.commit()
+        total += len(chunk)
+    print(f"  {table.name}: {total}")
+    return total
+
+
+def seed(args: argparse.Namespace) -> None:
+    """Crée entreprises, utilisateurs et trajets puis les tables matérialisées."""
+    import api  # noqa: F401  (enregistre tous les modèles)
+    from sqlmodel import SQLModel, Session, select
+    from core.core_leaderboard import rebuild_company_leaderboards
+    from core.core_password import hash_password, shutdown_password_pool
+    from core.core_scoring_rules import seed_scoring_rules
+    from core.core_statistics import rebuild_user_statistics
+    from core.database import engine, init_db
+    from models.model_company import Company
+    from models.model_journey import Journey
+    from models.model_role import UserRole
+    from models.model_user import Users
+
+    rng = random.Random(args.seed)
+
+    if args.reset:
+        SQLModel.metadata.drop_all(engine)
+    init_db()
+
+    with Session(engine) as session:
+        if session.exec(select(Users.id).limit(1)).first() is not None:
+            sys.exit("Database is not empty, use --reset to recreate it")
+        seed_scoring_rules(session)
+
+    # Un seul hash Argon2 pour tous les comptes : le seed ne mesure pas le hash
+    password_hash = hash_password(BENCH_PASSWORD)
+    shutdown_password_pool()
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        _insert_chunks(session, Company.__table__, (
+            {
+                "company_name": f"Company {index}",
+                "domain_name": f"company{index}.bench",
+                "company_locate": "Clermont-Ferrand",
+            }
+            for index in range(args.companies)
+        ))
+        company_ids = session.exec(select(Company.id)).all()
+
+        def users():
+            for index in range(args.users):
+                # 10 % des utilisateurs sans entreprise
+                company_id = rng.choice(company_ids) if rng.random() > 0.1 else None
+                yield {
+                    "username": f"bench_user_{index}",
+                    "password": password_hash,
+                    "email": f"bench_user_{index}@company{company_id}.bench",
+                    "role": UserRole.user,
+                    "date_creation": datetime.utcnow(),
+                    "id_company": company_id,
+                }
+            yield {
+                "username": ADMIN_USERNAME,
+                "password": password_hash,
+                "email": "bench_admin@bench",
+                "role": UserRole.admin,
+                "date_creation": datetime.utcnow(),
+                "id_company": None,
+            }
+
+        _insert_chunks(session, Users.__table__, users())
+        user_ids = session.exec(
+            select(Users.id).where(Users.username != ADMIN_USERNAME)
+        ).all()
+
+        _insert_chunks(session, Journey.__table__, _journey_rows(user_ids, args.journeys, rng))
+
+        print("  rebuilding user_statistics")
+        rebuild_user_statistics(session)
+        print("  rebuilding company_leaderboard")
+        rebuild_company_leaderboards(session)
+
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+# ---------------------------------------------------------------------------
+# Mesures
+# ---------------------------------------------------------------------------
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """Percentile par rang le plus proche."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def _summary(latencies: list[float], errors: int, elapsed: float, concurrency: int) -> dict:
+    values = sorted(latency * 1000 for latency in latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / count, 3) if count else 0.0,
+        "p50_ms": round(_percentile(values, 50), 3),
+        "p90_ms": round(_percentile(values, 90), 3),
+        "p99_ms": round(_percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+async def _measure(
+    client: httpx.AsyncClient,
+    make_request: Callable[[], Request],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict:
+    """Exécute `requests` appels avec `concurrency` clients simultanés."""
+    for _ in range(warmup):
+        await make_request()(client)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            request = make_request()
+            started = time.perf_counter()
+            try:
+                response = await request(client)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summary(latencies, errors, time.perf_counter() - started, concurrency)
+
+
+def _scenarios(users: list[dict], admin_headers: dict, rng: random.Random) -> dict:
+    """Scénarios mesurés : nom -> fabrique de requête."""
+
+    def token():
+        user = rng.choice(users)
+        return lambda client: client.post(
+            "/token", data={"username": user["username"], "password": BENCH_PASSWORD}
+        )
+
+    def create_journey():
+        user = rng.choice(users)
+        departure = datetime.utcnow() - timedelta(minutes=rng.randrange(60 * 24 * 30))
+        distance = round(rng.uniform(0.5, 30), 2)
+        body = {
+            "place_departure": "Bench departure",
+            "place_arrival": "Bench arrival",
+            "time_departure": departure.isoformat(),
+            "time_arrival": (departure + timedelta(minutes=30)).isoformat(),
+            "distance_km": distance,
+            "transport_type": rng.choice(list(TRANSPORT_WEIGHTS)),
+        }
+        return lambda client: client.post("/journey/", json=body, headers=user["headers"])
+
+    def list_validated():
+        user = rng.choice(users)
+        return lambda client: client.get(
+            "/journey/validated", params={"limit": 50}, headers=user["headers"]
+        )
+
+    def statistics():
+        user = rng.choice(users)
+        return lambda client: client.get("/journey/statistics/me", headers=user["headers"])
+
+    def admin_users():
+        return lambda client: client.get("/users", headers=admin_headers)
+
+    def admin_companies():
+        return lambda client: client.get("/company/", headers=admin_headers)
+
+    return {
+        "token": token,
+        "create_journey": create_journey,
+        "list_validated": list_validated,
+        "statistics": statistics,
+        "admin_users": admin_users,
+        "admin_companies": admin_companies,
+    }
+
+
+def _load_users(sample_size: int, rng: random.Random) -> tuple[list[dict], dict]:
+    """Choisit les utilisateurs simulés et leur fabrique un access token."""
+    from sqlmodel import Session, select
+    from core.core_auth import create_access_token, token_claims
+    from core.database import engine
+    from models.model_user import Users
+
+    with Session(engine) as session:
+        ids = session.exec(
+            select(Users.id).where(Users.username != ADMIN_USERNAME)
+        ).all()
+        if not ids:
+            sys.exit("Database is empty, run the seed command first")
+        sample = rng.sample(ids, min(sample_size, len(ids)))
+        users = session.exec(select(Users).where(Users.id.in_(sample))).all()
+        admin = session.exec(select(Users).where(Users.username == ADMIN_USERNAME)).one()
+
+        def headers(user):
+            return {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+
+        simulated = [{"username": user.username, "headers": headers(user)} for user in users]
+        return simulated, headers(admin)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: dict, baseline: Optional[dict]) -> None:
+    header = f"{'scenario':<18}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    if baseline:
+        header += f"{'p50 Δ':>10}{'p99 Δ':>10}{'rps Δ':>10}"
+    print(header)
+
+    for name, result in results.items():
+        line = (
+            f"{name:<18}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['errors']:>8}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            for key in ("p50_ms", "p99_ms", "throughput_rps"):
+                ratio = result[key] / previous[key] - 1 if previous[key] else 0.0
+                line += f"{ratio:>+10.1%}"
+        print(line)
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    users, admin_headers = _load_users(args.sample_users, rng)
+    scenarios = _scenarios(users, admin_headers, rng)
+    selected = args.scenarios or SCENARIOS
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        close_app = None
+    else:
+        import api
+        from core.core_password import shutdown_password_pool
+        from core.database import async_engine, init_db
+
+        init_db()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=api.app), base_url="http://bench", timeout=60
+        )
+
+        async def close_app():
+            shutdown_password_pool()
+            await async_engine.dispose()
+
+    results = {}
+    try:
+        for name in selected:
+            print(f"  {name}...", flush=True)
+            requests = args.token_requests if name == "token" else args.requests
+            results[name] = await _measure(
+                client, scenarios[name], requests, args.concurrency, args.warmup
+            )
+    finally:
+        await client.aclose()
+        if close_app:
+            await close_app()
+    return results
+
+
+def run(args: argparse.Namespace) -> None:
+    """Mesure chaque scénario et écrit les résultats en JSON."""
+    from core.database import engine
+
+    results = asyncio.run(_run(args))
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "date": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.url.get_backend_name(),
+        "target": args.base_url or "asgi",
+        "python": platform.python_version(),
+        "settings": {
+            "requests": args.requests,
+            "token_requests": args.token_requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "sample_users": args.sample_users,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"api-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)["results"]
+    _print_results(results, baseline)
+    print(f"Results written to {output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de l'API Green Mobility Pass")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Crée le jeu de données")
+    seed_parser.add_argument("--reset", action="store_true", help="Supprime et recrée les tables")
+    seed_parser.add_argument("--companies", type=int, default=50)
+    seed_parser.add_argument("--users", type=int, default=20000)
+    seed_parser.add_argument("--journeys", type=int, default=1000000)
+    seed_parser.set_defaults(handler=seed)
+
+    run_parser = commands.add_parser("run", help="Mesure les endpoints")
+    run_parser.add_argument("--scenarios", nargs="+", default=None, choices=SCENARIOS,
+                            help="Scénarios à mesurer (tous par défaut)")
+    run_parser.add_argument("--requests", type=int, default=1000,
+                            help="Requêtes mesurées par scénario")
+    run_parser.add_argument("--token-requests", type=int, default=200,
+                            help="Requêtes mesurées pour /token (Argon2)")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--sample-users", type=int, default=1000,
+                            help="Nombre d'utilisateurs simulés")
+    run_parser.add_argument("--base-url", default=None,
+                            help="Serveur à mesurer (en processus par défaut)")
+    run_parser.add_argument("--output", default=None, help="Fichier JSON de résultats")
+    run_parser.add_argument("--compare", default=None,
+                            help="Résultats précédents à comparer")
+    run_parser.set_defaults(handler=run)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
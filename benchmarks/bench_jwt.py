@@ -0,0 +1,78 @@
+"""
+Microbenchmark des tokens JWT : emission et verification.
+
+Pour chaque backend disponible (core_jwt, JWT_BACKEND) :
+
+- `issue` : `create_access_token` (claims de l'utilisateur)
+- `verify` : `decode_token` sur des tokens tous differents (verification
+  de signature a chaque appel)
+- `verify_cached` : `decode_token` sur un token deja verifie (cache)
+
+    python benchmarks/bench_jwt.py --iterations 20000
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+
+import argparse
+import time
+from typing import Callable
+
+from core import core_auth
+from core.core_jwt import get_jwt_backend, jwt_backend_names
+
+
+def _per_second(function: Callable[[int], object], iterations: int) -> dict:
+    started = time.perf_counter()
+    for index in range(iterations):
+        function(index)
+    elapsed = time.perf_counter() - started
+    return {
+        "us_per_op": round(elapsed / iterations * 1e6, 2),
+        "ops_per_s": round(iterations / elapsed),
+    }
+
+
+def _claims(index: int) -> dict:
+    return {"sub": f"bench_user_{index}", "uid": index, "role": "user", "cid": None}
+
+
+def bench_backend(iterations: int) -> dict:
+    """Mesure emission et verification avec le backend courant de core_auth."""
+    results = {"issue": _per_second(lambda i: core_auth.create_access_token(_claims(i)), iterations)}
+
+    tokens = [core_auth.create_access_token(_claims(i)) for i in range(iterations)]
+    core_auth._token_cache.clear()
+    results["verify"] = _per_second(lambda i: core_auth.decode_token(tokens[i]), iterations)
+
+    token = tokens[0]
+    core_auth.decode_token(token)
+    results["verify_cached"] = _per_second(lambda i: core_auth.decode_token(token), iterations)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmark des tokens JWT")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--backends", nargs="+", default=jwt_backend_names())
+    args = parser.parse_args()
+
+    print(f"{'backend':<10}{'operation':<16}{'us/op':>10}{'ops/s':>12}")
+    for name in args.backends:
+        try:
+            core_auth._jwt_backend = get_jwt_backend(name)
+        except RuntimeError as e:
+            print(f"{name:<10}skipped: {e}")
+            continue
+        for operation, result in bench_backend(args.iterations).items():
+            print(f"{name:<10}{operation:<16}{result['us_per_op']:>10}{result['ops_per_s']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark de la sérialisation des listes (trajets, utilisateurs).
+
+Compare, pour des réponses de 1 000 et 10 000 lignes :
+
+- `baseline` : chemin FastAPI par défaut (objets ORM, validation par
+  `response_model`, `jsonable_encoder` puis `json.dumps`)
+- `fast` : chemin de core_serialization (tuples de colonnes, dicts, orjson)
+
+Les deux routes sont servies par une application FastAPI minimale, en
+processus, sur une base SQLite en mémoire : seuls la lecture et l'encodage
+diffèrent. Les deux réponses sont comparées avant la mesure.
+
+    python benchmarks/bench_serialization.py --rows 1000 10000 --repeat 20
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from core.core_serialization import read_columns, rows_to_dicts
+from models.model_company import Company
+from models.model_detection_source import DetectionSource
+from models.model_journey import Journey, JourneyRead
+from models.model_journey_status import JourneyStatus
+from models.model_role import UserRole
+from models.model_transport_type import TransportType
+from models.model_user import UserRead, Users
+
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DATASETS = ("journeys", "users")
+
+JOURNEY_COLUMNS = read_columns(Journey, JourneyRead)
+USER_COLUMNS = read_columns(Users, UserRead)
+
+
+def _seed(engine, rows: int) -> None:
+    """Crée `rows` utilisateurs et `rows` trajets."""
+    SQLModel.metadata.create_all(
+        engine, tables=[Company.__table__, Users.__table__, Journey.__table__]
+    )
+    now = datetime.utcnow()
+    transports = list(TransportType)
+    with Session(engine) as session:
+        session.execute(Users.__table__.insert(), [
+            {
+                "username": f"bench_user_{index}",
+                "password": "not-a-hash",
+                "email": f"bench_user_{index}@bench",
+                "role": UserRole.user,
+                "date_creation": now,
+                "id_company": None,
+            }
+            for index in range(rows)
+        ])
+        session.execute(Journey.__table__.insert(), [
+            {
+                "id_user": 1,
+                "status": JourneyStatus.VALIDATED,
+                "detection_source": DetectionSource.MANUAL,
+                "place_departure": "Bench departure",
+                "place_arrival": "Bench arrival",
+                "time_departure": now - timedelta(minutes=index),
+                "time_arrival": now - timedelta(minutes=index) + timedelta(minutes=30),
+                "distance_km": 1.5 + index % 40,
+                "duration_minutes": 30,
+                "transport_type": transports[index % len(transports)],
+                "score_journey": 100 + index % 50,
+                "score_version": 1,
+                "created_at": now,
+                "validated_at": now,
+                "rejected_at": None,
+            }
+            for index in range(rows)
+        ])
+        session.commit()
+
+
+def _app(engine) -> FastAPI:
+    """Routes `baseline` et `fast` pour chaque jeu de données."""
+    app = FastAPI()
+
+    def get_session():
+        with Session(engine) as session:
+            yield session
+
+    @app.get("/baseline/journeys", response_model=list[JourneyRead])
+    def baseline_journeys(limit: int, session: Session = Depends(get_session)):
+        return session.exec(select(Journey).order_by(Journey.id).limit(limit)).all()
+
+    @app.get("/fast/journeys", response_model=list[JourneyRead])
+    def fast_journeys(limit: int, session: Session = Depends(get_session)):
+        statement = select(*JOURNEY_COLUMNS).order_by(Journey.id).limit(limit)
+        return ORJSONResponse(rows_to_dicts(session.exec(statement), JourneyRead))
+
+    @app.get("/baseline/users", response_model=list[UserRead])
+    def baseline_users(limit: int, session: Session = Depends(get_session)):
+        return session.exec(select(Users).order_by(Users.id).limit(limit)).all()
+
+    @app.get("/fast/users", response_model=list[UserRead])
+    def fast_users(limit: int, session: Session = Depends(get_session)):
+        statement = select(*USER_COLUMNS).order_by(Users.id).limit(limit)
+        return ORJSONResponse(rows_to_dicts(session.exec(statement), UserRead))
+
+    return app
+
+
+def _measure(client: TestClient, path: str, rows: int, repeat: int, warmup: int) -> dict:
+    """Durées (ms) de `repeat` appels, après `warmup` appels non mesurés."""
+    for _ in range(warmup):
+        client.get(path, params={"limit": rows})
+
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, params={"limit": rows})
+        durations.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+
+    return {
+        "median_ms": round(statistics.median(durations), 3),
+        "min_ms": round(min(durations), 3),
+        "bytes": len(response.content),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> None:
+    """Mesure les deux chemins pour chaque taille et écrit les résultats en JSON."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    _seed(engine, max(args.rows))
+    client = TestClient(_app(engine))
+
+    results = {}
+    print(f"{'dataset':<10}{'rows':>8}{'baseline ms':>14}{'fast ms':>10}{'speedup':>10}")
+    for dataset in DATASETS:
+        for rows in args.rows:
+            baseline_path, fast_path = f"/baseline/{dataset}", f"/fast/{dataset}"
+            expected = client.get(baseline_path, params={"limit": rows}).json()
+            if client.get(fast_path, params={"limit": rows}).json() != expected:
+                sys.exit(f"{dataset}: fast response differs from baseline")
+
+            baseline = _measure(client, baseline_path, rows, args.repeat, args.warmup)
+            fast = _measure(client, fast_path, rows, args.repeat, args.warmup)
+            speedup = round(baseline["median_ms"] / fast["median_ms"], 2)
+            results[f"{dataset}_{rows}"] = {"baseline": baseline, "fast": fast, "speedup": speedup}
+            print(
+                f"{dataset:<10}{rows:>8}{baseline['median_ms']:>14}"
+                f"{fast['median_ms']:>10}{speedup:>9}x"
+            )
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "date": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {"rows": args.rows, "repeat": args.repeat, "warmup": args.warmup},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"serialization-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de la sérialisation des listes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000],
+                        help="Tailles de réponse mesurées")
+    parser.add_argument("--repeat", type=int, default=20, help="Appels mesurés par cas")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Fichier JSON de résultats")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,24 @@
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-
-from core.database import get_session
+from sqlalchemy.orm import make_transient_to_detached
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.database import get_async_session
+from core.core_cache import TTLCache
+from core.core_jwt import InvalidTokenError, get_jwt_backend
+from core.core_password import verify_password, verify_password_async
+from core.core_refresh_token import (
+    is_family_revoked,
+    open_token_family,
+    revoke_token_family,
+    rotate_token_family,
+)
 from models.model_user import Users
 from models.model_role import UserRole
 
@@ -19,13 +31,29 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Bibliotheque JWT (voir core_jwt) : jose (defaut) ou pyjwt
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose")
+_jwt_backend = get_jwt_backend(JWT_BACKEND)
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
+# Cache des access tokens deja verifies (par processus), indexe par empreinte
+# SHA-256 du token ; une entree expire avec le token (claim `exp`)
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+_token_cache = TTLCache(TOKEN_CACHE_MAX_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Cache des utilisateurs authentifies (par processus), indexe par uid
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 10000))
 
+# Si active, l'utilisateur est construit a partir des claims signes du token
+# (uid, sub, email, role, cid, created) sans aucune requete : l'email figure
+# alors dans les tokens. Un changement de role n'est pris en compte qu'a
+# l'expiration de l'access token.
+TRUST_TOKEN_CLAIMS = os.getenv("TRUST_TOKEN_CLAIMS", "false").lower() == "true"
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+_PRINCIPAL_FIELDS = ("id", "username", "email", "role", "date_creation", "id_company")
+_principal_cache = TTLCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
 
 def authenticate_user(db: Session, username: str, password: str):
@@ -41,12 +69,29 @@ def authenticate_user(db: Session, username: str, password: str):
     return result
 
 
+async def authenticate_user_async(db: AsyncSession, username: str, password: str):
+    """Version asynchrone de `authenticate_user` (requete et Argon2 non bloquants)."""
+    statement = select(Users).where(Users.username == username)
+    result = (await db.exec(statement)).first()
+    # Libere la connexion pendant la verification Argon2 (et son attente du
+    # pool) ; les attributs restent charges (expire_on_commit=False)
+    await db.commit()
+
+    if not result:
+        return None
+
+    if not await verify_password_async(password, result.password):
+        return None
+
+    return result
+
+
 def _create_token(data: dict, expires_delta: timedelta, token_type: str):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode.update({"exp": expire, "type": token_type})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _jwt_backend.encode(to_encode, SECRET_KEY, ALGORITHM)
     return encoded_jwt
 
 
@@ -67,16 +112,34 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None):
 
 
 def decode_token(token: str, expected_type: str = "access") -> dict:
+    """
+    Verifie un token et retourne ses claims.
+
+    Un access token deja verifie est servi depuis le cache jusqu'a son
+    expiration, sans nouvelle verification de signature. Les refresh tokens
+    sont toujours verifies.
+
+    Raises:
+        HTTPException: 401 si le token est invalide, expire ou d'un autre type
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except JWTError:
-        raise credentials_exception
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(digest)
+    if payload is None:
+        try:
+            payload = _jwt_backend.decode(token, SECRET_KEY, ALGORITHM)
+        except InvalidTokenError:
+            raise credentials_exception
+
+        if payload.get("type") == "access" and payload.get("sub") is not None:
+            remaining = payload.get("exp", 0) - time.time()
+            if remaining > 0:
+                _token_cache.set(digest, payload, ttl=min(remaining, _token_cache.ttl))
 
     token_type = payload.get("type")
     if token_type != expected_type:
@@ -89,16 +152,174 @@ def decode_token(token: str, expected_type: str = "access") -> dict:
     return payload
 
 
+def token_claims(user: Users) -> dict:
+    """
+    Claims identifiant l'utilisateur dans les access et refresh tokens.
+
+    L'email et la date de creation (donnees personnelles) ne sont signes
+    dans le token que si TRUST_TOKEN_CLAIMS est active.
+    """
+    claims = {
+        "sub": user.username,
+        "uid": user.id,
+        "role": user.role.value if isinstance(user.role, UserRole) else user.role,
+        "cid": user.id_company,
+    }
+    if TRUST_TOKEN_CLAIMS:
+        claims.update(email=user.email, created=user.date_creation.isoformat())
+    return claims
+
+
+def _token_pair(user: Users, family_id: str, generation: int) -> dict:
+    claims = {**token_claims(user), "fid": family_id}
+    return {
+        "access_token": create_access_token(
+            claims, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ),
+        "refresh_token": create_refresh_token({**claims, "gen": generation}),
+    }
+
+
+def issue_token_pair(session: Session, user: Users) -> dict:
+    """
+    Ouvre une session (famille de refresh tokens, voir core_refresh_token)
+    et emet ses premiers tokens.
+
+    Returns:
+        dict: access_token et refresh_token
+    """
+    expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    family_id = open_token_family(session, user.id, expires_at)
+    session.commit()
+    return _token_pair(user, family_id, 0)
+
+
+def refresh_token_pair(session: Session, refresh_token: str) -> tuple[Users, dict]:
+    """
+    Echange un refresh token contre une nouvelle paire de tokens (rotation).
+
+    Le refresh token presente ne peut plus etre utilise ; le reutiliser
+    revoque la session entiere.
+
+    Returns:
+        tuple[Users, dict]: Utilisateur et nouvelle paire de tokens
+
+    Raises:
+        HTTPException: 401 si le token est invalide, revoque, deja utilise
+        ou si l'utilisateur n'existe plus
+    """
+    payload = decode_token(refresh_token, expected_type="refresh")
+    family_id, generation = payload.get("fid"), payload.get("gen")
+    # Tokens emis avant les familles : une nouvelle connexion est necessaire
+    if not isinstance(family_id, str) or not isinstance(generation, int):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+
+    expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    user_id = rotate_token_family(session, family_id, generation, expires_at)
+    user = session.get(Users, user_id) if user_id is not None else None
+    session.commit()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    return user, _token_pair(user, family_id, generation + 1)
+
+
+def revoke_refresh_token(session: Session, refresh_token: str) -> None:
+    """
+    Ferme la session d'un refresh token (deconnexion) : ses refresh tokens
+    et ses access tokens sont refuses.
+
+    Raises:
+        HTTPException: 401 si le token est invalide
+    """
+    payload = decode_token(refresh_token, expected_type="refresh")
+    family_id = payload.get("fid")
+    if isinstance(family_id, str):
+        revoke_token_family(session, family_id)
+        session.commit()
+
+
+async def issue_token_pair_async(session: AsyncSession, user: Users) -> dict:
+    return await session.run_sync(issue_token_pair, user)
+
+
+async def refresh_token_pair_async(session: AsyncSession, refresh_token: str) -> tuple[Users, dict]:
+    return await session.run_sync(refresh_token_pair, refresh_token)
+
+
+async def revoke_refresh_token_async(session: AsyncSession, refresh_token: str) -> None:
+    await session.run_sync(revoke_refresh_token, refresh_token)
+
+
+def invalidate_user_principal(user_id: int) -> None:
+    """
+    Retire un utilisateur du cache d'authentification.
+
+    A appeler apres toute modification de l'utilisateur (suppression,
+    changement de role). Le cache etant local au processus, les autres
+    workers le rechargent au plus tard apres USER_CACHE_TTL_SECONDS.
+    """
+    _principal_cache.pop(user_id)
+
+
+def _attach_principal(db: AsyncSession, principal: dict) -> Users:
+    """
+    Reconstruit l'utilisateur a partir de donnees connues, sans requete.
+
+    L'objet est rattache a la session comme s'il avait ete charge : un
+    `session.get(Users, id)` ulterieur dans la requete ne relit pas la base.
+    """
+    user = Users(**principal)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ) -> Users:
 
     payload = decode_token(token, expected_type="access")
     username: str = payload.get("sub")
+    uid = payload.get("uid")
+
+    # Session revoquee (deconnexion, refresh token rejoue) : test en memoire
+    if is_family_revoked(payload.get("fid")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Tous les champs de _PRINCIPAL_FIELDS doivent etre connus : un attribut
+    # absent serait charge a la demande hors du contexte asynchrone
+    if TRUST_TOKEN_CLAIMS and uid is not None and all(
+        payload.get(claim) for claim in ("role", "email", "created")
+    ):
+        return _attach_principal(db, {
+            "id": uid,
+            "username": username,
+            "email": payload["email"],
+            "role": UserRole(payload["role"]),
+            "date_creation": datetime.fromisoformat(payload["created"]),
+            "id_company": payload.get("cid"),
+        })
+
+    principal = _principal_cache.get(uid) if uid is not None else None
+    if principal is not None and principal["username"] == username:
+        return _attach_principal(db, principal)
 
     statement = select(Users).where(Users.username == username)
-    user = db.exec(statement).first()
+    user = (await db.exec(statement)).first()
+    # Rend la connexion au pool : une route synchrone (import) n'en retient
+    # pas deux, une route asynchrone la reprend a sa premiere requete
+    await db.commit()
 
     if user is None:
         raise HTTPException(
@@ -107,6 +328,9 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    _principal_cache.set(
+        user.id, {field: getattr(user, field) for field in _PRINCIPAL_FIELDS}
+    )
     return user
 
 
@@ -125,3 +349,21 @@ def require_admin(user: Users) -> None:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
         )
+
+
+def require_company_access(user: Users, company_id: int) -> None:
+    """
+    Verifie que l'utilisateur est admin ou employe de l'entreprise.
+
+    Args:
+        user: L'utilisateur a verifier
+        company_id: ID de l'entreprise consultee
+
+    Raises:
+        HTTPException: 403 si l'utilisateur n'appartient pas a l'entreprise
+    """
+    if user.role != UserRole.admin and user.id_company != company_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access this company"
+        )
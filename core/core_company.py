@@ -1,10 +1,61 @@
+from typing import Optional
+from fastapi import HTTPException
 from sqlmodel import Session, select
-from models.model_company import Company, CompanyCreate
-
-def get_all_companies(session: Session):
-    statement = select(Company)
-    results = session.exec(statement).all()
-    return results
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models.model_company import Company, CompanyCreate, CompanyRead
+from core.core_leaderboard import delete_company_leaderboard_entries
+from core.core_pagination import decode_cursor, encode_cursor, estimate_count
+from core.core_serialization import read_columns, rows_to_dicts
+
+# Colonnes lues pour la liste (champs de CompanyRead, sans objet ORM)
+COMPANY_READ_COLUMNS = read_columns(Company, CompanyRead)
+
+# Pagination de la liste admin
+DEFAULT_COMPANY_PAGE_SIZE = 100
+MAX_COMPANY_PAGE_SIZE = 500
+
+
+def get_all_companies(
+    session: Session,
+    limit: int = DEFAULT_COMPANY_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> dict:
+    """
+    Liste une page d'entreprises, par id croissant (pagination par cle).
+
+    Args:
+        session: Session SQLModel
+        limit: Nombre maximum d'entreprises retournees
+        cursor: Curseur `next_cursor` de la page precedente
+
+    Returns:
+        dict: Entreprises de la page (`items`), curseur de la page suivante
+        (`next_cursor`) et nombre estime d'entreprises (`total_estimate`)
+
+    Raises:
+        HTTPException: Si le curseur est invalide
+    """
+    limit = max(1, min(limit, MAX_COMPANY_PAGE_SIZE))
+    statement = select(*COMPANY_READ_COLUMNS)
+
+    page = statement.order_by(Company.id).limit(limit + 1)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            raise HTTPException(400, "Invalid cursor")
+        page = page.where(Company.id > last_id)
+    companies = rows_to_dicts(session.exec(page), CompanyRead)
+
+    next_cursor = None
+    if len(companies) > limit:
+        companies = companies[:limit]
+        next_cursor = encode_cursor([companies[-1]["id"]])
+
+    return {
+        "items": companies,
+        "next_cursor": next_cursor,
+        "total_estimate": estimate_count(session, Company, statement),
+    }
 
 
 def get_company_by_id(company_id: int, session: Session):
@@ -43,7 +94,36 @@ def delete_company(company_id: int, session: Session):
     if not company:
         return False
 
+    delete_company_leaderboard_entries(session, company_id)
     session.delete(company)
     session.commit()
 
     return True
+
+
+# Versions asynchrones (logique ci-dessus executee via `run_sync`)
+
+async def get_all_companies_async(
+    session: AsyncSession,
+    limit: int = DEFAULT_COMPANY_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> dict:
+    return await session.run_sync(get_all_companies, limit, cursor)
+
+
+async def get_company_by_id_async(company_id: int, session: AsyncSession):
+    return await session.run_sync(lambda sync_session: get_company_by_id(company_id, sync_session))
+
+
+async def create_company_async(company_in: CompanyCreate, session: AsyncSession):
+    return await session.run_sync(lambda sync_session: create_company(company_in, sync_session))
+
+
+async def update_company_async(company_id: int, company_in: CompanyCreate, session: AsyncSession):
+    return await session.run_sync(
+        lambda sync_session: update_company(company_id, company_in, sync_session)
+    )
+
+
+async def delete_company_async(company_id: int, session: AsyncSession):
+    return await session.run_sync(lambda sync_session: delete_company(company_id, sync_session))
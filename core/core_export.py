@@ -0,0 +1,326 @@
+"""
+Export des trajets d'une entreprise (rapports RSE) en Parquet ou CSV gzip.
+
+Un admin demande l'export (`POST /company/{id}/export`) : le job est
+enregistré en base (table `company_export_job`) puis exécuté en tâche de
+fond, après l'envoi de la réponse. Le client suit son avancement
+(`GET /company/{id}/export/{job_id}`) puis télécharge le fichier.
+
+Les trajets validés des employés (jointure sur `users.id_company`) sont lus
+depuis un curseur côté serveur par paquets de EXPORT_CHUNK_SIZE lignes, et
+chaque paquet est écrit dans le fichier avant la lecture du suivant : la
+mémoire utilisée ne dépend pas de la taille de l'entreprise. Le fichier est
+écrit sous un nom temporaire puis renommé, il n'est visible que complet.
+
+Le job enregistre un signe de vie (`updated_at`) au démarrage puis après
+chaque paquet (PostgreSQL). Un export interrompu par l'arrêt du worker, sans
+signe de vie depuis EXPORT_STALE_SECONDS, passe à l'état `failed` lors de sa
+consultation : il suffit d'en demander un nouveau.
+"""
+
+import csv
+import gzip
+import os
+from datetime import datetime
+from enum import Enum
+from typing import Iterator, Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.database import engine
+from models.model_company import Company
+from models.model_export import (
+    CompanyExportCreate,
+    CompanyExportJob,
+    ExportFormat,
+    ExportStatus,
+)
+from models.model_journey import Journey
+from models.model_journey_status import JourneyStatus
+from models.model_user import Users
+
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 10000))
+# Sans signe de vie depuis ce délai, un job en attente ou en cours est
+# considéré interrompu. Sous SQLite l'avancement n'est pas enregistré
+# pendant l'écriture : le délai doit dépasser la durée du plus long export.
+EXPORT_STALE_SECONDS = int(os.getenv("EXPORT_STALE_SECONDS", 3600))
+
+# Colonnes exportées : (nom dans le fichier, colonne, type Arrow)
+EXPORT_COLUMNS = (
+    ("journey_id", Journey.id, "int64"),
+    ("id_user", Journey.id_user, "int64"),
+    ("time_departure", Journey.time_departure, "timestamp[us]"),
+    ("time_arrival", Journey.time_arrival, "timestamp[us]"),
+    ("transport_type", Journey.transport_type, "string"),
+    ("distance_km", Journey.distance_km, "float64"),
+    ("duration_minutes", Journey.duration_minutes, "int64"),
+    ("score_journey", Journey.score_journey, "int64"),
+    ("detection_source", Journey.detection_source, "string"),
+)
+
+_EXTENSIONS = {
+    ExportFormat.parquet: "parquet",
+    ExportFormat.csv: "csv.gz",
+}
+_MEDIA_TYPES = {
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+    ExportFormat.csv: "application/gzip",
+}
+
+
+def create_company_export(
+    session: Session,
+    company_id: int,
+    data: CompanyExportCreate,
+    user_id: int
+) -> CompanyExportJob:
+    """
+    Enregistre une demande d'export (à exécuter avec `run_company_export`).
+
+    Args:
+        session: Session SQLModel
+        company_id: ID de l'entreprise
+        data: Format et période de l'export
+        user_id: ID de l'admin demandeur
+
+    Returns:
+        CompanyExportJob: Job en attente
+
+    Raises:
+        HTTPException: 404 si l'entreprise n'existe pas, 400 si la période est vide
+    """
+    if not session.get(Company, company_id):
+        raise HTTPException(404, "Entreprise introuvable")
+    if data.date_from and data.date_to and data.date_from >= data.date_to:
+        raise HTTPException(400, "date_from must be before date_to")
+
+    job = CompanyExportJob(
+        id=uuid4().hex,
+        id_company=company_id,
+        format=data.format,
+        date_from=data.date_from,
+        date_to=data.date_to,
+        created_by=user_id,
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def get_company_export(session: Session, company_id: int, job_id: str) -> CompanyExportJob:
+    """
+    Retourne un export de l'entreprise.
+
+    Un job `pending` ou `running` sans signe de vie depuis
+    EXPORT_STALE_SECONDS (worker arrêté pendant l'export) est d'abord
+    marqué `failed`.
+
+    Raises:
+        HTTPException: 404 si l'export n'existe pas pour cette entreprise
+    """
+    job = session.get(CompanyExportJob, job_id)
+    if not job or job.id_company != company_id:
+        raise HTTPException(404, "Export not found")
+
+    if job.status in (ExportStatus.pending, ExportStatus.running):
+        now = datetime.utcnow()
+        last_seen = job.updated_at or job.created_at
+        if (now - last_seen).total_seconds() > EXPORT_STALE_SECONDS:
+            # Conditionnel : un signe de vie entre-temps garde le job actif
+            interrupted = session.exec(
+                update(CompanyExportJob)
+                .where(
+                    CompanyExportJob.id == job_id,
+                    CompanyExportJob.status.in_((ExportStatus.pending, ExportStatus.running)),
+                    func.coalesce(CompanyExportJob.updated_at, CompanyExportJob.created_at) == last_seen,
+                )
+                .values(
+                    status=ExportStatus.failed, error="Export interrupted",
+                    finished_at=now, updated_at=now,
+                )
+            ).rowcount
+            session.commit()
+            if interrupted:
+                session.refresh(job)
+    return job
+
+
+def get_company_export_file(session: Session, company_id: int, job_id: str) -> tuple[str, str, str]:
+    """
+    Retourne le fichier d'un export terminé.
+
+    Returns:
+        tuple[str, str, str]: Chemin, nom de téléchargement et type MIME
+
+    Raises:
+        HTTPException: 404 si l'export n'existe pas, 409 s'il n'est pas
+        terminé, 410 si le fichier a été supprimé
+    """
+    job = get_company_export(session, company_id, job_id)
+    if job.status != ExportStatus.completed:
+        raise HTTPException(409, f"Export is {job.status.value}")
+    if not job.path or not os.path.exists(job.path):
+        raise HTTPException(410, "Export file is no longer available")
+    return job.path, os.path.basename(job.path), _MEDIA_TYPES[job.format]
+
+
+
+async def create_company_export_async(
+    session: AsyncSession,
+    company_id: int,
+    data: CompanyExportCreate,
+    user_id: int
+) -> CompanyExportJob:
+    """Version asynchrone de `create_company_export`."""
+    return await session.run_sync(create_company_export, company_id, data, user_id)
+
+
+async def get_company_export_async(session: AsyncSession, company_id: int, job_id: str) -> CompanyExportJob:
+    """Version asynchrone de `get_company_export`."""
+    return await session.run_sync(get_company_export, company_id, job_id)
+
+
+async def get_company_export_file_async(
+    session: AsyncSession,
+    company_id: int,
+    job_id: str
+) -> tuple[str, str, str]:
+    """Version asynchrone de `get_company_export_file`."""
+    return await session.run_sync(get_company_export_file, company_id, job_id)
+
+def _export_statement(job: CompanyExportJob):
+    statement = (
+        select(*(column for _, column, _ in EXPORT_COLUMNS))
+        .join(Users, Users.id == Journey.id_user)
+        .where(Users.id_company == job.id_company)
+        .where(Journey.status == JourneyStatus.VALIDATED)
+    )
+    # Bornes sur time_departure : seules les partitions concernées sont lues
+    if job.date_from:
+        statement = statement.where(Journey.time_departure >= job.date_from)
+    if job.date_to:
+        statement = statement.where(Journey.time_departure < job.date_to)
+    return statement
+
+
+def _column_chunks(session: Session, job: CompanyExportJob) -> Iterator[list[tuple]]:
+    """Lit les trajets par paquets et les retourne colonne par colonne."""
+    result = session.exec(
+        _export_statement(job).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    try:
+        for chunk in result.partitions():
+            columns = list(zip(*chunk))
+            for position, values in enumerate(columns):
+                if values and isinstance(values[0], Enum):
+                    columns[position] = tuple(value.value for value in values)
+            yield columns
+    finally:
+        result.close()
+
+
+def _write_parquet(chunks: Iterator[list[tuple]], path: str) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.type_for_alias(arrow_type)) for name, _, arrow_type in EXPORT_COLUMNS])
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for columns in chunks:
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+
+
+def _write_csv(chunks: Iterator[list[tuple]], path: str) -> None:
+    with gzip.open(path, "wt", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow([name for name, _, _ in EXPORT_COLUMNS])
+        for columns in chunks:
+            writer.writerows(zip(*columns))
+
+
+_WRITERS = {
+    ExportFormat.parquet: _write_parquet,
+    ExportFormat.csv: _write_csv,
+}
+
+
+def _update_job(job_id: str, **values) -> None:
+    """Met à jour l'état d'un job (et son signe de vie) dans sa propre transaction."""
+    with Session(engine) as session:
+        job = session.get(CompanyExportJob, job_id)
+        for key, value in values.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+
+
+def run_company_export(job_id: str, export_dir: Optional[str] = None) -> None:
+    """
+    Exécute un export (tâche de fond).
+
+    La lecture utilise sa propre session (curseur ouvert pendant tout
+    l'export) ; l'avancement est enregistré après chaque paquet dans une
+    transaction séparée (PostgreSQL uniquement). Un échec est enregistré
+    après la fermeture de cette session (SQLite refuse l'écriture tant que
+    le curseur est ouvert).
+
+    Args:
+        job_id: ID du job créé par `create_company_export`
+        export_dir: Répertoire des fichiers (EXPORT_DIR par défaut)
+    """
+    export_dir = export_dir or EXPORT_DIR
+    error: Optional[Exception] = None
+    with Session(engine) as session:
+        job = session.get(CompanyExportJob, job_id)
+        _update_job(job_id, status=ExportStatus.running)
+
+        path = os.path.join(
+            export_dir, f"company-{job.id_company}-{job.id}.{_EXTENSIONS[job.format]}"
+        )
+        temporary_path = f"{path}.tmp"
+        rows = 0
+        # SQLite bloque les écritures tant que le curseur de lecture est ouvert
+        report_progress = session.get_bind().dialect.name != "sqlite"
+
+        def counted(chunks):
+            nonlocal rows
+            for columns in chunks:
+                yield columns
+                rows += len(columns[0])
+                if report_progress:
+                    _update_job(job_id, rows=rows)
+
+        chunks = _column_chunks(session, job)
+        try:
+            os.makedirs(export_dir, exist_ok=True)
+            _WRITERS[job.format](counted(chunks), temporary_path)
+            os.replace(temporary_path, path)
+        except Exception as e:
+            error = e
+        finally:
+            # Ferme le curseur même si l'exception (et sa trace) garde le
+            # générateur suspendu en vie
+            chunks.close()
+
+    if error is not None:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        _update_job(
+            job_id, status=ExportStatus.failed, error=str(error)[:500],
+            finished_at=datetime.utcnow(),
+        )
+        raise error
+
+    _update_job(
+        job_id, status=ExportStatus.completed, rows=rows, path=path,
+        finished_at=datetime.utcnow(),
+    )
@@ -3,10 +3,15 @@ Logique métier pour la gestion des trajets (V1 simplifiée POC).
 
 Ce module implémente :
 - Création de trajets validés avec calcul automatique de score
-- Récupération de trajets validés
+- Création groupée de trajets (synchronisation hors ligne de l'app mobile)
+- Récupération de trajets validés (pagination par curseur, streaming),
+  lus en tuples de colonnes et encodés par orjson (core_serialization)
 - Rejet de trajets
 - Suppression de trajets
 - Statistiques utilisateur
+- Mise à jour des statistiques et classements d'entreprise précalculés,
+  différée après le commit via l'outbox (core_outbox)
+- Des versions asynchrones (suffixe `_async`) pour les endpoints `async def`
 
 Règles métier :
 - Les trajets sont créés directement validés
@@ -15,14 +20,68 @@ Règles métier :
 - La durée est calculée automatiquement à partir des horaires
 """
 
+from typing import Any, AsyncIterator, Iterator, Optional
+
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
+from sqlalchemy import delete, tuple_, update
 from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
 from datetime import datetime
 
-from models.model_journey import Journey, JourneyCreate
+from models.model_journey import Journey, JourneyCreate, JourneyRead
 from models.model_journey_status import JourneyStatus
-from core.core_score import calculate_and_save_score
+from core.core_score import CompiledScoringRules, compute_journey_score
+from core.core_scoring_rules import active_scoring_rules
+from core.core_statistics import (
+    apply_statistics_deltas,
+    journey_statistics_delta,
+    read_user_statistics,
+)
+from core.core_leaderboard import apply_leaderboard_deltas, leaderboard_deltas
+from models.model_company import Company
+from models.model_transport_type import TransportType
+from models.model_user import Users
+from core.core_outbox import (
+    JOURNEY_AGGREGATES_TOPIC,
+    enqueue_event,
+    notify_outbox,
+    register_outbox_handler,
+)
+from core.core_response_cache import JOURNEYS_VERSION, STATISTICS_VERSION, bump_data_version
+from core.core_pagination import decode_cursor, encode_cursor
+from core.core_serialization import read_columns, rows_to_dicts
+from core.database import dialect_insert
+
+
+# Nombre maximum de trajets acceptés dans un envoi groupé
+MAX_JOURNEY_BATCH_SIZE = 500
+
+# Pagination des trajets validés
+DEFAULT_JOURNEY_PAGE_SIZE = 50
+MAX_JOURNEY_PAGE_SIZE = 200
+
+# Nombre de lignes lues par aller-retour en mode streaming
+JOURNEY_STREAM_CHUNK_SIZE = 500
+
+# Colonnes lues pour les listes (champs de JourneyRead, sans objet ORM)
+JOURNEY_READ_COLUMNS = read_columns(Journey, JourneyRead)
+
+def _validate_journey_data(data: JourneyCreate) -> None:
+    """
+    Vérifie la cohérence des données d'un trajet.
+
+    Raises:
+        HTTPException: Si données invalides
+    """
+    # Validation temporelle
+    if data.time_arrival <= data.time_departure:
+        raise HTTPException(400, "time_arrival must be after time_departure")
+
+    # Validation distance
+    if data.distance_km <= 0:
+        raise HTTPException(400, "distance_km must be positive")
 
 
 def _calculate_duration_minutes(time_departure: datetime, time_arrival: datetime) -> int:
@@ -31,6 +90,90 @@ def _calculate_duration_minutes(time_departure: datetime, time_arrival: datetime
     return int(delta.total_seconds() / 60)
 
 
+def _enqueue_journey_deltas(session: Session, journeys: list[Journey], sign: int) -> None:
+    """
+    Programme la mise à jour des agrégats pour des trajets validés d'un même utilisateur.
+
+    Un événement outbox est ajouté à la transaction du trajet (sans commit) ;
+    statistiques et classements sont mis à jour après le commit par
+    `_apply_journey_deltas`. L'entreprise de l'utilisateur est relevée dès
+    maintenant : les classements restent ceux de l'entreprise au moment du trajet.
+
+    Args:
+        session: Session SQLModel
+        journeys: Trajets validés concernés (même utilisateur)
+        sign: +1 à la création, -1 au rejet ou à la suppression
+    """
+    if not journeys:
+        return
+
+    # L'utilisateur est déjà chargé dans la session par get_current_user
+    user = session.get(Users, journeys[0].id_user)
+    enqueue_event(session, JOURNEY_AGGREGATES_TOPIC, {
+        "id_user": journeys[0].id_user,
+        "id_company": user.id_company if user else None,
+        "sign": sign,
+        "journeys": [
+            {
+                "transport_type": journey.transport_type.value,
+                "distance_km": journey.distance_km,
+                "score_journey": journey.score_journey,
+                "time_departure": journey.time_departure.isoformat(),
+            }
+            for journey in journeys
+        ],
+    })
+
+
+def _apply_journey_deltas(session: Session, payload: dict) -> None:
+    """
+    Handler outbox : répercute des trajets validés sur les agrégats (sans commit).
+
+    Met à jour les statistiques utilisateur et, si l'utilisateur appartenait
+    à une entreprise, les classements de l'entreprise. Les agrégats d'un
+    utilisateur ou d'une entreprise supprimés entre-temps sont ignorés, ainsi
+    que ceux reconstruits depuis l'écriture de l'événement (`skip`, voir
+    `withdraw_pending_events`).
+    """
+    id_user, id_company, sign = payload["id_user"], payload["id_company"], payload["sign"]
+    skip = payload.get("skip", ())
+    if session.get(Users, id_user) is None:
+        return
+
+    journeys = payload["journeys"]
+    if "statistics" not in skip:
+        apply_statistics_deltas(session, [
+            journey_statistics_delta(
+                id_user,
+                TransportType(journey["transport_type"]),
+                journey["distance_km"],
+                journey["score_journey"],
+                sign,
+            )
+            for journey in journeys
+        ])
+        bump_data_version(session, id_user, STATISTICS_VERSION)
+
+    if "leaderboard" in skip or id_company is None or session.get(Company, id_company) is None:
+        return
+
+    apply_leaderboard_deltas(session, [
+        delta
+        for journey in journeys
+        for delta in leaderboard_deltas(
+            id_company,
+            id_user,
+            datetime.fromisoformat(journey["time_departure"]),
+            journey["distance_km"],
+            journey["score_journey"],
+            sign,
+        )
+    ])
+
+
+register_outbox_handler(JOURNEY_AGGREGATES_TOPIC, _apply_journey_deltas)
+
+
 def _verify_journey_ownership(session: Session, journey_id: int, user_id: int) -> Journey:
     """
     Vérifie qu'un trajet existe et appartient à l'utilisateur.
@@ -56,11 +199,63 @@ def _verify_journey_ownership(session: Session, journey_id: int, user_id: int) -
     return journey
 
 
+def _journey_row(
+    data: JourneyCreate,
+    user_id: int,
+    rules: CompiledScoringRules,
+    now: datetime
+) -> dict:
+    """Construit la ligne d'un trajet validé : durée et score calculés en mémoire."""
+    return {
+        "id_user": user_id,
+        "client_journey_id": data.client_journey_id,
+        "status": JourneyStatus.VALIDATED,
+        "detection_source": data.detection_source,
+        "place_departure": data.place_departure,
+        "place_arrival": data.place_arrival,
+        "time_departure": data.time_departure,
+        "time_arrival": data.time_arrival,
+        "distance_km": data.distance_km,
+        "duration_minutes": _calculate_duration_minutes(data.time_departure, data.time_arrival),
+        "transport_type": data.transport_type,
+        "score_journey": compute_journey_score(
+            data.transport_type, data.distance_km, rules, data.time_departure
+        ),
+        "score_version": rules.version,
+        "validated_at": now,
+        "created_at": now,
+    }
+
+
+def _insert_journeys_statement(session: Session):
+    """
+    INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+    Sans cible de conflit : seul l'index unique d'idempotence peut être en
+    conflit, qu'il porte sur (id_user, client_journey_id) ou, table
+    partitionnée (core_partition), aussi sur time_departure.
+    """
+    return dialect_insert(session, Journey).on_conflict_do_nothing()
+
+
+def _find_client_journeys(session: Session, user_id: int, keys: list[str]) -> dict[str, Journey]:
+    """Retourne les trajets déjà enregistrés pour des clés client (index unique)."""
+    if not keys:
+        return {}
+    journeys = session.exec(
+        select(Journey)
+        .where(Journey.id_user == user_id)
+        .where(Journey.client_journey_id.in_(keys))
+    ).all()
+    return {journey.client_journey_id: journey for journey in journeys}
+
+
 def create_validated_journey_core(
     session: Session,
     data: JourneyCreate,
-    user_id: int
-) -> Journey:
+    user_id: int,
+    idempotency_key: Optional[str] = None
+) -> tuple[Journey, bool]:
     """
     Crée un trajet validé directement.
 
@@ -70,78 +265,323 @@ def create_validated_journey_core(
     3. Le backend le crée avec status=VALIDATED
     4. Le score est calculé automatiquement
 
+    Idempotence : si le trajet porte une clé client (`client_journey_id` ou
+    en-tête Idempotency-Key) déjà enregistrée pour l'utilisateur, le trajet
+    existant est retourné tel quel (ni validation, ni score, ni agrégats).
+    Deux envois simultanés sont départagés par l'index unique
+    (INSERT ... ON CONFLICT DO NOTHING RETURNING).
+
     Args:
         session: Session SQLModel
         data: Données du trajet
         user_id: ID de l'utilisateur (extrait du JWT)
+        idempotency_key: Valeur de l'en-tête Idempotency-Key
 
     Returns:
-        Journey: Le trajet créé avec son score
+        tuple[Journey, bool]: Le trajet et True s'il vient d'être créé
 
     Raises:
         HTTPException: Si données invalides
     """
-    # Validation temporelle
-    if data.time_arrival <= data.time_departure:
-        raise HTTPException(400, "time_arrival must be after time_departure")
+    if idempotency_key:
+        if data.client_journey_id and data.client_journey_id != idempotency_key:
+            raise HTTPException(400, "Idempotency-Key does not match client_journey_id")
+        data = data.model_copy(update={"client_journey_id": idempotency_key})
 
-    # Validation distance
-    if data.distance_km <= 0:
-        raise HTTPException(400, "distance_km must be positive")
+    key = data.client_journey_id
+    if key:
+        existing = _find_client_journeys(session, user_id, [key]).get(key)
+        if existing:
+            return existing, False
 
-    # Calcul automatique de la durée
-    duration_minutes = _calculate_duration_minutes(data.time_departure, data.time_arrival)
-
-    # Création du trajet validé
-    journey = Journey(
-        id_user=user_id,
-        status=JourneyStatus.VALIDATED,
-        detection_source=data.detection_source,
-        place_departure=data.place_departure,
-        place_arrival=data.place_arrival,
-        time_departure=data.time_departure,
-        time_arrival=data.time_arrival,
-        distance_km=data.distance_km,
-        duration_minutes=duration_minutes,
-        transport_type=data.transport_type,
-        validated_at=datetime.utcnow(),
-        created_at=datetime.utcnow(),
-    )
+    _validate_journey_data(data)
 
-    session.add(journey)
+    # Durée et score calculés avant insertion (un seul INSERT, un seul commit)
+    row = _journey_row(data, user_id, active_scoring_rules(session), datetime.utcnow())
+    statement = _insert_journeys_statement(session).values(**row).returning(Journey)
 
     try:
+        journey = session.scalars(statement).first()
+        if journey is None:
+            # Même trajet enregistré entre-temps par une requête concurrente
+            return _find_client_journeys(session, user_id, [key])[key], False
+        _enqueue_journey_deltas(session, [journey], sign=1)
+        bump_data_version(session, user_id, JOURNEYS_VERSION)
         session.commit()
-        session.refresh(journey)
+        notify_outbox()
     except IntegrityError as e:
         session.rollback()
         raise HTTPException(400, f"Invalid journey data: {str(e)}")
 
-    # Calcul automatique du score
-    calculate_and_save_score(session, journey)
-    session.refresh(journey)
+    return journey, True
 
-    return journey
+
+def _parse_batch_item(item: Any) -> JourneyCreate:
+    """
+    Valide le schéma d'un élément d'un envoi groupé.
+
+    Raises:
+        HTTPException: 422 avec le détail des champs invalides
+    """
+    if isinstance(item, JourneyCreate):
+        return item
+    try:
+        return JourneyCreate.model_validate(item)
+    except ValidationError as e:
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+            for error in e.errors()
+        )
+        raise HTTPException(422, detail)
 
 
-def list_validated_journeys_core(session: Session, user_id: int) -> list[Journey]:
+def create_validated_journeys_bulk_core(
+    session: Session,
+    items: list[Any],
+    user_id: int
+) -> dict:
     """
-    Liste tous les trajets validés d'un utilisateur.
+    Crée plusieurs trajets validés en une seule transaction.
+
+    Utilisé par l'app mobile pour rejouer les trajets enregistrés hors ligne.
+    Chaque élément est validé individuellement (schéma puis règles métier) :
+    les éléments invalides sont signalés dans le rapport sans bloquer les
+    autres. Durées et scores sont
+    calculés en mémoire, puis tous les trajets valides sont insérés avec un
+    unique INSERT ... RETURNING multi-lignes et un seul commit.
+
+    Les éléments dont la clé client (`client_journey_id`) est déjà
+    enregistrée, ou répétée dans le lot, renvoient le trajet existant
+    (`duplicate`) sans être recomptés.
 
     Args:
         session: Session SQLModel
-        user_id: ID de l'utilisateur
+        items: Trajets à créer (objets JSON bruts ou JourneyCreate)
+        user_id: ID de l'utilisateur (extrait du JWT)
 
     Returns:
-        list[Journey]: Liste des trajets validés
+        dict: Nombre de trajets créés / dupliqués / en erreur et résultat par élément
+
+    Raises:
+        HTTPException: Si le lot est trop volumineux ou rejeté par la base
+    """
+    if len(items) > MAX_JOURNEY_BATCH_SIZE:
+        raise HTTPException(
+            400, f"A batch cannot contain more than {MAX_JOURNEY_BATCH_SIZE} journeys"
+        )
+
+    results: list[dict] = [{"index": index} for index in range(len(items))]
+    parsed: list[Optional[JourneyCreate]] = []
+    for index, item in enumerate(items):
+        try:
+            parsed.append(_parse_batch_item(item))
+        except HTTPException as e:
+            results[index]["error"] = e.detail
+            parsed.append(None)
+
+    existing = _find_client_journeys(
+        session, user_id, list({data.client_journey_id for data in parsed if data and data.client_journey_id})
+    )
+    # Clé client -> index du premier élément du lot qui la porte
+    first_index: dict[str, int] = {}
+    duplicates: list[tuple[int, str]] = []
+    rows: list[dict] = []
+    row_indexes: list[int] = []
+    now = datetime.utcnow()
+    rules = active_scoring_rules(session)
+
+    for index, data in enumerate(parsed):
+        if data is None:
+            continue
+        key = data.client_journey_id
+        if key and (key in existing or key in first_index):
+            duplicates.append((index, key))
+            continue
+
+        try:
+            _validate_journey_data(data)
+        except HTTPException as e:
+            results[index]["error"] = e.detail
+            continue
+
+        if key:
+            first_index[key] = index
+        rows.append(_journey_row(data, user_id, rules, now))
+        row_indexes.append(index)
+
+    created = 0
+    if rows:
+        statement = _insert_journeys_statement(session).returning(
+            Journey, sort_by_parameter_order=True
+        )
+        try:
+            journeys = session.scalars(statement, rows).all()
+            _enqueue_journey_deltas(session, journeys, sign=1)
+            if journeys:
+                bump_data_version(session, user_id, JOURNEYS_VERSION)
+            session.commit()
+            notify_outbox()
+        except IntegrityError as e:
+            session.rollback()
+            raise HTTPException(400, f"Invalid journey data: {str(e)}")
+
+        # Les lignes écartées par ON CONFLICT (envoi concurrent) manquent au RETURNING
+        returned = iter(journeys)
+        journey = next(returned, None)
+        conflicts: list[tuple[int, str]] = []
+        for index, row in zip(row_indexes, rows):
+            key = row["client_journey_id"]
+            if journey is not None and journey.client_journey_id == key:
+                results[index]["journey"] = journey
+                created += 1
+                journey = next(returned, None)
+            else:
+                conflicts.append((index, key))
+        if conflicts:
+            existing.update(_find_client_journeys(session, user_id, [key for _, key in conflicts]))
+            duplicates.extend(conflicts)
+
+    for index, key in duplicates:
+        journey = existing.get(key) or results[first_index[key]].get("journey")
+        if journey is None:
+            # Trajet concurrent supprimé entre l'INSERT et sa relecture
+            results[index]["error"] = "Conflicting concurrent submission"
+            continue
+        results[index]["journey"] = journey
+        results[index]["duplicate"] = True
+
+    return {
+        "created": created,
+        "duplicates": sum(1 for result in results if result.get("duplicate")),
+        "failed": sum(1 for result in results if "error" in result),
+        "results": results,
+    }
+
+
+def _encode_cursor(journey: dict) -> str:
+    """Encode la position (time_departure, id) d'un trajet en curseur opaque."""
+    return encode_cursor([journey["time_departure"].isoformat(), journey["id"]])
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Décode un curseur produit par `_encode_cursor`.
+
+    Raises:
+        HTTPException: Si le curseur est invalide
+    """
+    time_departure, journey_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(time_departure), int(journey_id)
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def validated_journeys_statement(
+    user_id: int,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None
+):
+    """
+    Requête des trajets validés d'un utilisateur, du plus récent au plus ancien.
+
+    Seules les colonnes de JourneyRead sont sélectionnées (JOURNEY_READ_COLUMNS).
+
+    Le tri (time_departure, id) est total : il sert de clé de pagination.
+    Si un curseur est fourni, seuls les trajets situés après lui sont retenus ;
+    `since` exclut les trajets partis avant cette date.
+
+    Les bornes sur time_departure sont exprimées colonne par colonne : sur la
+    table partitionnée (core_partition), PostgreSQL écarte alors les
+    partitions hors de l'intervalle, ce qu'il ne fait pas pour la seule
+    comparaison de tuples.
     """
     statement = (
-        select(Journey)
+        select(*JOURNEY_READ_COLUMNS)
         .where(Journey.id_user == user_id)
         .where(Journey.status == JourneyStatus.VALIDATED)
-        .order_by(Journey.time_departure.desc())
+        .order_by(Journey.time_departure.desc(), Journey.id.desc())
+    )
+    if cursor:
+        time_departure, journey_id = _decode_cursor(cursor)
+        statement = statement.where(
+            Journey.time_departure <= time_departure,
+            tuple_(Journey.time_departure, Journey.id) < tuple_(time_departure, journey_id),
+        )
+    if since is not None:
+        statement = statement.where(Journey.time_departure >= since)
+    return statement
+
+
+def list_validated_journeys_core(
+    session: Session,
+    user_id: int,
+    limit: int = DEFAULT_JOURNEY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None
+) -> dict:
+    """
+    Liste une page de trajets validés d'un utilisateur.
+
+    Pagination par clé (keyset) sur (time_departure, id) : le coût d'une page
+    ne dépend pas de la longueur de l'historique.
+
+    Args:
+        session: Session SQLModel
+        user_id: ID de l'utilisateur
+        limit: Nombre maximum de trajets retournés
+        cursor: Curseur `next_cursor` de la page précédente
+        since: Exclut les trajets partis avant cette date
+
+    Returns:
+        dict: Trajets de la page (`items`, dicts aux champs de JourneyRead) et
+        curseur de la page suivante (`next_cursor`, None si dernière page)
+
+    Raises:
+        HTTPException: Si le curseur est invalide
+    """
+    limit = max(1, min(limit, MAX_JOURNEY_PAGE_SIZE))
+    statement = validated_journeys_statement(user_id, cursor, since).limit(limit + 1)
+    journeys = rows_to_dicts(session.exec(statement), JourneyRead)
+
+    next_cursor = None
+    if len(journeys) > limit:
+        journeys = journeys[:limit]
+        next_cursor = _encode_cursor(journeys[-1])
+
+    return {"items": journeys, "next_cursor": next_cursor}
+
+
+def stream_validated_journeys_core(
+    session: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None
+) -> Iterator[dict]:
+    """
+    Parcourt tous les trajets validés d'un utilisateur sans les charger en mémoire.
+
+    Les lignes sont lues par paquets depuis un curseur côté serveur, la
+    mémoire utilisée reste constante quelle que soit la taille de l'historique.
+
+    Args:
+        session: Session SQLModel
+        user_id: ID de l'utilisateur
+        cursor: Curseur optionnel à partir duquel reprendre
+        since: Exclut les trajets partis avant cette date
+
+    Returns:
+        Iterator[dict]: Trajets validés (champs de JourneyRead), du plus récent
+        au plus ancien
+
+    Raises:
+        HTTPException: Si le curseur est invalide
+    """
+    statement = validated_journeys_statement(user_id, cursor, since).execution_options(
+        yield_per=JOURNEY_STREAM_CHUNK_SIZE
     )
-    return session.exec(statement).all()
+    fields = tuple(JourneyRead.model_fields)
+    return (dict(zip(fields, row)) for row in session.exec(statement))
 
 
 def get_journey_core(session: Session, journey_id: int, user_id: int) -> Journey:
@@ -195,11 +635,24 @@ def reject_journey_core(
     if journey.status == JourneyStatus.REJECTED:
         raise HTTPException(400, "Journey is already rejected")
 
-    # Rejeter le trajet
-    journey.status = JourneyStatus.REJECTED
-    journey.rejected_at = datetime.utcnow()
+    # Rejet conditionnel : de deux rejets concurrents, un seul modifie la
+    # ligne et retire le trajet des statistiques
+    rejected = session.exec(
+        update(Journey)
+        .where(Journey.id == journey_id, Journey.status == JourneyStatus.VALIDATED)
+        .values(status=JourneyStatus.REJECTED, rejected_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if rejected.rowcount == 0:
+        session.rollback()
+        raise HTTPException(400, "Journey is already rejected")
+
+    # Le trajet ne compte plus dans les statistiques et classements
+    _enqueue_journey_deltas(session, [journey], sign=-1)
+    bump_data_version(session, user_id, JOURNEYS_VERSION)
 
     session.commit()
+    notify_outbox()
     session.refresh(journey)
 
     return journey
@@ -225,8 +678,26 @@ def delete_journey_core(session: Session, journey_id: int, user_id: int) -> dict
     """
     journey = _verify_journey_ownership(session, journey_id, user_id)
 
-    session.delete(journey)
+    # Le statut est relu par la suppression elle-même : de deux suppressions
+    # concurrentes, seule celle qui supprime la ligne met à jour les statistiques
+    deleted_status = session.exec(
+        delete(Journey)
+        .where(Journey.id == journey_id)
+        .returning(Journey.status)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    session.expunge(journey)
+    if deleted_status is None:
+        session.rollback()
+        raise HTTPException(404, "Journey not found")
+
+    # Seuls les trajets validés sont comptabilisés dans les statistiques
+    if deleted_status == JourneyStatus.VALIDATED:
+        _enqueue_journey_deltas(session, [journey], sign=-1)
+
+    bump_data_version(session, user_id, JOURNEYS_VERSION)
     session.commit()
+    notify_outbox()
 
     return {"message": "Journey deleted successfully"}
 
@@ -235,10 +706,16 @@ def get_user_statistics_core(session: Session, user_id: int) -> dict:
     """
     Récupère les statistiques simplifiées d'un utilisateur.
 
-    Calcule :
+    Retourne :
     - Nombre total de trajets validés
     - Distance totale parcourue
     - Score total
+    - Le détail par mode de transport
+
+    Les statistiques sont lues dans la table matérialisée `user_statistics`,
+    maintenue à chaque création, rejet ou suppression de trajet : le coût ne
+    dépend pas du nombre de trajets de l'utilisateur. La mise à jour passe
+    par l'outbox : un trajet tout juste enregistré peut ne pas y figurer encore.
 
     Args:
         session: Session SQLModel
@@ -247,22 +724,87 @@ def get_user_statistics_core(session: Session, user_id: int) -> dict:
     Returns:
         dict: Statistiques de l'utilisateur
     """
-    # Récupérer tous les trajets validés
-    validated_journeys = list_validated_journeys_core(session, user_id)
+    return read_user_statistics(session, user_id)
 
-    if not validated_journeys:
-        return {
-            "total_journeys": 0,
-            "total_distance_km": 0.0,
-            "total_score": 0,
-        }
 
-    # Calculer les statistiques
-    total_distance = sum(j.distance_km for j in validated_journeys)
-    total_score = sum(j.score_journey or 0 for j in validated_journeys)
+# ---------------------------------------------------------------------------
+# Versions asynchrones
+#
+# La logique métier reste écrite une seule fois (fonctions ci-dessus) et
+# s'exécute via `AsyncSession.run_sync` : les requêtes passent par le pilote
+# asynchrone (asyncpg, aiosqlite) sans bloquer la boucle d'évènements.
+# ---------------------------------------------------------------------------
 
-    return {
-        "total_journeys": len(validated_journeys),
-        "total_distance_km": round(total_distance, 2),
-        "total_score": total_score,
-    }
+
+async def create_validated_journey_async(
+    session: AsyncSession,
+    data: JourneyCreate,
+    user_id: int,
+    idempotency_key: Optional[str] = None
+) -> tuple[Journey, bool]:
+    """Version asynchrone de `create_validated_journey_core`."""
+    return await session.run_sync(create_validated_journey_core, data, user_id, idempotency_key)
+
+
+async def create_validated_journeys_bulk_async(
+    session: AsyncSession,
+    items: list[Any],
+    user_id: int
+) -> dict:
+    """Version asynchrone de `create_validated_journeys_bulk_core`."""
+    return await session.run_sync(create_validated_journeys_bulk_core, items, user_id)
+
+
+async def list_validated_journeys_async(
+    session: AsyncSession,
+    user_id: int,
+    limit: int = DEFAULT_JOURNEY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None
+) -> dict:
+    """Version asynchrone de `list_validated_journeys_core`."""
+    return await session.run_sync(list_validated_journeys_core, user_id, limit, cursor, since)
+
+
+async def stream_validated_journeys_async(
+    session: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None
+) -> AsyncIterator[dict]:
+    """
+    Version asynchrone de `stream_validated_journeys_core`.
+
+    Le curseur est validé avant le début du flux (HTTPException 400).
+    """
+    statement = validated_journeys_statement(user_id, cursor, since).execution_options(
+        yield_per=JOURNEY_STREAM_CHUNK_SIZE
+    )
+    result = await session.stream(statement)
+    fields = tuple(JourneyRead.model_fields)
+
+    async def journeys():
+        async for row in result:
+            yield dict(zip(fields, row))
+
+    return journeys()
+
+
+async def get_journey_async(session: AsyncSession, journey_id: int, user_id: int) -> Journey:
+    """Version asynchrone de `get_journey_core`."""
+    return await session.run_sync(get_journey_core, journey_id, user_id)
+
+
+async def reject_journey_async(session: AsyncSession, journey_id: int, user_id: int) -> Journey:
+    """Version asynchrone de `reject_journey_core`."""
+    return await session.run_sync(reject_journey_core, journey_id, user_id)
+
+
+async def delete_journey_async(session: AsyncSession, journey_id: int, user_id: int) -> dict:
+    """Version asynchrone de `delete_journey_core`."""
+    return await session.run_sync(delete_journey_core, journey_id, user_id)
+
+
+async def get_user_statistics_async(session: AsyncSession, user_id: int) -> dict:
+    """Version asynchrone de `get_user_statistics_core`."""
+    return await session.run_sync(get_user_statistics_core, user_id)
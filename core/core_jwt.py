@@ -0,0 +1,95 @@
+"""
+Backends JWT : encodage et verification des tokens pour core_auth.
+
+Le backend est choisi par JWT_BACKEND :
+
+- jose (defaut) : python-jose
+- pyjwt : PyJWT (a installer : `pip install PyJWT`), plus rapide
+
+Un backend fournit `encode(claims, key, algorithm)` et
+`decode(token, key, algorithm)` ; `decode` verifie la signature et
+l'expiration et leve InvalidTokenError. Un autre backend peut etre ajoute
+avec `register_jwt_backend`.
+
+    python benchmarks/bench_jwt.py
+"""
+
+from typing import Callable
+
+
+class InvalidTokenError(Exception):
+    """Token invalide : format, signature ou expiration."""
+
+
+class JoseBackend:
+    """Backend python-jose."""
+
+    name = "jose"
+
+    def __init__(self):
+        from jose import JWTError, jwt
+
+        self._jwt = jwt
+        self._error = JWTError
+
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._error as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+class PyJWTBackend:
+    """Backend PyJWT."""
+
+    name = "pyjwt"
+
+    def __init__(self):
+        try:
+            import jwt
+        except ImportError as e:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires PyJWT (pip install PyJWT)") from e
+
+        self._jwt = jwt
+
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+_backends: dict[str, Callable[[], object]] = {
+    JoseBackend.name: JoseBackend,
+    PyJWTBackend.name: PyJWTBackend,
+}
+
+
+def register_jwt_backend(name: str, factory: Callable[[], object]) -> None:
+    """Rend un backend selectionnable par JWT_BACKEND=`name`."""
+    _backends[name] = factory
+
+
+def jwt_backend_names() -> list[str]:
+    """Noms des backends enregistres."""
+    return list(_backends)
+
+
+def get_jwt_backend(name: str):
+    """
+    Instancie un backend.
+
+    Raises:
+        RuntimeError: Si le backend est inconnu ou si sa bibliotheque
+        n'est pas installee
+    """
+    factory = _backends.get(name)
+    if factory is None:
+        raise RuntimeError(f"Unknown JWT backend {name!r} (available: {', '.join(_backends)})")
+    return factory()
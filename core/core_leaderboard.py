@@ -0,0 +1,259 @@
+"""
+Classements d'entreprise précalculés (table `company_leaderboard`).
+
+Pour chaque trajet validé d'un employé, les totaux de l'employé sont
+incrémentés dans trois fenêtres : le jour, la semaine ISO et le mois du
+départ. Rejets et suppressions appliquent le delta inverse. Les deltas sont
+appliqués par l'outbox (core_outbox), juste après le commit du trajet.
+
+La lecture d'un top K est un parcours d'index trié sur
+(entreprise, période, fenêtre, total) limité à K lignes : elle ne dépend ni
+du nombre de trajets ni du nombre d'employés de l'entreprise.
+
+Reconstruction complète depuis la table `journey` :
+
+    python manage.py rebuild-leaderboards [--company ID]
+
+Comme pour les statistiques, la reconstruction retire d'abord la partie
+classements des événements outbox non traités.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlmodel import Session, select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.core_outbox import (
+    JOURNEY_AGGREGATES_PARTS,
+    JOURNEY_AGGREGATES_TOPIC,
+    withdraw_pending_events,
+)
+from core.database import increment_counters
+from models.model_journey import Journey
+from models.model_journey_status import JourneyStatus
+from models.model_leaderboard import (
+    CompanyLeaderboardEntry,
+    LeaderboardMetric,
+    LeaderboardPeriod,
+)
+from models.model_user import Users
+
+
+_KEY_COLUMNS = ("id_company", "period", "bucket_start", "id_user")
+_COUNTER_COLUMNS = ("total_journeys", "total_distance_km", "total_score")
+
+# Taille des paquets lus / écrits lors d'une reconstruction
+REBUILD_CHUNK_SIZE = 5000
+
+DEFAULT_LEADERBOARD_SIZE = 10
+MAX_LEADERBOARD_SIZE = 100
+
+
+def bucket_start(period: LeaderboardPeriod, day: date) -> date:
+    """Retourne le premier jour de la fenêtre `period` contenant `day`."""
+    if period == LeaderboardPeriod.week:
+        return day - timedelta(days=day.weekday())
+    if period == LeaderboardPeriod.month:
+        return day.replace(day=1)
+    return day
+
+
+def leaderboard_deltas(
+    id_company: int,
+    id_user: int,
+    time_departure: datetime,
+    distance_km: float,
+    score_journey: Optional[int],
+    sign: int = 1
+) -> list[dict]:
+    """
+    Construit les deltas de classement d'un trajet validé (un par période).
+
+    Args:
+        id_company: ID de l'entreprise de l'utilisateur
+        id_user: ID de l'utilisateur
+        time_departure: Date de départ du trajet (détermine les fenêtres)
+        distance_km: Distance du trajet
+        score_journey: Score du trajet
+        sign: +1 pour un trajet comptabilisé, -1 pour un trajet retiré
+
+    Returns:
+        list[dict]: Deltas à passer à `apply_leaderboard_deltas`
+    """
+    day = time_departure.date()
+    return [
+        {
+            "id_company": id_company,
+            "period": period,
+            "bucket_start": bucket_start(period, day),
+            "id_user": id_user,
+            "total_journeys": sign,
+            "total_distance_km": sign * distance_km,
+            "total_score": sign * (score_journey or 0),
+        }
+        for period in LeaderboardPeriod
+    ]
+
+
+def apply_leaderboard_deltas(session: Session, deltas: list[dict]) -> None:
+    """
+    Applique des deltas de classement sans commit.
+
+    Args:
+        session: Session SQLModel
+        deltas: Deltas produits par `leaderboard_deltas`
+    """
+    increment_counters(
+        session,
+        CompanyLeaderboardEntry.__table__,
+        _KEY_COLUMNS,
+        _COUNTER_COLUMNS,
+        deltas,
+    )
+
+
+def get_company_leaderboard(
+    session: Session,
+    company_id: int,
+    period: LeaderboardPeriod,
+    metric: LeaderboardMetric,
+    limit: int = DEFAULT_LEADERBOARD_SIZE,
+    day: Optional[date] = None
+) -> dict:
+    """
+    Retourne le top K des employés d'une entreprise sur une fenêtre.
+
+    Args:
+        session: Session SQLModel
+        company_id: ID de l'entreprise
+        period: Fenêtre du classement (jour, semaine, mois)
+        metric: Critère de classement (score ou distance)
+        limit: Nombre d'employés retournés (K)
+        day: Jour inclus dans la fenêtre (aujourd'hui par défaut)
+
+    Returns:
+        dict: Classement (fenêtre et lignes classées)
+    """
+    limit = max(1, min(limit, MAX_LEADERBOARD_SIZE))
+    start = bucket_start(period, day or datetime.utcnow().date())
+
+    if metric == LeaderboardMetric.distance:
+        order_column = CompanyLeaderboardEntry.total_distance_km
+    else:
+        order_column = CompanyLeaderboardEntry.total_score
+
+    statement = (
+        select(CompanyLeaderboardEntry, Users.username)
+        .join(Users, Users.id == CompanyLeaderboardEntry.id_user)
+        .where(CompanyLeaderboardEntry.id_company == company_id)
+        .where(CompanyLeaderboardEntry.period == period)
+        .where(CompanyLeaderboardEntry.bucket_start == start)
+        .where(CompanyLeaderboardEntry.total_journeys > 0)
+        .order_by(order_column.desc(), CompanyLeaderboardEntry.id_user)
+        .limit(limit)
+    )
+
+    entries = [
+        {
+            "rank": rank,
+            "id_user": entry.id_user,
+            "username": username,
+            "total_journeys": entry.total_journeys,
+            "total_distance_km": round(entry.total_distance_km, 2),
+            "total_score": entry.total_score,
+        }
+        for rank, (entry, username) in enumerate(session.exec(statement).all(), start=1)
+    ]
+
+    return {
+        "id_company": company_id,
+        "period": period,
+        "metric": metric,
+        "bucket_start": start,
+        "entries": entries,
+    }
+
+
+
+async def get_company_leaderboard_async(
+    session: AsyncSession,
+    company_id: int,
+    period: LeaderboardPeriod,
+    metric: LeaderboardMetric,
+    limit: int = DEFAULT_LEADERBOARD_SIZE,
+    day: Optional[date] = None
+) -> dict:
+    """Version asynchrone de `get_company_leaderboard`."""
+    return await session.run_sync(get_company_leaderboard, company_id, period, metric, limit, day)
+
+def delete_user_leaderboard_entries(session: Session, user_id: int) -> None:
+    """Supprime les lignes de classement d'un utilisateur (sans commit)."""
+    session.exec(
+        delete(CompanyLeaderboardEntry).where(CompanyLeaderboardEntry.id_user == user_id)
+    )
+
+
+def delete_company_leaderboard_entries(session: Session, company_id: int) -> None:
+    """Supprime les lignes de classement d'une entreprise (sans commit)."""
+    session.exec(
+        delete(CompanyLeaderboardEntry)
+        .where(CompanyLeaderboardEntry.id_company == company_id)
+    )
+
+
+def rebuild_company_leaderboards(
+    session: Session,
+    company_id: Optional[int] = None
+) -> None:
+    """
+    Recalcule les classements depuis la table `journey`.
+
+    Les trajets validés des employés sont lus par paquets (curseur côté
+    serveur), agrégés en mémoire par fenêtre, puis réinsérés par paquets
+    dans une seule transaction, qui commence par retirer la partie
+    classements des événements en attente du périmètre.
+
+    Args:
+        session: Session SQLModel
+        company_id: ID de l'entreprise à reconstruire (toutes si None)
+    """
+    clear = delete(CompanyLeaderboardEntry)
+    statement = (
+        select(
+            Users.id_company,
+            Journey.id_user,
+            Journey.time_departure,
+            Journey.distance_km,
+            Journey.score_journey,
+        )
+        .join(Users, Users.id == Journey.id_user)
+        .where(Journey.status == JourneyStatus.VALIDATED)
+        .where(Users.id_company.is_not(None))
+    )
+    if company_id is not None:
+        clear = clear.where(CompanyLeaderboardEntry.id_company == company_id)
+        statement = statement.where(Users.id_company == company_id)
+
+    withdraw_pending_events(
+        session, JOURNEY_AGGREGATES_TOPIC, JOURNEY_AGGREGATES_PARTS, "leaderboard",
+        id_company=company_id,
+    )
+    totals: dict[tuple, dict] = {}
+    rows = session.exec(statement.execution_options(yield_per=REBUILD_CHUNK_SIZE))
+    for row in rows:
+        for delta in leaderboard_deltas(*row):
+            key = tuple(delta[column] for column in _KEY_COLUMNS)
+            entry = totals.get(key)
+            if entry is None:
+                totals[key] = delta
+                continue
+            for column in _COUNTER_COLUMNS:
+                entry[column] += delta[column]
+
+    session.exec(clear)
+    entries = list(totals.values())
+    table = CompanyLeaderboardEntry.__table__
+    for offset in range(0, len(entries), REBUILD_CHUNK_SIZE):
+        session.exec(table.insert(), params=entries[offset:offset + REBUILD_CHUNK_SIZE])
+    session.commit()
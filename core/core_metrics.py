@@ -0,0 +1,348 @@
+"""
+Instrumentation des requêtes HTTP : latence, temps SQL et nombre de requêtes.
+
+Le middleware HTTP (api.py) ouvre un `RequestStats` par requête, stocké dans
+une ContextVar. Les hooks SQLAlchemy installés sur les moteurs
+(`instrument_engine`) y ajoutent la durée de chaque requête SQL ; la
+ContextVar est propagée au threadpool (endpoints synchrones) comme aux
+greenlets de `AsyncSession.run_sync`.
+
+En fin de requête, les mesures alimentent des histogrammes par route,
+exposés au format Prometheus sur `/metrics`, et l'en-tête `Server-Timing`.
+
+Si SLOW_REQUEST_MS est défini, les requêtes plus lentes sont journalisées
+avec le SQL exécuté.
+
+Les métriques sont locales au processus : chaque worker uvicorn expose les
+siennes.
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Seuil du journal des requêtes lentes (0 : désactivé)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 0))
+# Nombre maximal de requêtes SQL conservées pour le journal
+SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", 50))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OUTBOX_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+# Route des requêtes sans correspondance (évite une série par URL inconnue)
+UNMATCHED_ROUTE = "unmatched"
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Mesures SQL d'une requête HTTP en cours."""
+
+    __slots__ = ("db_time", "statements", "queries")
+
+    def __init__(self, capture_queries: bool = False):
+        self.db_time = 0.0
+        self.statements = 0
+        self.queries: Optional[list[tuple[float, str]]] = [] if capture_queries else None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.db_time += elapsed
+        self.statements += 1
+        if self.queries is not None and len(self.queries) < SLOW_REQUEST_MAX_STATEMENTS:
+            self.queries.append((elapsed, statement))
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Histogramme cumulatif au format Prometheus, une série par jeu de labels."""
+
+    def __init__(self, name: str, description: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # compteurs par bucket (+Inf en dernier), somme, total
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total, count)
+                      for labels, (counts, total, count) in self._series.items()]
+
+        for label_values, counts, total, count in sorted(series):
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{{{labels},{le}}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    """Compteur au format Prometheus, une série par jeu de labels."""
+
+    def __init__(self, name: str, description: str, labels: tuple):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._series: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, value in series:
+            lines.append(f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latence des requetes HTTP par route",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Temps passe dans les requetes SQL par requete HTTP",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "Nombre de requetes SQL par requete HTTP",
+    ("method", "route"),
+    STATEMENT_BUCKETS,
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "Nombre de requetes HTTP par route et code de statut",
+    ("method", "route", "status"),
+)
+
+OUTBOX_JOB_LATENCY = Histogram(
+    "outbox_job_latency_seconds",
+    "Delai entre l'ecriture d'un evenement outbox et la fin de son traitement",
+    ("topic",),
+    OUTBOX_LATENCY_BUCKETS,
+)
+OUTBOX_JOB_DURATION = Histogram(
+    "outbox_job_duration_seconds",
+    "Duree de traitement d'un lot d'evenements outbox",
+    ("topic",),
+    LATENCY_BUCKETS,
+)
+OUTBOX_JOBS_TOTAL = Counter(
+    "outbox_jobs_total",
+    "Evenements outbox traites par resultat (processed, retried, failed)",
+    ("topic", "result"),
+)
+
+RATE_LIMITED_TOTAL = Counter(
+    "http_rate_limited_total",
+    "Requetes HTTP refusees (429) par classe de route et cle de limite (user, ip)",
+    ("route_class", "scope"),
+)
+
+_METRICS = (
+    REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_DB_STATEMENTS, REQUESTS_TOTAL,
+    OUTBOX_JOB_LATENCY, OUTBOX_JOB_DURATION, OUTBOX_JOBS_TOTAL, RATE_LIMITED_TOTAL,
+)
+
+
+# ---------------------------------------------------------------------------
+# Hooks SQLAlchemy
+# ---------------------------------------------------------------------------
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    # Une requête en erreur ne passe pas par after_cursor_execute
+    starts = exception_context.connection and exception_context.connection.info.get("query_start")
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(db_engine: Engine) -> None:
+    """
+    Installe les hooks de mesure SQL sur un moteur synchrone.
+
+    Pour un moteur asynchrone, passer `async_engine.sync_engine`.
+    """
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db_engine, "handle_error", _handle_error)
+
+
+# ---------------------------------------------------------------------------
+# Cycle de vie d'une requête HTTP
+# ---------------------------------------------------------------------------
+
+
+def start_request() -> RequestStats:
+    """Ouvre les mesures de la requête courante (appelé par le middleware)."""
+    stats = RequestStats(capture_queries=SLOW_REQUEST_MS > 0)
+    _request_stats.set(stats)
+    return stats
+
+
+def finish_request(
+    stats: RequestStats,
+    method: str,
+    route: Optional[str],
+    status_code: int,
+    elapsed: float
+) -> str:
+    """
+    Enregistre les mesures d'une requête terminée.
+
+    Args:
+        stats: Mesures ouvertes par `start_request`
+        method: Méthode HTTP
+        route: Modèle de chemin de la route (ex. /journey/{journey_id})
+        status_code: Code de statut de la réponse
+        elapsed: Durée totale de la requête en secondes
+
+    Returns:
+        str: Valeur de l'en-tête Server-Timing
+    """
+    labels = (method, route or UNMATCHED_ROUTE)
+    REQUEST_DURATION.observe(labels, elapsed)
+    REQUEST_DB_DURATION.observe(labels, stats.db_time)
+    REQUEST_DB_STATEMENTS.observe(labels, stats.statements)
+    REQUESTS_TOTAL.inc((*labels, status_code))
+
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        _log_slow_request(stats, labels, elapsed)
+
+    return (
+        f"app;dur={elapsed * 1000:.1f}, "
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} statements"'
+    )
+
+
+def _log_slow_request(stats: RequestStats, labels: tuple, elapsed: float) -> None:
+    lines = [
+        f"Slow request {labels[0]} {labels[1]}: {elapsed * 1000:.1f} ms "
+        f"(db {stats.db_time * 1000:.1f} ms, {stats.statements} statements)"
+    ]
+    for query_elapsed, statement in stats.queries or ():
+        lines.append(f"  [{query_elapsed * 1000:.1f} ms] {' '.join(statement.split())}")
+    if stats.statements > len(stats.queries or ()):
+        lines.append(f"  ... {stats.statements - len(stats.queries or ())} more")
+    logger.warning("\n".join(lines))
+
+
+# Métriques exportées depuis `get_pool_status` : (clé, nom, type, description).
+# Les attentes sont cumulées depuis le démarrage du worker : compteurs.
+_POOL_METRICS = (
+    ("checked_out", "db_pool_checked_out", "gauge", "Connexions empruntees au pool"),
+    ("checked_in", "db_pool_checked_in", "gauge", "Connexions disponibles dans le pool"),
+    ("overflow", "db_pool_overflow", "gauge", "Connexions ouvertes au-dela de pool_size"),
+    ("wait_count", "db_pool_wait_total", "counter", "Nombre d'attentes d'une connexion"),
+    ("wait_time_total_ms", "db_pool_wait_milliseconds_total", "counter",
+     "Temps cumule d'attente d'une connexion"),
+)
+
+
+def pool_metric_lines(pool_status: dict) -> list[str]:
+    """
+    Convertit l'état des pools (`core.database.get_pool_status`) en jauges et compteurs.
+
+    Args:
+        pool_status: Etat par moteur ({"sync": {...}, "async": {...}})
+
+    Returns:
+        list[str]: Lignes au format texte Prometheus
+    """
+    lines = []
+    for key, name, metric_type, description in _POOL_METRICS:
+        series = [
+            (engine_name, status[key])
+            for engine_name, status in sorted(pool_status.items())
+            if key in status
+        ]
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(f'{name}{{engine="{engine_name}"}} {value}' for engine_name, value in series)
+    return lines
+
+
+def outbox_metric_lines(outbox_status: dict) -> list[str]:
+    """
+    Convertit l'état de l'outbox (`core.core_outbox.get_outbox_status`) en jauges.
+
+    Contrairement aux autres métriques, ces valeurs sont lues en base :
+    elles sont communes à tous les workers.
+    """
+    gauges = (
+        ("pending", "outbox_pending_events", "Evenements outbox en attente de traitement"),
+        ("failed", "outbox_failed_events", "Evenements outbox abandonnes"),
+        ("oldest_pending_seconds", "outbox_oldest_pending_seconds",
+         "Age de l'evenement outbox en attente le plus ancien"),
+    )
+    lines = []
+    for key, name, description in gauges:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {outbox_status[key]}")
+    return lines
+
+
+def render_metrics(extra_lines: tuple = ()) -> str:
+    """Exporte toutes les métriques au format texte Prometheus."""
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,350 @@
+"""
+File de traitements différés (outbox transactionnelle).
+
+Une écriture (ex. création d'un trajet) ajoute un événement à la table
+`outbox_event` dans sa propre transaction : la requête se termine dès que
+la ligne et l'événement sont durables, et le travail dérivé (statistiques,
+classements, plus tard notifications) est exécuté ensuite par un pool de
+threads lancé avec l'application (OUTBOX_WORKERS par worker uvicorn).
+
+Traitement d'un lot :
+
+- sélection des événements échus (`FOR UPDATE SKIP LOCKED` sous
+  PostgreSQL : plusieurs workers se partagent la file sans attente)
+- suppression (`DELETE ... RETURNING`) : seuls les événements effectivement
+  supprimés par ce worker sont traités
+- exécution des handlers et commit dans la même transaction : l'effet d'un
+  événement est appliqué exactement une fois
+
+Si un handler échoue, le lot est annulé puis rejoué avec un savepoint par
+événement ; l'événement en échec est reprogrammé, dans la transaction qui l'a
+obtenu, avec un délai exponentiel
+(OUTBOX_RETRY_BASE_SECONDS x 2^tentatives, plafonné, avec gigue), puis
+abandonné (`failed_at`) après OUTBOX_MAX_ATTEMPTS tentatives.
+
+    python manage.py process-outbox [--retry-failed]
+
+Une reconstruction d'agrégats (statistiques, classements) retire d'abord sa
+partie des événements non traités de son périmètre (`withdraw_pending_events`),
+dans sa propre transaction : un trajet lu par la reconstruction n'est pas
+compté une seconde fois par son événement.
+
+Profondeur de la file et latence de traitement sont exposées sur `/metrics`.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, insert, text, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.core_metrics import OUTBOX_JOB_DURATION, OUTBOX_JOB_LATENCY, OUTBOX_JOBS_TOTAL
+from core.database import engine
+from models.model_outbox import OutboxEvent
+
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 2))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+# Délai maximal entre deux lectures de la file sans notification
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 1))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", 1))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", 300))
+
+# Événements de trajets (core_journey) et agrégats qu'ils mettent à jour
+JOURNEY_AGGREGATES_TOPIC = "journey.aggregates"
+JOURNEY_AGGREGATES_PARTS = ("statistics", "leaderboard")
+
+logger = logging.getLogger(__name__)
+
+# Handler par sujet : appelé dans la transaction qui supprime l'événement
+_handlers: dict[str, Callable[[Session, dict], None]] = {}
+
+_wakeup = threading.Event()
+_stop = threading.Event()
+_threads: list[threading.Thread] = []
+
+
+def register_outbox_handler(topic: str, handler: Callable[[Session, dict], None]) -> None:
+    """Associe un handler `handler(session, payload)` à un sujet (sans commit)."""
+    _handlers[topic] = handler
+
+
+def enqueue_event(session: Session, topic: str, payload: dict) -> None:
+    """
+    Ajoute un événement à la transaction en cours (sans commit).
+
+    Appeler `notify_outbox()` après le commit pour un traitement immédiat.
+    """
+    session.add(OutboxEvent(topic=topic, payload=payload))
+
+
+def notify_outbox() -> None:
+    """Réveille les threads de traitement (sinon au plus OUTBOX_POLL_SECONDS d'attente)."""
+    _wakeup.set()
+
+
+def retry_delay(attempts: int) -> float:
+    """Délai avant la tentative suivante : exponentiel, plafonné, avec gigue."""
+    delay = min(OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _claim_events(session: Session, limit: int) -> list[dict]:
+    """Sélectionne puis supprime des événements échus ; retourne ceux obtenus."""
+    due = (
+        OutboxEvent.failed_at.is_(None),
+        OutboxEvent.available_at <= datetime.utcnow(),
+    )
+    events = session.exec(
+        select(OutboxEvent)
+        .where(*due)
+        .order_by(OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not events:
+        return []
+
+    snapshots = {event.id: event.model_dump() for event in events}
+    # Les conditions sont réévaluées : un événement reprogrammé entre-temps
+    # par un autre worker (SQLite, sans verrou de ligne) n'est pas obtenu
+    claimed = session.exec(
+        delete(OutboxEvent)
+        .where(OutboxEvent.id.in_(list(snapshots)))
+        .where(*due)
+        .returning(OutboxEvent.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    return [snapshots[event_id] for event_id in sorted(claimed)]
+
+
+def _handle(session: Session, event: dict) -> None:
+    handler = _handlers.get(event["topic"])
+    if handler is None:
+        raise RuntimeError(f"No outbox handler registered for topic {event['topic']}")
+    handler(session, event["payload"])
+
+
+def _requeue(session: Session, event: dict, error: Exception) -> str:
+    """
+    Réinsère un événement en échec (sans commit), reprogrammé ou abandonné.
+
+    Returns:
+        str: "retried" ou "failed" (après OUTBOX_MAX_ATTEMPTS tentatives)
+    """
+    event["attempts"] += 1
+    event["last_error"] = f"{type(error).__name__}: {error}"[:500]
+    if event["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+        event["failed_at"] = datetime.utcnow()
+        result = "failed"
+    else:
+        event["available_at"] = datetime.utcnow() + timedelta(seconds=retry_delay(event["attempts"]))
+        result = "retried"
+    session.exec(insert(OutboxEvent.__table__).values(**event))
+    return result
+
+
+def _record_results(events: list[dict], results: list[str], started: float) -> None:
+    finished = datetime.utcnow()
+    elapsed = time.perf_counter() - started
+    for topic in {event["topic"] for event in events}:
+        OUTBOX_JOB_DURATION.observe((topic,), elapsed)
+    for event, result in zip(events, results):
+        OUTBOX_JOBS_TOTAL.inc((event["topic"], result))
+        if result == "processed":
+            OUTBOX_JOB_LATENCY.observe((event["topic"],), (finished - event["created_at"]).total_seconds())
+        else:
+            logger.warning(
+                "Outbox event %s (%s) %s: %s",
+                event["id"], event["topic"], result, event["last_error"],
+            )
+
+
+def process_outbox_batch(batch_size: int = OUTBOX_BATCH_SIZE, isolate: bool = False) -> int:
+    """
+    Traite un lot d'événements échus dans une seule transaction.
+
+    Si un handler échoue, la transaction est annulée et un nouveau lot est
+    traité avec un savepoint par événement (`isolate`) : seul l'événement en
+    échec est réinséré, avec son nombre de tentatives, dans la transaction
+    qui l'a obtenu.
+
+    Returns:
+        int: Nombre d'événements obtenus (traités, reprogrammés ou abandonnés)
+    """
+    with Session(engine) as session:
+        started = time.perf_counter()
+        events = _claim_events(session, batch_size)
+        if not events:
+            return 0
+
+        results = []
+        try:
+            for event in events:
+                if not isolate:
+                    _handle(session, event)
+                    results.append("processed")
+                    continue
+                try:
+                    with session.begin_nested():
+                        _handle(session, event)
+                    results.append("processed")
+                except Exception as e:
+                    results.append(_requeue(session, event, e))
+            session.commit()
+        except Exception:
+            if isolate:
+                raise
+            session.rollback()
+            return process_outbox_batch(batch_size, isolate=True)
+
+    _record_results(events, results, started)
+    return len(events)
+
+
+def drain_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Traite les événements échus jusqu'à vider la file (hors reprogrammés).
+
+    Returns:
+        int: Nombre d'événements obtenus
+    """
+    total = 0
+    while True:
+        count = process_outbox_batch(batch_size)
+        if count == 0:
+            return total
+        total += count
+
+
+def withdraw_pending_events(
+    session: Session,
+    topic: str,
+    parts: tuple[str, ...],
+    part: str,
+    **payload_filters: Optional[int]
+) -> int:
+    """
+    Retire une partie du traitement des événements non traités d'un sujet (sans commit).
+
+    À appeler en tête de la transaction d'une reconstruction, avant la
+    lecture des données sources. Les événements du périmètre (en attente ou
+    abandonnés) sont supprimés, puis réécrits avec `part` dans
+    `payload["skip"]` s'il leur reste une autre partie : le handler ne doit
+    plus appliquer que celle-ci.
+
+    Sous PostgreSQL, la table est d'abord verrouillée (SHARE ROW EXCLUSIVE)
+    jusqu'au commit : les transactions qui ont écrit un événement (écriture
+    de trajet, lot d'un worker) sont attendues, les suivantes attendent la
+    reconstruction. Toute donnée source visible par la reconstruction a donc
+    son événement parmi ceux retirés. Sous SQLite, la suppression prend le
+    verrou d'écriture de la base avec le même effet.
+
+    Args:
+        session: Session SQLModel
+        topic: Sujet des événements
+        parts: Parties traitées par le handler du sujet
+        part: Partie reconstruite
+        payload_filters: Périmètre, par valeur entière du payload (ignoré si None)
+
+    Returns:
+        int: Nombre d'événements concernés
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        session.exec(text("LOCK TABLE outbox_event IN SHARE ROW EXCLUSIVE MODE"))
+
+    table = OutboxEvent.__table__
+    statement = table.delete().where(table.c.topic == topic)
+    for key, value in payload_filters.items():
+        if value is not None:
+            statement = statement.where(table.c.payload[key].as_integer() == value)
+    events = session.exec(statement.returning(*table.c)).mappings().all()
+
+    remaining = []
+    for event in events:
+        skip = sorted(set(event["payload"].get("skip", ())) | {part})
+        if set(parts) - set(skip):
+            remaining.append({**event, "payload": {**event["payload"], "skip": skip}})
+    if remaining:
+        session.exec(table.insert(), params=remaining)
+    return len(events)
+
+
+def retry_failed_events(session: Session) -> int:
+    """Remet en file les événements abandonnés (tentatives remises à zéro)."""
+    result = session.exec(
+        update(OutboxEvent)
+        .where(OutboxEvent.failed_at.is_not(None))
+        .values(failed_at=None, attempts=0, available_at=datetime.utcnow())
+    )
+    session.commit()
+    return result.rowcount
+
+
+def get_outbox_status(session: Session) -> dict:
+    """
+    Profondeur de la file (commune à tous les workers).
+
+    Returns:
+        dict: Événements en attente, abandonnés et âge du plus ancien en attente
+    """
+    rows = session.exec(
+        select(
+            OutboxEvent.failed_at.is_(None),
+            func.count(),
+            func.min(OutboxEvent.created_at),
+        ).group_by(OutboxEvent.failed_at.is_(None))
+    ).all()
+    status = {"pending": 0, "failed": 0, "oldest_pending_seconds": 0.0}
+    for pending, count, oldest in rows:
+        if pending:
+            status["pending"] = count
+            status["oldest_pending_seconds"] = round(
+                (datetime.utcnow() - oldest).total_seconds(), 3
+            )
+        else:
+            status["failed"] = count
+    return status
+
+
+
+async def get_outbox_status_async(session: AsyncSession) -> dict:
+    """Version asynchrone de `get_outbox_status`."""
+    return await session.run_sync(get_outbox_status)
+
+def _worker_loop() -> None:
+    while not _stop.is_set():
+        try:
+            count = process_outbox_batch()
+        except Exception:
+            logger.exception("Outbox worker error")
+            count = 0
+        if count == 0:
+            # File vide : attendre une notification ou le prochain passage
+            _wakeup.wait(OUTBOX_POLL_SECONDS)
+            _wakeup.clear()
+
+
+def start_outbox_workers(workers: int = OUTBOX_WORKERS) -> None:
+    """Démarre les threads de traitement (appelé au démarrage de l'application)."""
+    _stop.clear()
+    for index in range(workers):
+        thread = threading.Thread(target=_worker_loop, name=f"outbox-{index}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_outbox_workers(timeout: float = 10) -> None:
+    """Arrête les threads de traitement après leur lot en cours."""
+    _stop.set()
+    _wakeup.set()
+    for thread in _threads:
+        thread.join(timeout)
+    _threads.clear()
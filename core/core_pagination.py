@@ -0,0 +1,86 @@
+"""
+Pagination par clé (keyset) et estimation du nombre de lignes.
+
+Un curseur est la liste des valeurs de la clé de tri du dernier élément
+d'une page, encodée en JSON puis en base64 url-safe (sans padding) : il est
+opaque pour le client, qui le renvoie tel quel pour la page suivante.
+
+Le nombre total d'éléments d'une liste filtrée est estimé sans COUNT(*)
+(qui parcourt toutes les lignes concernées) sous PostgreSQL :
+
+- sans filtre : `pg_class.reltuples`, tenu à jour par VACUUM / ANALYZE
+- avec filtres : estimation du planificateur (`EXPLAIN (FORMAT JSON)`)
+
+Les autres SGBD (SQLite en développement) exécutent un COUNT(*).
+"""
+
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import func, text
+from sqlmodel import Session, SQLModel, select
+
+
+def encode_cursor(values: list) -> str:
+    """Encode les valeurs de la clé de tri en curseur opaque."""
+    raw = json.dumps(values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Décode un curseur produit par `encode_cursor`.
+
+    Args:
+        cursor: Curseur reçu du client
+        size: Nombre de valeurs attendues
+
+    Returns:
+        list: Valeurs de la clé de tri (types JSON)
+
+    Raises:
+        HTTPException: 400 si le curseur est invalide
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(400, "Invalid cursor")
+    return values
+
+
+def estimate_count(session: Session, model: type[SQLModel], statement) -> int:
+    """
+    Estime le nombre de lignes d'une requête de liste (sans limite ni curseur).
+
+    Args:
+        session: Session SQLModel
+        model: Modèle de la table lue (`pg_class.reltuples` sans filtre)
+        statement: Requête filtrée
+
+    Returns:
+        int: Estimation sous PostgreSQL, nombre exact sinon
+    """
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return session.exec(select(func.count()).select_from(statement.subquery())).one()
+
+    if statement.whereclause is None:
+        reltuples = session.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": model.__tablename__},
+        ).scalar()
+        # -1 : table jamais analysée
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    # Les filtres sont des entiers, enums et dates : rendus en littéraux
+    compiled = statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+    if isinstance(plan, str):
+        # asyncpg retourne le JSON sans le décoder
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,369 @@
+"""
+Partitionnement mensuel de la table `journey` et archivage de l'historique
+ancien (PostgreSQL uniquement).
+
+La table `journey` partitionnée est découpée par mois de `time_departure`
+(`journey_2025_01`, `journey_2025_02`, ...) ; une partition par défaut
+(`journey_default`) reçoit les trajets hors des mois créés. Les requêtes
+bornées sur `time_departure` (pagination par curseur, filtre `since`) ne
+lisent que les partitions concernées (partition pruning).
+
+Contraintes du partitionnement PostgreSQL : la clé primaire devient
+(id, time_departure) et l'index unique d'idempotence inclut
+`time_departure` (un renvoi du même trajet a le même départ).
+
+    python manage.py partition-journeys         # migration (une seule fois)
+    python manage.py ensure-journey-partitions  # mois à venir (aussi au démarrage)
+    python manage.py archive-journeys [--drop]  # export Parquet puis détachement
+
+Les partitions archivées sont exportées en Parquet (zstd) dans
+JOURNEY_ARCHIVE_DIR puis détachées : elles ne sont plus lues par l'API.
+Statistiques et classements, tenus à jour par incréments, les comptent
+toujours, mais une reconstruction (rebuild-statistics, rebuild-leaderboards,
+rescore) ne porte que sur les partitions attachées.
+"""
+
+import os
+import re
+from datetime import date, datetime
+from typing import Callable, Optional
+
+from sqlalchemy import DateTime, Float, Integer, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from core.core_response_cache import JOURNEYS_VERSION, bump_all_data_versions
+from models.model_journey import Journey
+
+
+# Nombre de mois à venir pour lesquels une partition est créée à l'avance
+JOURNEY_PARTITIONS_AHEAD = int(os.getenv("JOURNEY_PARTITIONS_AHEAD", 3))
+# Âge (en mois) au-delà duquel une partition est archivée puis détachée
+JOURNEY_ARCHIVE_AFTER_MONTHS = int(os.getenv("JOURNEY_ARCHIVE_AFTER_MONTHS", 24))
+JOURNEY_ARCHIVE_DIR = os.getenv("JOURNEY_ARCHIVE_DIR", "archives")
+
+DEFAULT_PARTITION = "journey_default"
+ARCHIVE_BATCH_SIZE = 50000
+
+_PARTITION_NAME = re.compile(r"^journey_(\d{4})_(\d{2})$")
+# Verrou consultatif : un seul worker crée les partitions à la fois
+_PARTITION_LOCK_ID = 0x6A6F75726E6579
+
+
+def _require_postgres(session: Session) -> None:
+    if session.get_bind().dialect.name != "postgresql":
+        raise RuntimeError("Journey partitioning requires PostgreSQL")
+
+
+def _month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Nom de la partition d'un mois (ex. journey_2025_01)."""
+    return f"journey_{month:%Y_%m}"
+
+
+def is_journey_partitioned(session: Session) -> bool:
+    """Indique si la table `journey` est partitionnée (toujours faux hors PostgreSQL)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    return session.connection().execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('journey')"
+    )).first() is not None
+
+
+def list_journey_partitions(session: Session) -> list[tuple[str, date]]:
+    """
+    Liste les partitions mensuelles attachées à `journey`.
+
+    Returns:
+        list[tuple[str, date]]: (nom, premier jour du mois), du plus ancien au
+        plus récent (sans la partition par défaut)
+    """
+    names = session.connection().execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass('journey')"
+    )).scalars()
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def _create_month_partition(connection: Connection, month: date) -> str:
+    """
+    Crée et attache la partition d'un mois (sans commit).
+
+    Les trajets de ce mois déjà présents dans la partition par défaut y sont
+    déplacés avant l'attachement (sinon PostgreSQL refuse la partition).
+    """
+    name = partition_name(month)
+    start, end = month, _add_months(month, 1)
+    connection.exec_driver_sql(
+        f'CREATE TABLE "{name}" (LIKE journey INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE time_departure >= :start AND time_departure < :end RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        {"start": start, "end": end},
+    )
+    connection.exec_driver_sql(
+        f'ALTER TABLE journey ATTACH PARTITION "{name}" '
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+    return name
+
+
+def _create_missing_partitions(connection: Connection, first: date, last: date, existing: set) -> list[str]:
+    created = []
+    month = first
+    while month <= last:
+        if month not in existing:
+            created.append(_create_month_partition(connection, month))
+        month = _add_months(month, 1)
+    return created
+
+
+def ensure_journey_partitions(
+    session: Session,
+    months_ahead: int = JOURNEY_PARTITIONS_AHEAD
+) -> list[str]:
+    """
+    Crée les partitions du mois courant et des `months_ahead` mois suivants.
+
+    Sans effet si `journey` n'est pas partitionnée. Plusieurs workers peuvent
+    l'appeler en même temps (verrou consultatif transactionnel).
+
+    Args:
+        session: Session SQLModel
+        months_ahead: Nombre de mois à venir à préparer
+
+    Returns:
+        list[str]: Partitions créées
+    """
+    if not is_journey_partitioned(session):
+        return []
+
+    connection = session.connection()
+    connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": _PARTITION_LOCK_ID})
+    existing = {month for _, month in list_journey_partitions(session)}
+    current = _month_start(datetime.utcnow())
+    created = _create_missing_partitions(
+        connection, current, _add_months(current, months_ahead), existing
+    )
+    session.commit()
+    return created
+
+
+def partition_journey_table(
+    session: Session,
+    months_ahead: int = JOURNEY_PARTITIONS_AHEAD,
+    keep_old_table: bool = False
+) -> dict:
+    """
+    Convertit la table `journey` en table partitionnée par mois.
+
+    La migration se fait dans une seule transaction, table verrouillée
+    (ACCESS EXCLUSIVE) : l'API est bloquée sur les trajets pendant la copie.
+    L'ancienne table est renommée `journey_unpartitioned` (ses index aussi),
+    la nouvelle reprend colonnes, valeurs par défaut, séquence des
+    identifiants, clé étrangère et index du modèle, puis les lignes sont
+    copiées en un seul INSERT ... SELECT.
+
+    Args:
+        session: Session SQLModel
+        months_ahead: Nombre de mois à venir à préparer
+        keep_old_table: Conserve `journey_unpartitioned` après la copie
+
+    Returns:
+        dict: Lignes copiées et partitions créées
+
+    Raises:
+        RuntimeError: Si le SGBD n'est pas PostgreSQL ou si la table est déjà
+        partitionnée
+    """
+    _require_postgres(session)
+    if is_journey_partitioned(session):
+        raise RuntimeError("Table journey is already partitioned")
+
+    connection = session.connection()
+    connection.exec_driver_sql("LOCK TABLE journey IN ACCESS EXCLUSIVE MODE")
+    oldest = connection.exec_driver_sql("SELECT min(time_departure) FROM journey").scalar()
+    sequence = connection.exec_driver_sql(
+        "SELECT pg_get_serial_sequence('journey', 'id')"
+    ).scalar()
+
+    # Les noms d'index sont uniques par schéma : ceux de l'ancienne table sont renommés
+    connection.exec_driver_sql("ALTER TABLE journey RENAME TO journey_unpartitioned")
+    index_names = connection.exec_driver_sql(
+        "SELECT indexname FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = 'journey_unpartitioned'"
+    ).scalars().all()
+    for index_name in index_names:
+        connection.exec_driver_sql(
+            f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_unpartitioned"'
+        )
+
+    connection.exec_driver_sql(
+        "CREATE TABLE journey (LIKE journey_unpartitioned "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (time_departure)"
+    )
+    connection.exec_driver_sql("ALTER TABLE journey ADD PRIMARY KEY (id, time_departure)")
+    connection.exec_driver_sql(
+        "ALTER TABLE journey ADD FOREIGN KEY (id_user) REFERENCES users (id)"
+    )
+    for index in Journey.__table__.indexes:
+        if index.unique:
+            # Un index unique d'une table partitionnée contient la clé de partition
+            columns = ", ".join([column.name for column in index.columns] + ["time_departure"])
+            connection.exec_driver_sql(
+                f'CREATE UNIQUE INDEX "{index.name}" ON journey ({columns})'
+            )
+        else:
+            index.create(connection)
+
+    connection.exec_driver_sql(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF journey DEFAULT")
+    current = _month_start(datetime.utcnow())
+    first = _month_start(oldest) if oldest else current
+    partitions = _create_missing_partitions(
+        connection, min(first, current), _add_months(current, months_ahead), set()
+    )
+
+    copied = connection.exec_driver_sql(
+        "INSERT INTO journey SELECT * FROM journey_unpartitioned"
+    ).rowcount
+    if sequence:
+        connection.exec_driver_sql(f"ALTER SEQUENCE {sequence} OWNED BY journey.id")
+    if not keep_old_table:
+        connection.exec_driver_sql("DROP TABLE journey_unpartitioned")
+    connection.exec_driver_sql("ANALYZE journey")
+    session.commit()
+
+    return {"copied_rows": copied, "partitions": partitions}
+
+
+def _archive_schema():
+    """Schéma Arrow des archives, déduit des colonnes du modèle Journey."""
+    import pyarrow as pa
+
+    fields = []
+    for column in Journey.__table__.columns:
+        if isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        else:
+            # Chaînes et énumérations (valeurs brutes de la base)
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+
+def _export_partition(connection: Connection, name: str, path: str, batch_size: int) -> int:
+    """
+    Exporte une partition en Parquet par paquets (curseur côté serveur).
+
+    Le fichier est écrit sous un nom temporaire puis renommé : un fichier
+    présent est toujours complet.
+
+    Returns:
+        int: Nombre de trajets exportés
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _archive_schema()
+    columns = ", ".join(f'"{field.name}"' for field in schema)
+    result = connection.execution_options(stream_results=True).exec_driver_sql(
+        f'SELECT {columns} FROM "{name}"'
+    )
+
+    rows = 0
+    temporary_path = f"{path}.tmp"
+    with pq.ParquetWriter(temporary_path, schema, compression="zstd") as writer:
+        for chunk in result.partitions(batch_size):
+            values = list(zip(*chunk))
+            writer.write_batch(pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(values, schema)],
+                schema=schema,
+            ))
+            rows += len(chunk)
+    os.replace(temporary_path, path)
+    return rows
+
+
+def archive_journey_partitions(
+    session: Session,
+    older_than_months: int = JOURNEY_ARCHIVE_AFTER_MONTHS,
+    archive_dir: str = JOURNEY_ARCHIVE_DIR,
+    drop: bool = False,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    progress: Optional[Callable[[dict], None]] = None
+) -> list[dict]:
+    """
+    Archive les partitions entièrement plus anciennes que `older_than_months`.
+
+    Chaque partition est verrouillée en écriture (SHARE), exportée dans
+    `archive_dir/<partition>.parquet` puis détachée de `journey`, dans une
+    même transaction : aucune modification ne peut se glisser entre l'export
+    et le détachement. Un archivage interrompu peut être relancé (le fichier
+    est réécrit).
+
+    Args:
+        session: Session SQLModel
+        older_than_months: Âge minimal (en mois révolus) des partitions archivées
+        archive_dir: Répertoire des fichiers Parquet
+        drop: Supprime la table détachée (sinon elle reste en base, hors de `journey`)
+        batch_size: Lignes lues et écrites par paquet
+        progress: Appelé après chaque partition archivée
+
+    Returns:
+        list[dict]: Partition, fichier et nombre de trajets de chaque archive
+
+    Raises:
+        RuntimeError: Si le SGBD n'est pas PostgreSQL ou si `journey` n'est
+        pas partitionnée
+    """
+    _require_postgres(session)
+    if not is_journey_partitioned(session):
+        raise RuntimeError("Table journey is not partitioned, run partition-journeys first")
+
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = _add_months(_month_start(datetime.utcnow()), -older_than_months)
+
+    archives = []
+    for name, month in list_journey_partitions(session):
+        if _add_months(month, 1) > cutoff:
+            break
+
+        connection = session.connection()
+        connection.exec_driver_sql(f'LOCK TABLE "{name}" IN SHARE MODE')
+        path = os.path.join(archive_dir, f"{name}.parquet")
+        rows = _export_partition(connection, name, path, batch_size)
+        connection.exec_driver_sql(f'ALTER TABLE journey DETACH PARTITION "{name}"')
+        if drop:
+            connection.exec_driver_sql(f'DROP TABLE "{name}"')
+        # Les trajets archivés disparaissent des listes en cache
+        bump_all_data_versions(session, JOURNEYS_VERSION)
+        session.commit()
+
+        archive = {"partition": name, "path": path, "rows": rows}
+        archives.append(archive)
+        if progress:
+            progress(archive)
+    return archives
@@ -0,0 +1,222 @@
+"""
+Hashage et vérification des mots de passe (Argon2).
+
+Argon2 est volontairement coûteux en CPU et en mémoire. Pour qu'un afflux de
+connexions ne sature pas le threadpool des endpoints, les calculs sont
+exécutés dans un pool de processus de taille fixe, avec une file d'attente
+bornée : au-delà, la requête est refusée immédiatement (503 + Retry-After)
+au lieu d'attendre.
+
+Les imports en masse (`hash_passwords`) répartissent leurs hashs par paquets
+sur le pool, au plus PASSWORD_IMPORT_CONCURRENCY paquets en cours (par défaut
+un processus reste libre pour les connexions). Chaque paquet occupe une
+place de la file bornée, en l'attendant au lieu d'être refusé. Les jetons
+d'invitation, aléatoires (128 bits), n'ont pas besoin d'un hash coûteux : ils
+sont hashés avec des paramètres Argon2 minimaux (ARGON2_INVITE_MEMORY_COST).
+
+Les paramètres Argon2 sont configurables par variables d'environnement afin
+d'ajuster le compromis latence / sécurité de chaque déploiement. Les hashs
+existants restent vérifiables : leurs paramètres sont encodés dans le hash.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, TimeoutError, wait
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from passlib.hash import argon2
+
+
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))  # en KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+# Jetons d'invitation : paramètres minimaux (le secret est déjà aléatoire)
+ARGON2_INVITE_MEMORY_COST = int(os.getenv("ARGON2_INVITE_MEMORY_COST", 1024))  # en KiB
+
+# Nombre de processus dédiés (0 : calcul dans le thread appelant)
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", os.cpu_count() or 1))
+# Nombre de calculs pouvant attendre un processus libre
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", 32))
+PASSWORD_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_TIMEOUT_SECONDS", 10))
+PASSWORD_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_RETRY_AFTER_SECONDS", 2))
+# Mots de passe hashés par tâche lors d'un import en masse
+PASSWORD_BATCH_SIZE = int(os.getenv("PASSWORD_BATCH_SIZE", 16))
+# Paquets d'import en cours simultanément
+PASSWORD_IMPORT_CONCURRENCY = int(
+    os.getenv("PASSWORD_IMPORT_CONCURRENCY", max(1, PASSWORD_POOL_SIZE - 1))
+)
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+invite_hasher = argon2.using(
+    time_cost=1, memory_cost=ARGON2_INVITE_MEMORY_COST, parallelism=1
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, PASSWORD_POOL_SIZE + PASSWORD_QUEUE_SIZE))
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _hash_many(passwords: list[str], invite_tokens: bool = False) -> list[str]:
+    hasher = invite_hasher if invite_tokens else pwd_context
+    return [hasher.hash(password) for password in passwords]
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Crée le pool de processus au premier usage."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn : les processus ne dupliquent pas l'état (threads, connexions)
+                # du worker uvicorn
+                _pool = ProcessPoolExecutor(
+                    max_workers=PASSWORD_POOL_SIZE,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def _saturated() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry later",
+        headers={"Retry-After": str(PASSWORD_RETRY_AFTER_SECONDS)},
+    )
+
+
+def _submit(fn: Callable, *args, wait_for_slot: bool = False) -> Future:
+    """
+    Soumet un calcul au pool si une place est disponible.
+
+    Args:
+        fn: Calcul exécuté dans un processus du pool
+        wait_for_slot: Attendre une place au lieu de refuser (imports en masse)
+
+    Raises:
+        HTTPException: 503 avec Retry-After si le pool et sa file sont pleins
+    """
+    if not _slots.acquire(blocking=wait_for_slot):
+        raise _saturated()
+    try:
+        future = _get_pool().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _run(fn: Callable, *args):
+    if PASSWORD_POOL_SIZE <= 0:
+        return fn(*args)
+
+    future = _submit(fn, *args)
+    try:
+        return future.result(timeout=PASSWORD_TIMEOUT_SECONDS)
+    except TimeoutError:
+        raise _saturated()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash un mot de passe avec Argon2 dans le pool dédié.
+
+    Raises:
+        HTTPException: 503 si le pool est saturé
+    """
+    return _run(_hash, password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """
+    Vérifie un mot de passe contre son hash Argon2 dans le pool dédié.
+
+    Raises:
+        HTTPException: 503 si le pool est saturé
+    """
+    return _run(_verify, password, hashed_password)
+
+
+def hash_passwords(passwords: list[str], invite_tokens: bool = False) -> list[str]:
+    """
+    Hash une liste de mots de passe (import en masse) sur tous les processus du pool.
+
+    Les mots de passe sont envoyés par paquets de PASSWORD_BATCH_SIZE, au
+    plus PASSWORD_IMPORT_CONCURRENCY paquets à la fois, chacun avec une place
+    de la file bornée. Appel bloquant : à exécuter hors de la boucle
+    d'évènements.
+
+    Args:
+        passwords: Mots de passe, ou jetons d'invitation
+        invite_tokens: Jetons aléatoires, hashés avec les paramètres minimaux
+            (vérifiables par `verify_password`)
+
+    Returns:
+        list[str]: Hashs, dans l'ordre des mots de passe
+    """
+    if PASSWORD_POOL_SIZE <= 0:
+        return _hash_many(passwords, invite_tokens)
+
+    futures: list[Future] = []
+    pending: set[Future] = set()
+    for start in range(0, len(passwords), PASSWORD_BATCH_SIZE):
+        if len(pending) >= PASSWORD_IMPORT_CONCURRENCY:
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        future = _submit(
+            _hash_many,
+            passwords[start:start + PASSWORD_BATCH_SIZE],
+            invite_tokens,
+            wait_for_slot=True,
+        )
+        futures.append(future)
+        pending.add(future)
+    return [hashed for future in futures for hashed in future.result()]
+
+
+async def _run_async(fn: Callable, *args):
+    if PASSWORD_POOL_SIZE <= 0:
+        return await asyncio.to_thread(fn, *args)
+
+    future = asyncio.wrap_future(_submit(fn, *args))
+    try:
+        return await asyncio.wait_for(future, timeout=PASSWORD_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise _saturated()
+
+
+async def hash_password_async(password: str) -> str:
+    """Version asynchrone de `hash_password` (n'occupe pas la boucle d'évènements)."""
+    return await _run_async(_hash, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """Version asynchrone de `verify_password` (n'occupe pas la boucle d'évènements)."""
+    return await _run_async(_verify, password, hashed_password)
+
+
+def shutdown_password_pool() -> None:
+    """Arrête le pool de processus (à l'arrêt de l'application)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
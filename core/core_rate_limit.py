@@ -0,0 +1,302 @@
+"""
+Limitation de débit (token bucket) par utilisateur, par IP et par classe de route.
+
+Chaque requête est rattachée à une classe :
+
+- auth : `/token`, `/token/refresh`, `/token/revoke` (hash Argon2 au login)
+- write : POST, PUT, PATCH, DELETE
+- read : GET, HEAD
+
+et consomme un jeton dans le seau de l'utilisateur (claim `uid` de l'access
+token, vérification servie par le cache de core_auth) et dans celui de
+l'adresse IP, pour cette classe : les jetons ne sont pris que si tous les
+seaux de la requête en ont un (une requête refusée par la limite d'IP ne
+coûte rien à l'utilisateur). Un seau de capacité C sur une période P se
+remplit de C / P jetons par seconde : il absorbe une rafale de C requêtes
+puis limite le débit moyen à C par P. Un seau vide donne une réponse 429
+avec `Retry-After` (secondes avant le prochain jeton).
+
+Les limites sont configurées par RATE_LIMIT_<CLASSE>_<CLE> au format
+`capacite/periode_secondes` (ex. `60/60`) ; vide ou 0 : pas de limite.
+
+Le stockage des seaux est choisi par RATE_LIMIT_BACKEND :
+
+- memory (défaut) : dictionnaire LRU du processus, chaque worker uvicorn
+  applique ses propres limites
+- sqlite : fichier SQLite local (RATE_LIMIT_SQLITE_PATH) partagé par les
+  workers d'une même machine, en attendant un stockage partagé réseau
+
+Un autre stockage peut être ajouté avec `register_rate_limit_store`.
+
+Derrière un reverse proxy, lancer uvicorn avec `--proxy-headers` pour que
+l'IP du client (et non celle du proxy) soit utilisée.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+from core.core_auth import decode_token
+from core.core_metrics import RATE_LIMITED_TOTAL
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/green-mobility-rate-limit.sqlite3")
+
+AUTH_PATHS = {"/token", "/token/refresh", "/token/revoke"}
+# Scrape Prometheus (réseau interne)
+EXEMPT_PATHS = {"/metrics"}
+
+_DEFAULT_LIMITS = {
+    ("auth", "ip"): "20/60",
+    ("write", "user"): "60/60",
+    ("write", "ip"): "600/60",
+    ("read", "user"): "300/60",
+    ("read", "ip"): "3000/60",
+}
+
+
+def parse_limit(value: str) -> Optional[tuple[float, float]]:
+    """
+    Lit une limite `capacite/periode_secondes`.
+
+    Returns:
+        Optional[tuple[float, float]]: Capacité et jetons par seconde, None
+        si la limite est désactivée
+
+    Raises:
+        ValueError: Si le format est invalide
+    """
+    value = value.strip()
+    if not value or value == "0":
+        return None
+    capacity, _, period = value.partition("/")
+    capacity, period = float(capacity), float(period or 1)
+    if capacity <= 0 or period <= 0:
+        return None
+    return capacity, capacity / period
+
+
+RATE_LIMITS = {
+    key: parse_limit(os.getenv(f"RATE_LIMIT_{key[0].upper()}_{key[1].upper()}", default))
+    for key, default in _DEFAULT_LIMITS.items()
+}
+
+
+class MemoryRateLimitStore:
+    """Seaux en mémoire du processus, bornés à RATE_LIMIT_MAX_KEYS (LRU)."""
+
+    name = "memory"
+    # Appel direct depuis le middleware (pas d'E/S)
+    blocking = False
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MAX_KEYS):
+        self.maxsize = maxsize
+        # clé -> (jetons, instant de la dernière mise à jour)
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, buckets: list[tuple[str, float, float]]) -> list[float]:
+        """
+        Consomme un jeton de chaque seau, seulement si tous en ont un.
+
+        Args:
+            buckets: (clé, capacité, jetons par seconde) de chaque seau
+
+        Returns:
+            list[float]: Pour chaque seau, 0 s'il a un jeton, sinon secondes
+            avant le prochain ; aucun jeton n'est pris si l'une est non nulle
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels, waits = [], []
+            for key, capacity, rate in buckets:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - updated) * rate)
+                levels.append(tokens)
+                waits.append(0.0 if tokens >= 1 else (1 - tokens) / rate)
+            cost = 0 if any(waits) else 1
+            for (key, _, _), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens - cost, now)
+                self._buckets.move_to_end(key)
+            # Un seau évincé repart plein
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return waits
+
+
+class SQLiteRateLimitStore:
+    """
+    Seaux dans un fichier SQLite (WAL) partagé par les workers de la machine.
+
+    Chaque prise de jeton est une transaction `BEGIN IMMEDIATE` : les
+    workers se sérialisent sur le fichier. Les seaux redevenus pleins sont
+    supprimés périodiquement (colonne `full_at`).
+    """
+
+    name = "sqlite"
+    # Appel dans le threadpool (attente possible du verrou du fichier)
+    blocking = True
+
+    _PURGE_EVERY = 10000
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._calls = count()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_bucket ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL,"
+            " updated REAL NOT NULL, full_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Seaux perdus en cas de crash machine : sans conséquence
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def take(self, buckets: list[tuple[str, float, float]]) -> list[float]:
+        """Voir `MemoryRateLimitStore.take` (horloge murale, commune aux processus)."""
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            levels, waits = [], []
+            for key, capacity, rate in buckets:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM rate_limit_bucket WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+                levels.append(tokens)
+                waits.append(0.0 if tokens >= 1 else (1 - tokens) / rate)
+            cost = 0 if any(waits) else 1
+            connection.executemany(
+                "INSERT INTO rate_limit_bucket (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET"
+                " tokens = excluded.tokens, updated = excluded.updated, full_at = excluded.full_at",
+                [
+                    (key, tokens - cost, now, now + (capacity - tokens + cost) / rate)
+                    for (key, capacity, rate), tokens in zip(buckets, levels)
+                ],
+            )
+            if next(self._calls) % self._PURGE_EVERY == 0:
+                connection.execute("DELETE FROM rate_limit_bucket WHERE full_at <= ?", (now,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return waits
+
+
+_stores: dict[str, Callable[[], object]] = {
+    MemoryRateLimitStore.name: MemoryRateLimitStore,
+    SQLiteRateLimitStore.name: SQLiteRateLimitStore,
+}
+
+
+def register_rate_limit_store(name: str, factory: Callable[[], object]) -> None:
+    """Rend un stockage sélectionnable par RATE_LIMIT_BACKEND=`name`."""
+    _stores[name] = factory
+
+
+def get_rate_limit_store(name: str):
+    """
+    Instancie un stockage de seaux.
+
+    Raises:
+        RuntimeError: Si le stockage est inconnu
+    """
+    factory = _stores.get(name)
+    if factory is None:
+        raise RuntimeError(f"Unknown rate limit backend {name!r} (available: {', '.join(_stores)})")
+    return factory()
+
+
+rate_limit_store = get_rate_limit_store(RATE_LIMIT_BACKEND) if RATE_LIMIT_ENABLED else None
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Classe de limite d'une requête, None si elle n'est pas limitée."""
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    if path in AUTH_PATHS:
+        return "auth"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+def _token_user_id(authorization: Optional[str]) -> Optional[int]:
+    """`uid` d'un access token valide (cache de core_auth), None sinon."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        return decode_token(authorization[7:], expected_type="access").get("uid")
+    except HTTPException:
+        # Token invalide : la limite par IP s'applique, la route répondra 401
+        return None
+
+
+def check_rate_limit(
+    method: str,
+    path: str,
+    client_ip: Optional[str],
+    authorization: Optional[str]
+) -> Optional[int]:
+    """
+    Consomme les jetons d'une requête (utilisateur et IP, tous ou aucun).
+
+    Args:
+        method: Méthode HTTP
+        path: Chemin de la requête
+        client_ip: Adresse du client
+        authorization: En-tête Authorization
+
+    Returns:
+        Optional[int]: None si la requête est admise, sinon valeur de
+        `Retry-After` (secondes, au moins 1)
+    """
+    if rate_limit_store is None:
+        return None
+    request_class = route_class(method, path)
+    if request_class is None:
+        return None
+
+    keys = (
+        ("user", _token_user_id(authorization) if request_class != "auth" else None),
+        ("ip", client_ip),
+    )
+    scopes, buckets = [], []
+    for scope, value in keys:
+        limit = RATE_LIMITS.get((request_class, scope))
+        if limit is None or value is None:
+            continue
+        scopes.append(scope)
+        buckets.append((f"{request_class}:{scope}:{value}", *limit))
+    if not buckets:
+        return None
+
+    waits = rate_limit_store.take(buckets)
+    if not any(waits):
+        return None
+    for scope, wait in zip(scopes, waits):
+        if wait > 0:
+            RATE_LIMITED_TOTAL.inc((request_class, scope))
+    # Admise quand tous les seaux auront un jeton
+    return max(1, math.ceil(max(waits)))
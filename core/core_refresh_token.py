@@ -0,0 +1,213 @@
+"""
+Familles de refresh tokens : rotation, détection de réutilisation et révocation.
+
+Chaque connexion ouvre une famille (table `refresh_token_family`). Le refresh
+token porte l'identifiant de la famille (`fid`) et sa génération (`gen`) :
+
+- rafraîchir incrémente la génération par un seul UPDATE conditionnel
+  (famille non révoquée, non expirée, génération attendue) : deux requêtes
+  concurrentes avec le même token ne peuvent pas réussir toutes les deux
+- présenter un token d'une génération dépassée (token volé ou rejoué)
+  révoque toute la famille, y compris le dernier token émis
+- la suppression d'un utilisateur supprime ses familles : ses refresh
+  tokens sont refusés par l'UPDATE, sans requête supplémentaire
+
+Les familles révoquées sont aussi gardées en mémoire dans chaque worker
+(identifiant -> expiration), synchronisées toutes les
+REFRESH_REVOCATION_SYNC_SECONDS par un thread à partir de l'index sur
+`revoked_at` : un token révoqué est refusé sans accès à la base, et les
+access tokens d'une famille révoquée (claim `fid`) sont refusés par
+`get_current_user`. Le même thread supprime les familles expirées toutes
+les REFRESH_PURGE_INTERVAL_SECONDS.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from core.database import engine
+from models.model_refresh_token import RefreshTokenFamily
+
+
+REFRESH_REVOCATION_SYNC_SECONDS = float(os.getenv("REFRESH_REVOCATION_SYNC_SECONDS", 5))
+REFRESH_PURGE_INTERVAL_SECONDS = float(os.getenv("REFRESH_PURGE_INTERVAL_SECONDS", 3600))
+# Marge de relecture : révocations commitées après la synchronisation
+# précédente mais datées d'avant (transaction longue, horloges décalées)
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+logger = logging.getLogger(__name__)
+
+# Familles révoquées connues du worker : identifiant -> expiration
+_revoked: dict[str, datetime] = {}
+_revoked_lock = threading.Lock()
+_last_sync: Optional[datetime] = None
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def is_family_revoked(family_id: Optional[str]) -> bool:
+    """Indique si une famille est révoquée (lecture en mémoire, sans requête)."""
+    return family_id is not None and family_id in _revoked
+
+
+def _mark_revoked(families: dict[str, datetime]) -> None:
+    with _revoked_lock:
+        _revoked.update(families)
+
+
+def open_token_family(session: Session, user_id: int, expires_at: datetime) -> str:
+    """
+    Ouvre une famille pour une nouvelle connexion (sans commit).
+
+    Returns:
+        str: Identifiant de la famille (claim `fid`, génération 0)
+    """
+    family_id = uuid4().hex
+    session.add(RefreshTokenFamily(id=family_id, id_user=user_id, expires_at=expires_at))
+    return family_id
+
+
+def rotate_token_family(
+    session: Session,
+    family_id: str,
+    generation: int,
+    expires_at: datetime
+) -> Optional[int]:
+    """
+    Passe une famille à la génération suivante (sans commit).
+
+    Si le token présenté n'est pas le dernier émis, la famille est révoquée
+    dans la même transaction.
+
+    Args:
+        session: Session SQLModel
+        family_id: Claim `fid` du refresh token présenté
+        generation: Claim `gen` du refresh token présenté
+        expires_at: Expiration du nouveau refresh token
+
+    Returns:
+        Optional[int]: ID de l'utilisateur, None si le token est refusé
+    """
+    if is_family_revoked(family_id):
+        return None
+
+    now = datetime.utcnow()
+    user_id = session.exec(
+        update(RefreshTokenFamily)
+        .where(
+            RefreshTokenFamily.id == family_id,
+            RefreshTokenFamily.generation == generation,
+            RefreshTokenFamily.revoked_at.is_(None),
+            RefreshTokenFamily.expires_at > now,
+        )
+        .values(generation=generation + 1, expires_at=expires_at)
+        .returning(RefreshTokenFamily.id_user)
+    ).scalar()
+    if user_id is not None:
+        return user_id
+
+    if revoke_token_family(session, family_id):
+        logger.warning("Refresh token reuse detected, family %s revoked", family_id)
+    return None
+
+
+def revoke_token_family(session: Session, family_id: str) -> bool:
+    """
+    Révoque une famille (sans commit) ; effective dans ce worker immédiatement,
+    dans les autres après au plus REFRESH_REVOCATION_SYNC_SECONDS.
+
+    Returns:
+        bool: False si la famille n'existe pas ou était déjà révoquée
+    """
+    expires_at = session.exec(
+        update(RefreshTokenFamily)
+        .where(RefreshTokenFamily.id == family_id, RefreshTokenFamily.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .returning(RefreshTokenFamily.expires_at)
+    ).scalar()
+    if expires_at is None:
+        return False
+    _mark_revoked({family_id: expires_at})
+    return True
+
+
+def delete_user_token_families(session: Session, user_id: int) -> None:
+    """Supprime les familles d'un utilisateur (sans commit), avant sa suppression."""
+    session.exec(delete(RefreshTokenFamily).where(RefreshTokenFamily.id_user == user_id))
+
+
+def sync_revoked_families(session: Session) -> int:
+    """
+    Charge les révocations récentes et oublie les familles expirées.
+
+    Returns:
+        int: Nombre de familles révoquées lues
+    """
+    global _last_sync
+    now = datetime.utcnow()
+    statement = select(RefreshTokenFamily.id, RefreshTokenFamily.expires_at).where(
+        RefreshTokenFamily.revoked_at.is_not(None),
+        RefreshTokenFamily.expires_at > now,
+    )
+    if _last_sync is not None:
+        statement = statement.where(RefreshTokenFamily.revoked_at >= _last_sync - _SYNC_OVERLAP)
+    rows = session.exec(statement).all()
+    _last_sync = now
+
+    with _revoked_lock:
+        _revoked.update(rows)
+        # Token expiré : déjà refusé par la vérification de `exp`
+        for family_id in [family_id for family_id, expires_at in _revoked.items() if expires_at <= now]:
+            del _revoked[family_id]
+    return len(rows)
+
+
+def purge_expired_token_families(session: Session) -> int:
+    """Supprime les familles dont le dernier token a expiré."""
+    result = session.exec(
+        delete(RefreshTokenFamily).where(RefreshTokenFamily.expires_at <= datetime.utcnow())
+    )
+    session.commit()
+    return result.rowcount
+
+
+def _sync_loop() -> None:
+    next_purge = 0.0
+    while not _stop.wait(REFRESH_REVOCATION_SYNC_SECONDS):
+        try:
+            with Session(engine) as session:
+                sync_revoked_families(session)
+                if time.monotonic() >= next_purge:
+                    purged = purge_expired_token_families(session)
+                    if purged:
+                        logger.info("Purged %s expired refresh token families", purged)
+                    next_purge = time.monotonic() + REFRESH_PURGE_INTERVAL_SECONDS
+        except Exception:
+            logger.exception("Refresh token sync error")
+
+
+def start_refresh_token_sync() -> None:
+    """Charge les révocations puis démarre le thread de synchronisation et de purge."""
+    global _thread
+    with Session(engine) as session:
+        sync_revoked_families(session)
+    _stop.clear()
+    _thread = threading.Thread(target=_sync_loop, name="refresh-token-sync", daemon=True)
+    _thread.start()
+
+
+def stop_refresh_token_sync(timeout: float = 10) -> None:
+    """Arrête le thread de synchronisation."""
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
+        _thread = None
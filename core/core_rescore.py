@@ -0,0 +1,214 @@
+"""
+Recalcul en masse des scores de trajets après un changement des règles.
+
+Les scores sont recalculés avec la version active des règles (voir
+core_scoring_rules), éventuellement pour les seuls trajets notés avec une
+autre version. Les trajets sont lus par paquets dans l'ordre des identifiants (pagination
+par clé, sans curseur ouvert entre deux paquets). Les scores d'un paquet
+sont calculés colonne par colonne avec NumPy, puis seuls les scores modifiés
+sont réécrits (avec leur version) par un UPDATE ensembliste :
+
+- PostgreSQL : un seul `UPDATE ... FROM unnest(ids, scores, versions)` par paquet
+- autres SGBD : UPDATE paramétré exécuté en executemany
+
+Le point de reprise (table `rescore_checkpoint`) est enregistré dans la
+transaction de chaque paquet : un recalcul interrompu reprend là où il
+s'était arrêté. Statistiques et classements sont reconstruits à la fin.
+
+    python manage.py rescore [--outdated | --version V ...] [--restart] [--chunk-size N]
+"""
+
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import bindparam, or_, text, update
+from sqlmodel import Session, select
+
+from core.core_leaderboard import rebuild_company_leaderboards
+from core.core_response_cache import JOURNEYS_VERSION, bump_all_data_versions
+from core.core_score import CompiledScoringRules
+from core.core_scoring_rules import active_scoring_rules
+from core.core_statistics import rebuild_user_statistics
+from models.model_journey import Journey
+from models.model_rescore import RescoreCheckpoint
+from models.model_transport_type import TransportType
+
+
+DEFAULT_RESCORE_JOB = "rescore"
+RESCORE_CHUNK_SIZE = 50000
+
+# Position de chaque mode dans TransportType (index des tableaux de règles)
+_TRANSPORT_CODES = {transport: code for code, transport in enumerate(TransportType)}
+
+_POSTGRES_UPDATE = text(
+    "UPDATE journey SET score_journey = data.score, score_version = data.version "
+    "FROM unnest(CAST(:ids AS bigint[]), CAST(:scores AS integer[]), "
+    "CAST(:versions AS integer[])) AS data(id, score, version) "
+    "WHERE journey.id = data.id"
+)
+
+
+def compute_journey_scores(
+    rules: CompiledScoringRules,
+    transport_codes: np.ndarray,
+    distances_km: np.ndarray,
+    departure_hours: np.ndarray
+) -> np.ndarray:
+    """
+    Version vectorisée de `compute_journey_score`.
+
+    Args:
+        rules: Règles compilées
+        transport_codes: Position de chaque mode de transport dans TransportType
+        distances_km: Distances en kilomètres
+        departure_hours: Heures de départ (0 à 23)
+
+    Returns:
+        np.ndarray: Scores (int64), identiques à ceux de `compute_journey_score`
+    """
+    base_scores = np.array([rules.base_scores[t] for t in TransportType], dtype=np.int64)
+    eco_bonuses = np.array([rules.eco_bonuses[t] for t in TransportType], dtype=np.int64)
+
+    distance_bonus = np.zeros(len(distances_km), dtype=np.float64)
+    for start, width, rate in rules.distance_tiers:
+        distance_bonus += rate * np.minimum(np.maximum(distances_km - start, 0.0), width)
+
+    totals = (
+        base_scores[transport_codes]
+        + np.trunc(distance_bonus).astype(np.int64)
+        + eco_bonuses[transport_codes]
+    )
+    multipliers = np.array(rules.hour_multipliers, dtype=np.float64)[departure_hours]
+    return np.trunc(totals * multipliers).astype(np.int64)
+
+
+def _write_scores(session: Session, ids: list[int], scores: list[int], version: int) -> None:
+    """Réécrit les scores d'un paquet de trajets (sans commit)."""
+    if session.get_bind().dialect.name == "postgresql":
+        session.connection().execute(
+            _POSTGRES_UPDATE,
+            {"ids": ids, "scores": scores, "versions": [version] * len(ids)},
+        )
+        return
+
+    statement = (
+        update(Journey.__table__)
+        .where(Journey.__table__.c.id == bindparam("journey_id"))
+        .values(score_journey=bindparam("new_score"), score_version=version)
+    )
+    session.connection().execute(
+        statement,
+        [{"journey_id": id_, "new_score": score} for id_, score in zip(ids, scores)],
+    )
+
+
+def _load_checkpoint(session: Session, job: str, restart: bool) -> RescoreCheckpoint:
+    checkpoint = session.get(RescoreCheckpoint, job)
+    if checkpoint is None:
+        checkpoint = RescoreCheckpoint(job=job)
+    elif restart or checkpoint.finished_at is not None:
+        # Nouveau recalcul (règles modifiées depuis le précédent, ou reprise refusée)
+        checkpoint.last_id = 0
+        checkpoint.scanned_rows = 0
+        checkpoint.updated_rows = 0
+        checkpoint.started_at = datetime.utcnow()
+        checkpoint.finished_at = None
+    checkpoint.updated_at = datetime.utcnow()
+    session.add(checkpoint)
+    session.commit()
+    return checkpoint
+
+
+def rescore_journeys(
+    session: Session,
+    job: str = DEFAULT_RESCORE_JOB,
+    chunk_size: int = RESCORE_CHUNK_SIZE,
+    restart: bool = False,
+    progress: Optional[Callable[[RescoreCheckpoint], None]] = None,
+    versions: Optional[Sequence[int]] = None,
+    outdated_only: bool = False
+) -> RescoreCheckpoint:
+    """
+    Recalcule le score des trajets avec la version active des règles.
+
+    Un recalcul inachevé du même `job` reprend après le dernier paquet
+    enregistré, sauf si `restart` est vrai. Les filtres doivent être les
+    mêmes lors d'une reprise.
+
+    Args:
+        session: Session SQLModel
+        job: Nom du recalcul (clé du point de reprise)
+        chunk_size: Nombre de trajets lus et réécrits par transaction
+        restart: Ignore le point de reprise et repart du premier trajet
+        progress: Appelé après chaque paquet avec le point de reprise
+        versions: Ne recalcule que les trajets notés avec ces versions
+        outdated_only: Ne recalcule que les trajets non notés avec la version active
+
+    Returns:
+        RescoreCheckpoint: Bilan du recalcul (lignes lues et modifiées)
+    """
+    rules = active_scoring_rules(session, refresh=True)
+    checkpoint = _load_checkpoint(session, job, restart)
+
+    statement = select(
+        Journey.id,
+        Journey.transport_type,
+        Journey.distance_km,
+        Journey.time_departure,
+        Journey.score_journey,
+        Journey.score_version,
+    )
+    if versions:
+        statement = statement.where(Journey.score_version.in_(versions))
+    if outdated_only:
+        statement = statement.where(or_(
+            Journey.score_version.is_(None), Journey.score_version != rules.version
+        ))
+
+    while True:
+        rows = session.exec(
+            statement
+            .where(Journey.id > checkpoint.last_id)
+            .order_by(Journey.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        ids, transports, distances, departures, old_scores, old_versions = zip(*rows)
+        ids = np.array(ids, dtype=np.int64)
+        codes = np.fromiter((_TRANSPORT_CODES[t] for t in transports), np.int64, len(rows))
+        hours = np.fromiter((d.hour for d in departures), np.int64, len(rows))
+        scores = compute_journey_scores(
+            rules, codes, np.array(distances, dtype=np.float64), hours
+        )
+        old = np.array([-1 if s is None else s for s in old_scores], dtype=np.int64)
+        old_version = np.array([-1 if v is None else v for v in old_versions], dtype=np.int64)
+
+        changed = (scores != old) | (old_version != rules.version)
+        if changed.any():
+            _write_scores(
+                session, ids[changed].tolist(), scores[changed].tolist(), rules.version
+            )
+
+        checkpoint.last_id = int(ids[-1])
+        checkpoint.scanned_rows += len(rows)
+        checkpoint.updated_rows += int(changed.sum())
+        checkpoint.updated_at = datetime.utcnow()
+        session.add(checkpoint)
+        session.commit()
+
+        if progress:
+            progress(checkpoint)
+
+    # Les totaux précalculés dépendent des scores
+    rebuild_user_statistics(session)
+    rebuild_company_leaderboards(session)
+
+    # Les réponses en cache contiennent les anciens scores
+    bump_all_data_versions(session, JOURNEYS_VERSION)
+    checkpoint.finished_at = datetime.utcnow()
+    session.add(checkpoint)
+    session.commit()
+    return checkpoint
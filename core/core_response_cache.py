@@ -0,0 +1,151 @@
+"""
+Réponses conditionnelles (ETag / If-None-Match) et cache de réponses pour les
+lectures de trajets et de statistiques.
+
+Chaque utilisateur a deux compteurs de version (table `user_data_version`) :
+les trajets, incrémentés par chaque création, rejet ou suppression dans la
+transaction de l'écriture, et les statistiques, incrémentés avec leur mise à
+jour (outbox, reconstruction). Une lecture :
+
+1. lit la version concernée (une ligne par clé primaire, sans toucher à la
+   table `journey`)
+2. en déduit un ETag fort : empreinte de (utilisateur, portée, version, route
+   et paramètres)
+3. répond 304 si l'en-tête If-None-Match contient cet ETag
+4. sinon sert le corps JSON déjà sérialisé depuis le cache (clé : l'ETag),
+   ou le calcule et l'y enregistre
+
+La version est lue avant les données : une écriture concurrente peut au pire
+associer des données plus récentes à l'ancienne version, jamais l'inverse.
+
+Le cache est local au processus (RESPONSE_CACHE_MAX_SIZE entrées,
+RESPONSE_CACHE_TTL_SECONDS) ; les ETags sont communs à tous les workers.
+"""
+
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import Integer, literal, true
+from sqlmodel import Session, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.core_cache import TTLCache
+from core.core_serialization import dumps
+from core.database import dialect_insert, increment_counters
+from models.model_data_version import UserDataVersion
+from models.model_user import Users
+
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 300))
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", 10000))
+
+# Portées versionnées (colonnes de `user_data_version`)
+JOURNEYS_VERSION = "journeys_version"
+STATISTICS_VERSION = "statistics_version"
+_SCOPES = (JOURNEYS_VERSION, STATISTICS_VERSION)
+
+_response_cache = TTLCache(RESPONSE_CACHE_MAX_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+
+
+def bump_data_version(session: Session, user_id: int, scope: str) -> None:
+    """Incrémente une version d'un utilisateur (sans commit)."""
+    row = {"id_user": user_id, **{column: 0 for column in _SCOPES}}
+    row[scope] = 1
+    increment_counters(session, UserDataVersion.__table__, ("id_user",), (scope,), [row])
+
+
+def bump_all_data_versions(session: Session, scope: str, user_id: Optional[int] = None) -> None:
+    """
+    Incrémente une version de tous les utilisateurs, ou d'un seul (sans commit).
+
+    Pour les écritures en masse (recalcul des scores, reconstruction des
+    statistiques, archivage). Les utilisateurs sans ligne de version (version
+    0) en reçoivent une : leurs ETags précédents ne correspondent plus.
+    """
+    users = select(
+        Users.id, *(literal(1 if column == scope else 0, Integer) for column in _SCOPES)
+    ).where(Users.id == user_id if user_id is not None else true())
+    # WHERE explicite : requis par SQLite pour un INSERT ... SELECT ... ON CONFLICT
+    statement = dialect_insert(session, UserDataVersion).from_select(
+        ["id_user", *_SCOPES], users
+    )
+    session.exec(statement.on_conflict_do_update(
+        index_elements=["id_user"],
+        set_={scope: getattr(UserDataVersion, scope) + 1},
+    ))
+
+
+def read_data_version(session: Session, user_id: int, scope: str) -> int:
+    """Retourne une version d'un utilisateur (0 si jamais incrémentée)."""
+    version = session.exec(
+        select(getattr(UserDataVersion, scope)).where(UserDataVersion.id_user == user_id)
+    ).first()
+    return version or 0
+
+
+def delete_user_data_versions(session: Session, user_id: int) -> None:
+    """Supprime les versions d'un utilisateur (sans commit)."""
+    session.exec(delete(UserDataVersion).where(UserDataVersion.id_user == user_id))
+
+
+def compute_etag(user_id: int, scope: str, version: int, route_key: str) -> str:
+    """ETag fort d'une réponse : identique tant que la version ne change pas."""
+    digest = hashlib.sha256(f"{user_id}|{scope}|{version}|{route_key}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparaison faible de If-None-Match avec un ETag (RFC 9110).
+
+    `*` n'est pas une correspondance : la vérification précède la lecture
+    des données, une ressource inexistante ou d'un autre utilisateur
+    recevrait sinon 304 au lieu de 404.
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+async def conditional_response(
+    session: AsyncSession,
+    request: Request,
+    user_id: int,
+    scope: str,
+    route_key: str,
+    build: Callable[[], Awaitable[Any]],
+    serialize: Callable[[Any], bytes] = dumps
+) -> Response:
+    """
+    Répond à une lecture versionnée : 304, corps en cache ou corps calculé.
+
+    Args:
+        session: Session asynchrone
+        request: Requête (en-tête If-None-Match)
+        user_id: ID de l'utilisateur dont les données sont lues
+        scope: Portée de la version (JOURNEYS_VERSION ou STATISTICS_VERSION)
+        route_key: Route et paramètres qui déterminent la réponse
+        build: Calcule les données (appelé seulement en l'absence de cache)
+        serialize: Convertit les données en corps JSON (orjson par défaut)
+
+    Returns:
+        Response: 304 sans corps, ou 200 avec le corps JSON ; ETag dans les deux cas
+
+    Raises:
+        HTTPException: Erreurs levées par `build` (jamais mises en cache)
+    """
+    version = await session.run_sync(read_data_version, user_id, scope)
+    etag = compute_etag(user_id, scope, version, route_key)
+    # private : réponse propre à l'utilisateur ; no-cache : revalidation à chaque lecture
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = _response_cache.get(etag)
+    if body is None:
+        body = serialize(await build())
+        _response_cache.set(etag, body)
+    return Response(body, media_type="application/json", headers=headers)
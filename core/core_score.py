@@ -1,16 +1,31 @@
 """
-Logique métier de calcul de score pour les trajets (V1 simplifiée POC).
+Logique métier de calcul de score pour les trajets.
 
-Le score est calculé une seule fois lors de la création du trajet validé.
-Pas d'historique, pas de recalcul - simplicité maximale pour la V1.
+Les règles de score sont versionnées (table `scoring_rule_set`, voir
+core_scoring_rules) : chaque version est compilée une fois en une structure
+immuable (`CompiledScoringRules`) dont le calcul ne fait que des lectures de
+tuples et de dictionnaires. Les constantes ci-dessous constituent la
+version 1, publiée au premier démarrage.
+
+Après une modification des règles, l'historique est recalculé en masse
+(voir core_rescore) :
+
+    python manage.py rescore
+
+Le calcul est une fonction pure (sans accès à la base) : le score est
+renseigné sur le trajet avant son insertion, ce qui évite un second commit.
 """
 
-from sqlmodel import Session
+import math
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+from models.model_scoring import ScoringRules
 from models.model_transport_type import TransportType
-from models.model_journey import Journey
 
 
-# Configuration des scores de base par mode de transport
+# Configuration des scores de base par mode de transport (version 1)
 TRANSPORT_BASE_SCORES = {
     TransportType.marche: 100,
     TransportType.velo: 90,
@@ -28,37 +43,127 @@ ECO_BONUS_MODES = {
 DISTANCE_BONUS_PER_KM = 2  # 2 points par km
 ECO_BONUS_BASE = 50  # Bonus écologique de base
 
+DEFAULT_SCORING_RULES = ScoringRules(
+    base_scores=TRANSPORT_BASE_SCORES,
+    distance_bonus_per_km=DISTANCE_BONUS_PER_KM,
+    eco_bonus=ECO_BONUS_BASE,
+    eco_modes=sorted(ECO_BONUS_MODES),
+)
+
+
+class CompiledScoringRules(NamedTuple):
+    """
+    Règles de score compilées (immuables).
 
-def calculate_and_save_score(
-    session: Session,
-    journey: Journey
-) -> None:
+    - base_scores : score de base par mode de transport
+    - eco_bonuses : bonus écologique par mode de transport (0 si non éligible)
+    - distance_tiers : paliers (début en km, largeur en km, points par km)
+    - hour_multipliers : multiplicateur par heure de départ (24 valeurs)
     """
-    Calcule le score d'un trajet et le sauvegarde directement.
+    version: Optional[int]
+    base_scores: Mapping[TransportType, int]
+    eco_bonuses: Mapping[TransportType, int]
+    distance_tiers: tuple
+    hour_multipliers: tuple
+
+    def distance_bonus(self, distance_km: float) -> int:
+        bonus = 0.0
+        for start, width, rate in self.distance_tiers:
+            bonus += rate * min(max(distance_km - start, 0.0), width)
+        return int(bonus)
+
+    def score(
+        self,
+        transport_type: TransportType,
+        distance_km: float,
+        time_departure: Optional[datetime] = None
+    ) -> int:
+        total = (
+            self.base_scores.get(transport_type, 0)
+            + self.distance_bonus(distance_km)
+            + self.eco_bonuses.get(transport_type, 0)
+        )
+        if time_departure is None:
+            return total
+        return int(total * self.hour_multipliers[time_departure.hour])
+
+
+def compile_scoring_rules(rules: ScoringRules, version: Optional[int] = None) -> CompiledScoringRules:
+    """
+    Compile des règles de score en structure de calcul immuable.
 
     Args:
-        session: Session SQLModel
-        journey: Trajet pour lequel calculer le score
+        rules: Règles de score
+        version: Version publiée des règles (None si non publiées)
 
-    Logique :
-        - Base score : dépend du mode de transport
-        - Distance bonus : 2 points par km
-        - Eco bonus : 50 points si mode actif (marche, vélo)
+    Returns:
+        CompiledScoringRules: Règles prêtes pour `compute_journey_score`
+
+    Raises:
+        ValueError: Si les paliers ou les plages horaires sont incohérents
     """
-    # Score de base selon le mode de transport
-    base_score = TRANSPORT_BASE_SCORES.get(journey.transport_type, 0)
+    if rules.distance_tiers:
+        tiers = []
+        start = 0.0
+        for position, tier in enumerate(rules.distance_tiers):
+            last = position == len(rules.distance_tiers) - 1
+            if tier.up_to_km is None and not last:
+                raise ValueError("Only the last distance tier can be unbounded")
+            end = math.inf if tier.up_to_km is None else tier.up_to_km
+            if end <= start:
+                raise ValueError("Distance tiers must be in increasing order")
+            tiers.append((start, end - start, tier.bonus_per_km))
+            start = end
+    else:
+        tiers = [(0.0, math.inf, rules.distance_bonus_per_km)]
+
+    hour_multipliers = [1.0] * 24
+    for time_multiplier in rules.time_multipliers:
+        if time_multiplier.end_hour <= time_multiplier.start_hour:
+            raise ValueError("Time multiplier end_hour must be after start_hour")
+        for hour in range(time_multiplier.start_hour, time_multiplier.end_hour):
+            hour_multipliers[hour] = time_multiplier.multiplier
 
-    # Bonus distance : 2 points par km
-    distance_bonus = int(journey.distance_km * DISTANCE_BONUS_PER_KM)
+    eco_modes = set(rules.eco_modes)
+    return CompiledScoringRules(
+        version=version,
+        base_scores=MappingProxyType({
+            transport: rules.base_scores.get(transport, 0) for transport in TransportType
+        }),
+        eco_bonuses=MappingProxyType({
+            transport: rules.eco_bonus if transport in eco_modes else 0
+            for transport in TransportType
+        }),
+        distance_tiers=tuple(tiers),
+        hour_multipliers=tuple(hour_multipliers),
+    )
 
-    # Bonus écologique : 50 points pour les modes actifs
-    eco_bonus = ECO_BONUS_BASE if journey.transport_type in ECO_BONUS_MODES else 0
 
-    # Score total
-    score_total = base_score + distance_bonus + eco_bonus
+# Règles de la version 1, utilisées tant qu'aucune version n'est chargée
+DEFAULT_COMPILED_RULES = compile_scoring_rules(DEFAULT_SCORING_RULES, version=1)
 
-    # Mise à jour du score dans le trajet
-    journey.score_journey = score_total
 
-    # Commit des changements
-    session.commit()
+def compute_journey_score(
+    transport_type: TransportType,
+    distance_km: float,
+    rules: Optional[CompiledScoringRules] = None,
+    time_departure: Optional[datetime] = None
+) -> int:
+    """
+    Calcule le score d'un trajet sans accès à la base de données.
+
+    Args:
+        transport_type: Mode de transport du trajet
+        distance_km: Distance parcourue en kilomètres
+        rules: Règles compilées (version 1 par défaut)
+        time_departure: Départ du trajet (multiplicateurs horaires)
+
+    Returns:
+        int: Score total du trajet
+
+    Logique (version 1) :
+        - Base score : dépend du mode de transport
+        - Distance bonus : 2 points par km
+        - Eco bonus : 50 points si mode actif (marche, vélo)
+    """
+    return (rules or DEFAULT_COMPILED_RULES).score(transport_type, distance_km, time_departure)
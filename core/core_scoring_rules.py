@@ -0,0 +1,169 @@
+"""
+Règles de score versionnées et rechargées à chaud.
+
+Chaque publication ajoute une version à la table `scoring_rule_set` ; la
+version active est la plus récente. Chaque worker garde en mémoire les
+règles actives compilées (voir core_score) et vérifie au plus toutes les
+SCORING_RULES_REFRESH_SECONDS si une version plus récente a été publiée.
+Le remplacement est atomique (une seule affectation) : un calcul en cours
+utilise entièrement l'ancienne ou la nouvelle version, et le trajet
+enregistre la version utilisée (`Journey.score_version`).
+
+Les trajets notés avec une ancienne version peuvent ensuite être recalculés :
+
+    python manage.py rescore --outdated
+"""
+
+import os
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.core_score import (
+    DEFAULT_COMPILED_RULES,
+    DEFAULT_SCORING_RULES,
+    CompiledScoringRules,
+    compile_scoring_rules,
+)
+from models.model_scoring import ScoringRules, ScoringRuleSet, ScoringRuleSetCreate
+
+
+# Délai maximal avant qu'un worker prenne en compte une nouvelle version
+SCORING_RULES_REFRESH_SECONDS = float(os.getenv("SCORING_RULES_REFRESH_SECONDS", 30))
+
+_active: CompiledScoringRules = DEFAULT_COMPILED_RULES
+# Date (monotonic) de la dernière vérification en base, None : jamais chargé
+_checked_at: Optional[float] = None
+
+
+def seed_scoring_rules(session: Session) -> None:
+    """Publie les règles par défaut (version 1) si aucune version n'existe."""
+    if session.exec(select(ScoringRuleSet.version).limit(1)).first() is None:
+        session.add(ScoringRuleSet(
+            rules=DEFAULT_SCORING_RULES.model_dump(mode="json"),
+            comment="Initial rules",
+        ))
+        session.commit()
+
+
+def _compile_rule_set(rule_set: ScoringRuleSet) -> CompiledScoringRules:
+    return compile_scoring_rules(ScoringRules.model_validate(rule_set.rules), rule_set.version)
+
+
+def active_scoring_rules(session: Session, refresh: bool = False) -> CompiledScoringRules:
+    """
+    Retourne les règles actives compilées.
+
+    La base n'est consultée (numéro de la dernière version, par clé
+    primaire) qu'au premier appel, puis au plus toutes les
+    SCORING_RULES_REFRESH_SECONDS, ou si `refresh` est vrai.
+
+    Args:
+        session: Session SQLModel
+        refresh: Force la vérification de la version active
+
+    Returns:
+        CompiledScoringRules: Règles actives
+    """
+    global _active, _checked_at
+
+    now = time.monotonic()
+    if not refresh and _checked_at is not None and now - _checked_at < SCORING_RULES_REFRESH_SECONDS:
+        return _active
+
+    # Pas de verrou : deux vérifications simultanées chargent la même version
+    _checked_at = now
+    latest = session.exec(select(func.max(ScoringRuleSet.version))).one()
+    if latest is not None and latest != _active.version:
+        _active = _compile_rule_set(session.get(ScoringRuleSet, latest))
+    return _active
+
+
+def list_scoring_rule_sets(session: Session) -> list[ScoringRuleSet]:
+    """Liste les versions publiées, de la plus récente à la plus ancienne."""
+    return session.exec(
+        select(ScoringRuleSet).order_by(ScoringRuleSet.version.desc())
+    ).all()
+
+
+def get_scoring_rule_set(session: Session, version: Optional[int] = None) -> ScoringRuleSet:
+    """
+    Retourne une version des règles (la version active si `version` est None).
+
+    Raises:
+        HTTPException: 404 si la version n'existe pas
+    """
+    if version is None:
+        version = active_scoring_rules(session, refresh=True).version
+    rule_set = session.get(ScoringRuleSet, version)
+    if not rule_set:
+        raise HTTPException(404, "Scoring rule set not found")
+    return rule_set
+
+
+def publish_scoring_rules(
+    session: Session,
+    data: ScoringRuleSetCreate,
+    user_id: int
+) -> ScoringRuleSet:
+    """
+    Publie une nouvelle version des règles, qui devient la version active.
+
+    Le worker courant l'applique immédiatement, les autres au plus tard
+    après SCORING_RULES_REFRESH_SECONDS.
+
+    Args:
+        session: Session SQLModel
+        data: Règles à publier
+        user_id: ID de l'admin qui publie
+
+    Returns:
+        ScoringRuleSet: Version publiée
+
+    Raises:
+        HTTPException: 400 si les règles sont incohérentes
+    """
+    global _active, _checked_at
+
+    try:
+        compile_scoring_rules(data.rules)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    rule_set = ScoringRuleSet(
+        rules=data.rules.model_dump(mode="json"),
+        comment=data.comment,
+        created_by=user_id,
+    )
+    session.add(rule_set)
+    session.commit()
+    session.refresh(rule_set)
+
+    _active = _compile_rule_set(rule_set)
+    _checked_at = time.monotonic()
+    return rule_set
+
+
+# Versions asynchrones (logique ci-dessus exécutée via `run_sync`)
+
+async def list_scoring_rule_sets_async(session: AsyncSession) -> list[ScoringRuleSet]:
+    """Version asynchrone de `list_scoring_rule_sets`."""
+    return await session.run_sync(list_scoring_rule_sets)
+
+
+async def get_scoring_rule_set_async(session: AsyncSession, version: Optional[int] = None) -> ScoringRuleSet:
+    """Version asynchrone de `get_scoring_rule_set`."""
+    return await session.run_sync(get_scoring_rule_set, version)
+
+
+async def publish_scoring_rules_async(
+    session: AsyncSession,
+    data: ScoringRuleSetCreate,
+    user_id: int
+) -> ScoringRuleSet:
+    """Version asynchrone de `publish_scoring_rules`."""
+    return await session.run_sync(publish_scoring_rules, data, user_id)
@@ -0,0 +1,51 @@
+"""
+Sérialisation rapide des listes (trajets, utilisateurs).
+
+Chemin par défaut de FastAPI pour une liste : hydratation d'un objet ORM par
+ligne, validation par `response_model`, puis `jsonable_encoder` et
+`json.dumps`. Sur une liste longue, ces étapes coûtent l'essentiel du temps
+CPU de la requête.
+
+Chemin rapide : seules les colonnes du schéma de lecture sont sélectionnées,
+les lignes (tuples) sont converties en dicts et encodées par orjson
+(datetimes ISO 8601, enums par leur valeur), sans objet ORM ni validation.
+Le `response_model` de la route reste déclaré : il documente la réponse
+(OpenAPI), mais n'est pas appliqué à une `Response` déjà construite.
+
+    python benchmarks/bench_serialization.py --rows 1000 10000
+"""
+
+from typing import Any, Iterable, Sequence
+
+import orjson
+from sqlmodel import SQLModel
+
+
+# Options de ORJSONResponse : réponses identiques avec ou sans cache
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def read_columns(model: type[SQLModel], schema: type[SQLModel]) -> tuple:
+    """
+    Colonnes de `model` correspondant aux champs de `schema`, dans leur ordre.
+
+    Args:
+        model: Modèle de table (ex. Journey)
+        schema: Schéma de lecture (ex. JourneyRead)
+
+    Returns:
+        tuple: Colonnes à passer à `select(*columns)`
+    """
+    return tuple(getattr(model, field) for field in schema.model_fields)
+
+
+def rows_to_dicts(rows: Iterable[Sequence], schema: type[SQLModel]) -> list[dict]:
+    """Convertit des lignes lues avec `read_columns(..., schema)` en dicts."""
+    fields = tuple(schema.model_fields)
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def dumps(content: Any) -> bytes:
+    """Encode en JSON (UTF-8) comme `ORJSONResponse`."""
+    return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
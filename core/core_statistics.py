@@ -0,0 +1,170 @@
+"""
+Statistiques utilisateur matérialisées (table `user_statistics`).
+
+Les statistiques ne sont plus recalculées à chaque lecture : chaque création,
+rejet ou suppression de trajet applique un delta (+1 / -1 trajet, distance,
+score), via un événement outbox écrit dans la même transaction que le trajet
+et traité juste après le commit (voir core_outbox). La lecture se
+limite à quelques lignes par clé primaire, quelle que soit la longueur de
+l'historique.
+
+Reconstruction complète depuis la table `journey` :
+
+    python manage.py rebuild-statistics [--user ID]
+
+La reconstruction retire d'abord la partie statistiques des événements
+outbox non traités : elle peut être lancée pendant que l'API reçoit des
+trajets, sans vider la file au préalable.
+"""
+
+from typing import Optional
+
+from sqlmodel import Session, select, delete
+from sqlalchemy import func
+
+from core.core_outbox import (
+    JOURNEY_AGGREGATES_PARTS,
+    JOURNEY_AGGREGATES_TOPIC,
+    withdraw_pending_events,
+)
+from core.core_response_cache import STATISTICS_VERSION, bump_all_data_versions
+from core.database import increment_counters
+from models.model_journey import Journey
+from models.model_journey_status import JourneyStatus
+from models.model_user_statistics import UserStatistics
+
+
+_COUNTER_COLUMNS = ("total_journeys", "total_distance_km", "total_score")
+
+
+def journey_statistics_delta(
+    id_user: int,
+    transport_type,
+    distance_km: float,
+    score_journey: Optional[int],
+    sign: int = 1
+) -> dict:
+    """
+    Construit le delta de statistiques correspondant à un trajet validé.
+
+    Args:
+        id_user: ID de l'utilisateur
+        transport_type: Mode de transport du trajet
+        distance_km: Distance du trajet
+        score_journey: Score du trajet
+        sign: +1 pour un trajet comptabilisé, -1 pour un trajet retiré
+
+    Returns:
+        dict: Delta à passer à `apply_statistics_deltas`
+    """
+    return {
+        "id_user": id_user,
+        "transport_type": transport_type,
+        "total_journeys": sign,
+        "total_distance_km": sign * distance_km,
+        "total_score": sign * (score_journey or 0),
+    }
+
+
+def apply_statistics_deltas(session: Session, deltas: list[dict]) -> None:
+    """
+    Applique des deltas de statistiques sans commit.
+
+    Les deltas sont regroupés par (utilisateur, mode de transport) puis
+    appliqués en un seul INSERT ... ON CONFLICT DO UPDATE multi-lignes :
+    l'incrément est atomique et s'exécute dans la transaction de l'appelant.
+
+    Args:
+        session: Session SQLModel
+        deltas: Deltas produits par `journey_statistics_delta`
+    """
+    increment_counters(
+        session,
+        UserStatistics.__table__,
+        ("id_user", "transport_type"),
+        _COUNTER_COLUMNS,
+        deltas,
+    )
+
+
+def read_user_statistics(session: Session, user_id: int) -> dict:
+    """
+    Lit les statistiques matérialisées d'un utilisateur.
+
+    Args:
+        session: Session SQLModel
+        user_id: ID de l'utilisateur
+
+    Returns:
+        dict: Totaux et détail par mode de transport (`by_transport`)
+    """
+    rows = session.exec(
+        select(UserStatistics).where(UserStatistics.id_user == user_id)
+    ).all()
+
+    by_transport = {
+        row.transport_type.value: {
+            "total_journeys": row.total_journeys,
+            "total_distance_km": round(row.total_distance_km, 2),
+            "total_score": row.total_score,
+        }
+        for row in rows
+        if row.total_journeys > 0
+    }
+
+    return {
+        "total_journeys": sum(row.total_journeys for row in rows),
+        "total_distance_km": round(sum(row.total_distance_km for row in rows), 2),
+        "total_score": sum(row.total_score for row in rows),
+        "by_transport": by_transport,
+    }
+
+
+def delete_user_statistics(session: Session, user_id: int) -> None:
+    """Supprime les statistiques d'un utilisateur (sans commit)."""
+    session.exec(delete(UserStatistics).where(UserStatistics.id_user == user_id))
+
+
+def rebuild_user_statistics(session: Session, user_id: Optional[int] = None) -> None:
+    """
+    Recalcule les statistiques depuis la table `journey`.
+
+    Les lignes existantes sont remplacées par un INSERT ... SELECT agrégé,
+    dans une seule transaction, qui commence par retirer la partie
+    statistiques des événements en attente du périmètre : leurs trajets sont
+    déjà comptés par l'agrégat.
+
+    Args:
+        session: Session SQLModel
+        user_id: ID de l'utilisateur à reconstruire (tous si None)
+    """
+    clear = delete(UserStatistics)
+    aggregate = (
+        select(
+            Journey.id_user,
+            Journey.transport_type,
+            func.count(),
+            func.sum(Journey.distance_km),
+            func.coalesce(func.sum(Journey.score_journey), 0),
+        )
+        .where(Journey.status == JourneyStatus.VALIDATED)
+        .group_by(Journey.id_user, Journey.transport_type)
+    )
+    if user_id is not None:
+        clear = clear.where(UserStatistics.id_user == user_id)
+        aggregate = aggregate.where(Journey.id_user == user_id)
+
+    withdraw_pending_events(
+        session, JOURNEY_AGGREGATES_TOPIC, JOURNEY_AGGREGATES_PARTS, "statistics",
+        id_user=user_id,
+    )
+    table = UserStatistics.__table__
+    session.exec(clear)
+    session.exec(
+        table.insert().from_select(
+            ["id_user", "transport_type", *_COUNTER_COLUMNS], aggregate
+        )
+    )
+    bump_all_data_versions(session, STATISTICS_VERSION, user_id)
+    session.commit()
+
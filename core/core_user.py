@@ -1,11 +1,88 @@
+from datetime import datetime
+from typing import Optional
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
-from models.model_user import Users, UserCreate
+from models.model_user import Users, UserCreate, UserRead
+from models.model_role import UserRole
 from sqlalchemy.exc import IntegrityError
+from core.core_auth import invalidate_user_principal
+from core.core_password import hash_password, hash_password_async
+from core.core_statistics import delete_user_statistics
+from core.core_leaderboard import delete_user_leaderboard_entries
+from core.core_refresh_token import delete_user_token_families
+from core.core_response_cache import delete_user_data_versions
+from core.core_pagination import decode_cursor, encode_cursor, estimate_count
+from core.core_serialization import read_columns, rows_to_dicts
 
-def list_users_core(session: Session):
-    statement = select(Users)
-    return session.exec(statement).all()
+# Colonnes lues pour la liste (champs de UserRead : ni hash ni objet ORM)
+USER_READ_COLUMNS = read_columns(Users, UserRead)
+
+# Pagination de la liste admin
+DEFAULT_USER_PAGE_SIZE = 100
+MAX_USER_PAGE_SIZE = 500
+
+
+def list_users_core(
+    session: Session,
+    limit: int = DEFAULT_USER_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    id_company: Optional[int] = None,
+    role: Optional[UserRole] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> dict:
+    """
+    Liste une page d'utilisateurs, par id croissant.
+
+    Pagination par cle (keyset) sur l'id : le cout d'une page ne depend pas
+    de sa position. Seules les colonnes de UserRead sont lues.
+
+    Args:
+        session: Session SQLModel
+        limit: Nombre maximum d'utilisateurs retournes
+        cursor: Curseur `next_cursor` de la page precedente
+        id_company: Utilisateurs de cette entreprise
+        role: Utilisateurs de ce role
+        created_from: Utilisateurs crees a partir de cette date
+        created_to: Utilisateurs crees avant cette date
+
+    Returns:
+        dict: Utilisateurs de la page (`items`), curseur de la page suivante
+        (`next_cursor`) et nombre estime d'utilisateurs filtres (`total_estimate`)
+
+    Raises:
+        HTTPException: Si le curseur est invalide
+    """
+    limit = max(1, min(limit, MAX_USER_PAGE_SIZE))
+    statement = select(*USER_READ_COLUMNS)
+    if id_company is not None:
+        statement = statement.where(Users.id_company == id_company)
+    if role is not None:
+        statement = statement.where(Users.role == role)
+    if created_from is not None:
+        statement = statement.where(Users.date_creation >= created_from)
+    if created_to is not None:
+        statement = statement.where(Users.date_creation < created_to)
+
+    page = statement.order_by(Users.id).limit(limit + 1)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            raise HTTPException(400, "Invalid cursor")
+        page = page.where(Users.id > last_id)
+    users = rows_to_dicts(session.exec(page), UserRead)
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor([users[-1]["id"]])
+
+    return {
+        "items": users,
+        "next_cursor": next_cursor,
+        "total_estimate": estimate_count(session, Users, statement),
+    }
 
 
 def get_user_core(session: Session, user_id: int):
@@ -15,8 +92,7 @@ def get_user_core(session: Session, user_id: int):
     return user
 
 
-def create_user_core(session: Session, data: UserCreate):
-
+def _check_user_available(session: Session, data: UserCreate) -> None:
     existing_username = session.exec(
         select(Users).where(Users.username == data.username)
     ).first()
@@ -29,13 +105,15 @@ def create_user_core(session: Session, data: UserCreate):
     if existing_email:
         raise HTTPException(400, "Email already exists")
 
+
+def _insert_user(session: Session, data: UserCreate, password_hash: str):
     user = Users(
         username=data.username,
         email=data.email,
         role="user",
-        id_company=data.id_company
+        id_company=data.id_company,
+        password=password_hash
     )
-    user.set_password(data.password)
 
     session.add(user)
 
@@ -49,11 +127,70 @@ def create_user_core(session: Session, data: UserCreate):
     return user
 
 
+def create_user_core(session: Session, data: UserCreate):
+    _check_user_available(session, data)
+    return _insert_user(session, data, hash_password(data.password))
+
+
 def delete_user_core(session: Session, user_id: int):
     user = session.get(Users, user_id)
     if not user:
         raise HTTPException(404, "User not found")
 
+    delete_user_statistics(session, user_id)
+    delete_user_leaderboard_entries(session, user_id)
+    delete_user_data_versions(session, user_id)
+    delete_user_token_families(session, user_id)
     session.delete(user)
     session.commit()
+    invalidate_user_principal(user_id)
     return {"message": "User deleted"}
+
+
+def update_user_role_core(session: Session, user_id: int, role: UserRole):
+    user = session.get(Users, user_id)
+    if not user:
+        raise HTTPException(404, "User not found")
+
+    user.role = role
+    session.add(user)
+    session.commit()
+    invalidate_user_principal(user_id)
+    return user
+
+
+# Versions asynchrones : la logique ci-dessus s'execute via `run_sync`, le
+# hash Argon2 est attendu hors de la session (aucune connexion retenue).
+
+async def list_users_async(
+    session: AsyncSession,
+    limit: int = DEFAULT_USER_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    id_company: Optional[int] = None,
+    role: Optional[UserRole] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> dict:
+    return await session.run_sync(
+        list_users_core, limit, cursor, id_company, role, created_from, created_to
+    )
+
+
+async def get_user_async(session: AsyncSession, user_id: int):
+    return await session.run_sync(get_user_core, user_id)
+
+
+async def create_user_async(session: AsyncSession, data: UserCreate):
+    await session.run_sync(_check_user_available, data)
+    # Libere la connexion pendant le hash (plusieurs dizaines de ms)
+    await session.commit()
+    password_hash = await hash_password_async(data.password)
+    return await session.run_sync(_insert_user, data, password_hash)
+
+
+async def delete_user_async(session: AsyncSession, user_id: int):
+    return await session.run_sync(delete_user_core, user_id)
+
+
+async def update_user_role_async(session: AsyncSession, user_id: int, role: UserRole):
+    return await session.run_sync(update_user_role_core, user_id, role)
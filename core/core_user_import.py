@@ -0,0 +1,256 @@
+"""
+Import en masse des employes d'une entreprise (onboarding).
+
+Fichier CSV (en-tete `username,email[,password]`) ou NDJSON (un objet par
+ligne, memes champs). Deroulement :
+
+1. lecture et validation de chaque ligne (champs, domaine de l'email
+   `company.domain_name`, doublons dans le fichier)
+2. une seule requete pour trouver les usernames et emails deja utilises
+3. hash Argon2 en parallele sur les processus du pool (core_password) ; une
+   ligne sans mot de passe recoit un jeton d'invitation aleatoire, qui sert
+   de mot de passe initial (hash Argon2 leger) et n'est retourne qu'une fois
+   dans le rapport
+4. INSERT multi-lignes par paquets de USER_IMPORT_CHUNK_SIZE, puis un seul
+   commit ; ON CONFLICT DO NOTHING : un compte cree entre-temps par une
+   inscription concurrente est signale en conflit
+
+Le rapport donne le resultat de chaque ligne.
+"""
+
+import csv
+import io
+import json
+import os
+import secrets
+from datetime import datetime
+from typing import Iterator, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_
+from sqlmodel import Session, select
+
+from core.core_password import hash_passwords
+from core.database import dialect_insert
+from models.model_company import Company
+from models.model_role import UserRole
+from models.model_user import UserImportStatus, Users
+
+
+USER_IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", 10000))
+USER_IMPORT_CHUNK_SIZE = int(os.getenv("USER_IMPORT_CHUNK_SIZE", 1000))
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+def import_format(format: Optional[str], filename: Optional[str]) -> str:
+    """
+    Format du fichier : parametre explicite, sinon extension du nom de fichier.
+
+    Raises:
+        HTTPException: 400 si le format ne peut pas etre deduit
+    """
+    if format:
+        return format
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in _EXTENSIONS:
+        raise HTTPException(400, "Cannot infer file format, use format=csv or format=ndjson")
+    return _EXTENSIONS[extension]
+
+
+def _csv_rows(content: str) -> Iterator[tuple[int, object]]:
+    reader = csv.DictReader(io.StringIO(content))
+    missing = {"username", "email"} - set(reader.fieldnames or [])
+    if missing:
+        raise HTTPException(400, f"Missing CSV columns: {', '.join(sorted(missing))}")
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _ndjson_rows(content: str) -> Iterator[tuple[int, object]]:
+    for line, text in enumerate(content.splitlines(), start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError:
+            yield line, None
+
+
+_PARSERS = {
+    "csv": _csv_rows,
+    "ndjson": _ndjson_rows,
+}
+
+
+def _field(row: dict, name: str) -> Optional[str]:
+    value = row.get(name)
+    if isinstance(value, str):
+        value = value.strip()
+    return value or None
+
+
+def _row_error(username, email, password, domain: Optional[str]) -> Optional[str]:
+    """Retourne l'erreur d'une ligne, None si elle est valide."""
+    if not isinstance(username, str) or len(username) > 50:
+        return "username is required (50 characters max)"
+    if not isinstance(email, str) or len(email) > 100 or email.count("@") != 1:
+        return "email is invalid"
+    if password is not None and not isinstance(password, str):
+        return "password must be a string"
+    if domain:
+        email_domain = email.rsplit("@", 1)[1].lower()
+        if email_domain != domain and not email_domain.endswith(f".{domain}"):
+            return f"email domain does not match {domain}"
+    return None
+
+
+def import_company_users(
+    session: Session,
+    company_id: int,
+    content: bytes,
+    format: str,
+    check_domain: bool = True
+) -> dict:
+    """
+    Cree les employes d'une entreprise depuis un fichier CSV ou NDJSON.
+
+    Args:
+        session: Session SQLModel
+        company_id: ID de l'entreprise
+        content: Contenu du fichier (UTF-8)
+        format: "csv" ou "ndjson"
+        check_domain: Refuse les emails hors du domaine de l'entreprise
+
+    Returns:
+        dict: Nombre de comptes crees (`created`), de conflits (`conflicts`),
+        de lignes refusees (`failed`) et resultat par ligne (`results`)
+
+    Raises:
+        HTTPException: 404 si l'entreprise n'existe pas, 400 si le fichier est
+        illisible, 413 s'il depasse USER_IMPORT_MAX_ROWS lignes
+    """
+    company = session.get(Company, company_id)
+    if not company:
+        raise HTTPException(404, "Entreprise introuvable")
+    domain = company.domain_name.strip().lower() if check_domain else None
+
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(400, "File must be UTF-8 encoded")
+
+    results = []
+    candidates = []
+    seen_usernames, seen_emails = set(), set()
+    for line, row in _PARSERS[format](text):
+        if len(results) >= USER_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                f"Too many rows (max {USER_IMPORT_MAX_ROWS})",
+            )
+        result = {"line": line, "status": UserImportStatus.invalid}
+        results.append(result)
+        if not isinstance(row, dict):
+            result["error"] = "Line is not a JSON object"
+            continue
+
+        username, email, password = (_field(row, name) for name in ("username", "email", "password"))
+        result.update(
+            username=username if isinstance(username, str) else None,
+            email=email if isinstance(email, str) else None,
+        )
+        error = _row_error(username, email, password, domain)
+        if error is None and (username in seen_usernames or email in seen_emails):
+            error = "Duplicate username or email in file"
+        if error:
+            result["error"] = error
+            continue
+
+        seen_usernames.add(username)
+        seen_emails.add(email)
+        candidates.append((result, password))
+
+    # Comptes existants : une seule requete sur les index uniques
+    if candidates:
+        taken = session.exec(
+            select(Users.username, Users.email).where(or_(
+                Users.username.in_(seen_usernames),
+                Users.email.in_(seen_emails),
+            ))
+        ).all()
+        taken_usernames = {username for username, _ in taken}
+        taken_emails = {email for _, email in taken}
+        for result, _ in candidates:
+            if result["username"] in taken_usernames or result["email"] in taken_emails:
+                result["status"] = UserImportStatus.conflict
+                result["error"] = "Username or email already exists"
+        candidates = [
+            (result, password) for result, password in candidates
+            if result["status"] != UserImportStatus.conflict
+        ]
+    # Libere la connexion pendant les hashs
+    session.commit()
+
+    if candidates:
+        with_password = [index for index, (_, password) in enumerate(candidates) if password]
+        invited = [index for index, (_, password) in enumerate(candidates) if not password]
+        for index in invited:
+            candidates[index][0]["invite_token"] = secrets.token_urlsafe(16)
+
+        hashes = [None] * len(candidates)
+        password_hashes = hash_passwords([candidates[index][1] for index in with_password])
+        token_hashes = hash_passwords(
+            [candidates[index][0]["invite_token"] for index in invited], invite_tokens=True
+        )
+        for index, password_hash in zip(with_password + invited, password_hashes + token_hashes):
+            hashes[index] = password_hash
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "username": result["username"],
+                "password": password_hash,
+                "email": result["email"],
+                "role": UserRole.user,
+                "date_creation": now,
+                "id_company": company_id,
+            }
+            for (result, _), password_hash in zip(candidates, hashes)
+        ]
+        created_ids = {}
+        for start in range(0, len(rows), USER_IMPORT_CHUNK_SIZE):
+            statement = (
+                dialect_insert(session, Users)
+                .values(rows[start:start + USER_IMPORT_CHUNK_SIZE])
+                .on_conflict_do_nothing()
+                .returning(Users.id, Users.username)
+            )
+            created_ids.update({username: user_id for user_id, username in session.execute(statement)})
+        session.commit()
+
+        for result, _ in candidates:
+            user_id = created_ids.get(result["username"])
+            if user_id is None:
+                # Compte cree entre-temps par une autre requete
+                result.update(
+                    status=UserImportStatus.conflict,
+                    error="Username or email already exists",
+                    invite_token=None,
+                )
+            else:
+                result.update(status=UserImportStatus.created, id=user_id)
+
+    counts = {row_status: 0 for row_status in UserImportStatus}
+    for result in results:
+        counts[result["status"]] += 1
+    return {
+        "created": counts[UserImportStatus.created],
+        "conflicts": counts[UserImportStatus.conflict],
+        "failed": counts[UserImportStatus.invalid],
+        "results": results,
+    }
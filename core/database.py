@@ -1,11 +1,198 @@
 import os
+import threading
+import time
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.core_metrics import instrument_engine
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable is not set. Please configure it in .env file.")
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+# Profil du moteur (voir .env.example). Chaque worker uvicorn a son propre pool :
+# workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) doit rester sous max_connections.
+DB_ECHO = _env_bool("DB_ECHO", False)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+# PgBouncer en mode transaction : pas de pool local, pas de parametre de session
+DB_PGBOUNCER = _env_bool("DB_PGBOUNCER", False)
+
+
+class _TimedPoolMixin:
+    """Mesure le temps d'attente pour obtenir une connexion du pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._wait_lock:
+                self.wait_count += 1
+                self.wait_time_total += elapsed
+                self.wait_time_max = max(self.wait_time_max, elapsed)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool qui mesure le temps d'attente pour obtenir une connexion."""
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """Equivalent de TimedQueuePool pour le moteur asynchrone."""
+
+
+def _pool_args(poolclass) -> dict:
+    """Parametres du pool selon le profil configure."""
+    if DB_PGBOUNCER:
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _set_local_statement_timeout(db_engine: Engine) -> None:
+    """Applique le timeout de requete a chaque transaction (mode PgBouncer)."""
+    @event.listens_for(db_engine, "begin")
+    def _set_statement_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
+
+def create_db_engine(url: str = DATABASE_URL) -> Engine:
+    """
+    Cree le moteur SQLAlchemy selon le profil configure par l'environnement.
+
+    - SQLite : pool par defaut de SQLAlchemy (developpement local)
+    - PostgreSQL : pool borne (taille, debordement, recyclage, pre-ping)
+    - PgBouncer : aucun pool local (NullPool), le timeout de requete est
+      applique par transaction (SET LOCAL) plutot qu'au niveau session
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return create_engine(url, echo=DB_ECHO)
+
+    connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    db_engine = create_engine(
+        url, echo=DB_ECHO, connect_args=connect_args, **_pool_args(TimedQueuePool)
+    )
+
+    if DB_PGBOUNCER and DB_STATEMENT_TIMEOUT_MS:
+        _set_local_statement_timeout(db_engine)
+
+    return db_engine
+
+
+# Pilotes asynchrones utilises pour chaque SGBD
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def create_async_db_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    """
+    Cree le moteur asynchrone (asyncpg / aiosqlite) avec le meme profil que
+    `create_db_engine`. DATABASE_URL reste une URL synchrone classique : le
+    pilote asynchrone est deduit du SGBD.
+    """
+    sync_url = make_url(url)
+    backend = sync_url.get_backend_name()
+    async_url = sync_url.set(drivername=_ASYNC_DRIVERS[backend])
+
+    if backend == "sqlite":
+        return create_async_engine(async_url, echo=DB_ECHO)
+
+    connect_args = {}
+    if DB_PGBOUNCER:
+        # PgBouncer (mode transaction) ne conserve pas les requetes preparees
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    elif DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    async_db_engine = create_async_engine(
+        async_url, echo=DB_ECHO, connect_args=connect_args,
+        **_pool_args(TimedAsyncQueuePool)
+    )
+
+    if DB_PGBOUNCER and DB_STATEMENT_TIMEOUT_MS:
+        _set_local_statement_timeout(async_db_engine.sync_engine)
+
+    return async_db_engine
+
+
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+
+# Temps SQL et nombre de requetes par requete HTTP (core_metrics)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+def _pool_status(pool) -> dict:
+    status = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+
+    if isinstance(pool, _TimedPoolMixin):
+        with pool._wait_lock:
+            status.update({
+                "wait_count": pool.wait_count,
+                "wait_time_total_ms": round(pool.wait_time_total * 1000, 3),
+                "wait_time_max_ms": round(pool.wait_time_max * 1000, 3),
+            })
+
+    return status
+
+
+def get_pool_status() -> dict:
+    """
+    Etat des pools de connexions (synchrone et asynchrone) du worker courant.
+
+    Returns:
+        dict: Pour chaque moteur, taille, connexions empruntees / disponibles,
+        debordement et temps d'attente cumule pour obtenir une connexion
+    """
+    return {
+        "sync": _pool_status(engine.pool),
+        "async": _pool_status(async_engine.pool),
+    }
 
 
 def init_db():
@@ -14,6 +201,82 @@ def init_db():
 
 
 def get_session():
-    """Generateur de session pour les endpoints FastAPI."""
-    with Session(engine) as session:
+    """
+    Generateur de session pour les endpoints FastAPI.
+
+    Les objets ne sont pas expires au commit : la reponse est serialisee a
+    partir des valeurs deja connues (INSERT ... RETURNING) sans nouveau SELECT.
+    """
+    with Session(engine, expire_on_commit=False) as session:
         yield session
+
+
+async def get_async_session():
+    """
+    Generateur de session asynchrone pour les endpoints `async def`.
+
+    Les fonctions metier synchrones s'executent sur cette session via
+    `session.run_sync(...)` : les E/S passent par le pilote asynchrone sans
+    bloquer la boucle d'evenements.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def dialect_insert(session: Session, table):
+    """
+    Retourne un INSERT supportant ON CONFLICT pour le SGBD de la session.
+
+    Raises:
+        RuntimeError: Si le SGBD ne supporte pas ON CONFLICT
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(table)
+    if dialect_name == "sqlite":
+        return sqlite.insert(table)
+    raise RuntimeError(f"ON CONFLICT is not supported for dialect {dialect_name}")
+
+
+def increment_counters(
+    session: Session,
+    table,
+    key_columns: tuple[str, ...],
+    counter_columns: tuple[str, ...],
+    rows: list[dict]
+) -> None:
+    """
+    Incrémente des compteurs de manière atomique, sans commit.
+
+    Les lignes sont regroupées par clé puis appliquées en un seul
+    INSERT ... ON CONFLICT DO UPDATE multi-lignes (col = col + excluded.col).
+
+    Args:
+        session: Session SQLModel
+        table: Table cible (`Model.__table__`)
+        key_columns: Colonnes de la clé primaire
+        counter_columns: Colonnes à incrémenter
+        rows: Lignes contenant la clé et les incréments
+    """
+    grouped: dict[tuple, dict] = {}
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        merged = grouped.get(key)
+        if merged is None:
+            grouped[key] = dict(row)
+            continue
+        for column in counter_columns:
+            merged[column] += row[column]
+
+    if not grouped:
+        return
+
+    statement = dialect_insert(session, table).values(list(grouped.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c[column] for column in key_columns],
+        set_={
+            column: table.c[column] + statement.excluded[column]
+            for column in counter_columns
+        },
+    )
+    session.exec(statement)
@@ -1,16 +1,14 @@
-from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
-from core.database import get_session
+from core.database import get_async_session
 from core.core_auth import (
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-    authenticate_user,
-    create_access_token,
-    create_refresh_token,
-    decode_token,
+    authenticate_user_async,
     get_current_user,
+    issue_token_pair_async,
+    refresh_token_pair_async,
+    revoke_refresh_token_async,
 )
 from models.model_user import Users
 
@@ -29,11 +27,11 @@ class RefreshTokenRequest(BaseModel):
 
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
 
     if not user:
         raise HTTPException(
@@ -42,20 +40,9 @@ def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    token_payload = {"sub": user.username, "uid": user.id}
+    tokens = await issue_token_pair_async(db, user)
 
-    access_token = create_access_token(
-        data=token_payload, expires_delta=access_token_expires
-    )
-    refresh_token = create_refresh_token(data=token_payload)
-
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_type="bearer",
-        user_id=user.id,
-    )
+    return Token(**tokens, token_type="bearer", user_id=user.id)
 
 
 @router.get("/me", response_model=dict)
@@ -64,39 +51,19 @@ async def get_me(current_user: Users = Depends(get_current_user)):
 
 
 @router.post("/token/refresh", response_model=Token)
-def refresh_access_token(
+async def refresh_access_token(
     refresh_request: RefreshTokenRequest,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ):
-    payload = decode_token(refresh_request.refresh_token, expected_type="refresh")
+    user, tokens = await refresh_token_pair_async(db, refresh_request.refresh_token)
 
-    username = payload.get("sub")
-    if not username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-        )
+    return Token(**tokens, token_type="bearer", user_id=user.id)
 
-    statement = select(Users).where(Users.username == username)
-    user = db.exec(statement).first()
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-
-    token_payload = {"sub": user.username, "uid": user.id}
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-
-    access_token = create_access_token(
-        data=token_payload, expires_delta=access_token_expires
-    )
-    refresh_token = create_refresh_token(data=token_payload)
-
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_type="bearer",
-        user_id=user.id,
-    )
\ No newline at end of file
+@router.post("/token/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_refresh_token(
+    refresh_request: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Deconnexion : revoque la session du refresh token (refresh et access tokens)."""
+    await revoke_refresh_token_async(db, refresh_request.refresh_token)
@@ -1,81 +1,207 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import FileResponse, ORJSONResponse
 from sqlmodel import Session
-from core.database import get_session
-from core.core_auth import get_current_user, require_admin
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.database import get_async_session, get_session
+from core.core_auth import get_current_user, require_admin, require_company_access
 
-from models.model_company import CompanyRead, CompanyCreate
-from models.model_user import Users
+from models.model_company import CompanyRead, CompanyCreate, CompanyPage
+from models.model_export import CompanyExportCreate, CompanyExportRead
+from models.model_leaderboard import LeaderboardMetric, LeaderboardPeriod, LeaderboardRead
+from models.model_user import UserImportResult, Users
 from core.core_company import (
-    get_all_companies,
-    get_company_by_id,
-    create_company,
-    update_company,
-    delete_company
+    get_all_companies_async,
+    DEFAULT_COMPANY_PAGE_SIZE,
+    MAX_COMPANY_PAGE_SIZE,
+    get_company_by_id_async,
+    create_company_async,
+    update_company_async,
+    delete_company_async
+)
+from core.core_export import (
+    create_company_export_async,
+    get_company_export_async,
+    get_company_export_file_async,
+    run_company_export,
+)
+from core.core_user_import import import_company_users, import_format
+from core.core_leaderboard import (
+    get_company_leaderboard_async,
+    DEFAULT_LEADERBOARD_SIZE,
+    MAX_LEADERBOARD_SIZE,
 )
 
 router = APIRouter(prefix="/company", tags=["Company"])
 
 
-@router.get("/", response_model=list[CompanyRead])
-def list_companies(
-    session: Session = Depends(get_session),
+@router.get("/", response_model=CompanyPage)
+async def list_companies(
+    limit: int = Query(DEFAULT_COMPANY_PAGE_SIZE, ge=1, le=MAX_COMPANY_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
-    """Liste toutes les entreprises (admin uniquement)."""
+    """
+    Liste les entreprises page par page (admin uniquement).
+
+    Renvoyer `next_cursor` dans `cursor` pour la page suivante.
+    """
     require_admin(current_user)
-    return get_all_companies(session)
+    return ORJSONResponse(await get_all_companies_async(session, limit, cursor))
 
 
 @router.get("/{company_id}", response_model=CompanyRead)
-def read_company(
+async def read_company(
     company_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
     """Recupere une entreprise par son ID (admin uniquement)."""
     require_admin(current_user)
-    company = get_company_by_id(company_id, session)
+    company = await get_company_by_id_async(company_id, session)
     if not company:
         raise HTTPException(status_code=404, detail="Entreprise introuvable")
     return company
 
 
 @router.post("/", response_model=CompanyRead)
-def create_new_company(
+async def create_new_company(
     company_in: CompanyCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
     """Cree une nouvelle entreprise (admin uniquement)."""
     require_admin(current_user)
-    company = create_company(company_in, session)
+    company = await create_company_async(company_in, session)
     return company
 
 
 @router.put("/{company_id}", response_model=CompanyRead)
-def update_existing_company(
+async def update_existing_company(
     company_id: int,
     company_in: CompanyCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
     """Met a jour une entreprise (admin uniquement)."""
     require_admin(current_user)
-    company = update_company(company_id, company_in, session)
+    company = await update_company_async(company_id, company_in, session)
     if not company:
         raise HTTPException(status_code=404, detail="Entreprise introuvable")
     return company
 
 
 @router.delete("/{company_id}", status_code=204)
-def remove_company(
+async def remove_company(
     company_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
     """Supprime une entreprise (admin uniquement)."""
     require_admin(current_user)
-    ok = delete_company(company_id, session)
+    ok = await delete_company_async(company_id, session)
     if not ok:
         raise HTTPException(status_code=404, detail="Entreprise introuvable")
     return None
+
+
+@router.get("/{company_id}/leaderboard", response_model=LeaderboardRead)
+async def read_company_leaderboard(
+    company_id: int,
+    period: LeaderboardPeriod = LeaderboardPeriod.week,
+    metric: LeaderboardMetric = LeaderboardMetric.score,
+    limit: int = Query(DEFAULT_LEADERBOARD_SIZE, ge=1, le=MAX_LEADERBOARD_SIZE),
+    day: Optional[date] = None,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Users = Depends(get_current_user)
+):
+    """
+    Classement des employes d'une entreprise (admin ou employe de l'entreprise).
+
+    `period` choisit la fenetre (jour, semaine, mois) contenant `day`
+    (aujourd'hui par defaut), `metric` le critere (score ou distance).
+    """
+    require_company_access(current_user, company_id)
+    if not await get_company_by_id_async(company_id, session):
+        raise HTTPException(status_code=404, detail="Entreprise introuvable")
+    return await get_company_leaderboard_async(session, company_id, period, metric, limit, day)
+
+
+@router.post("/{company_id}/users/import", response_model=UserImportResult)
+def import_users(
+    company_id: int,
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    check_domain: bool = True,
+    session: Session = Depends(get_session),
+    current_user: Users = Depends(get_current_user)
+):
+    """
+    Importe les employes d'une entreprise depuis un fichier CSV ou NDJSON (admin uniquement).
+
+    Champs : `username`, `email`, `password` (optionnel : sans mot de passe,
+    un `invite_token` est genere et retourne dans le rapport). `format` est
+    deduit de l'extension du fichier s'il est omis. Avec `check_domain`, les
+    emails doivent appartenir au domaine de l'entreprise.
+
+    Les lignes sont traitees independamment : le rapport donne le resultat
+    de chacune (`created`, `conflict` ou `invalid`).
+    """
+    # Route synchrone (threadpool) : la lecture du fichier et l'attente des
+    # hashs par paquets (`hash_passwords`) sont bloquantes
+    require_admin(current_user)
+    return import_company_users(
+        session, company_id, file.file.read(), import_format(format, file.filename), check_domain
+    )
+
+
+@router.post(
+    "/{company_id}/export",
+    response_model=CompanyExportRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def request_company_export(
+    company_id: int,
+    export_in: CompanyExportCreate,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Users = Depends(get_current_user)
+):
+    """
+    Lance l'export des trajets valides des employes (admin uniquement).
+
+    L'export s'execute en tache de fond : suivre son etat avec
+    `GET /company/{id}/export/{job_id}`, puis telecharger le fichier avec
+    `GET /company/{id}/export/{job_id}/download`.
+    """
+    require_admin(current_user)
+    job = await create_company_export_async(session, company_id, export_in, current_user.id)
+    background_tasks.add_task(run_company_export, job.id)
+    return job
+
+
+@router.get("/{company_id}/export/{job_id}", response_model=CompanyExportRead)
+async def read_company_export(
+    company_id: int,
+    job_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Users = Depends(get_current_user)
+):
+    """Etat d'un export (admin uniquement)."""
+    require_admin(current_user)
+    return await get_company_export_async(session, company_id, job_id)
+
+
+@router.get("/{company_id}/export/{job_id}/download")
+async def download_company_export(
+    company_id: int,
+    job_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Users = Depends(get_current_user)
+):
+    """Telecharge le fichier d'un export termine (admin uniquement)."""
+    require_admin(current_user)
+    path, filename, media_type = await get_company_export_file_async(session, company_id, job_id)
+    return FileResponse(path, media_type=media_type, filename=filename)
@@ -5,21 +5,29 @@ Tous les endpoints sont protégés par authentification JWT.
 L'utilisateur ne peut accéder qu'à ses propres trajets.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, status
-from sqlmodel import Session
+from datetime import datetime
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Body, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from core.database import get_session
+from core.database import get_async_session
 from core.core_auth import get_current_user
+from core.core_response_cache import JOURNEYS_VERSION, STATISTICS_VERSION, conditional_response
+from core.core_serialization import dumps
 from models.model_user import Users
-from models.model_journey import JourneyCreate, JourneyRead
+from models.model_journey import JourneyCreate, JourneyRead, JourneyPage, JourneyBatchResult
 from core.core_journey import (
-    create_validated_journey_core,
-    list_validated_journeys_core,
-    get_journey_core,
-    reject_journey_core,
-    delete_journey_core,
-    get_user_statistics_core,
+    create_validated_journey_async,
+    create_validated_journeys_bulk_async,
+    list_validated_journeys_async,
+    stream_validated_journeys_async,
+    DEFAULT_JOURNEY_PAGE_SIZE,
+    MAX_JOURNEY_PAGE_SIZE,
+    get_journey_async,
+    reject_journey_async,
+    delete_journey_async,
+    get_user_statistics_async,
 )
 
 router = APIRouter(prefix="/journey", tags=["Journey"])
@@ -40,52 +48,135 @@ router = APIRouter(prefix="/journey", tags=["Journey"])
     - Enregistre le trajet avec statut VALIDATED
 
     Le score est attribué immédiatement.
+
+    Idempotence : si l'app fournit un identifiant de trajet (`client_journey_id`
+    ou en-tête `Idempotency-Key`), un nouvel envoi du même trajet renvoie le
+    trajet existant avec le statut 200, sans nouveau score.
     """
 )
-def create_validated_journey(
+async def create_validated_journey(
     data: JourneyCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=64
+    ),
     current_user: Users = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Créer un trajet validé (depuis l'app mobile)."""
-    return create_validated_journey_core(session, data, current_user.id)
+    journey, created = await create_validated_journey_async(
+        session, data, current_user.id, idempotency_key
+    )
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return journey
+
+
+@router.post(
+    "/batch",
+    response_model=JourneyBatchResult,
+    status_code=status.HTTP_200_OK,
+    summary="Créer des trajets validés par lot",
+    description="""
+    Crée plusieurs trajets validés en une seule requête.
+
+    Utilisé par l'app mobile pour synchroniser les trajets enregistrés hors ligne :
+    - Chaque trajet est validé individuellement (schéma `JourneyCreate` puis
+      règles métier) : un élément invalide n'empêche pas les autres
+    - Durées et scores sont calculés pour tous les trajets valides
+    - Les trajets valides sont enregistrés en une seule transaction
+    - Les erreurs sont signalées par élément (champ `index`)
+    - Les trajets déjà reçus (même `client_journey_id`) sont renvoyés avec
+      `duplicate: true`, sans être comptés une seconde fois
+    """
+)
+async def create_validated_journeys_batch(
+    # Schéma validé élément par élément dans le core (erreurs par index)
+    items: List[Any] = Body(..., description="Trajets au format JourneyCreate"),
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Créer des trajets validés par lot (synchronisation hors ligne)."""
+    return await create_validated_journeys_bulk_async(session, items, current_user.id)
 
 
 @router.get(
     "/validated",
-    response_model=List[JourneyRead],
+    response_model=JourneyPage,
     summary="Lister les trajets validés",
     description="""
-    Récupère tous les trajets validés de l'utilisateur connecté.
+    Récupère les trajets validés de l'utilisateur connecté, page par page.
 
     Ces trajets :
     - Ont été validés par l'utilisateur
     - Ont un score attribué
     - Sont comptabilisés dans les statistiques
     - Sont triés du plus récent au plus ancien
+
+    Pagination : renvoyer `next_cursor` dans le paramètre `cursor` pour obtenir
+    la page suivante (`next_cursor` vaut null sur la dernière page).
+
+    Avec `format=ndjson`, tout l'historique (à partir de `cursor` si fourni) est
+    envoyé en flux, un trajet JSON par ligne ; `limit` est alors ignoré.
+
+    `since` limite la liste aux trajets partis depuis cette date : seules les
+    partitions récentes de l'historique sont lues.
+
+    Les pages JSON portent un ETag : renvoyé dans `If-None-Match`, il donne une
+    réponse 304 sans corps tant qu'aucun trajet n'a été créé, rejeté ou supprimé.
     """
 )
-def list_validated_journeys(
+async def list_validated_journeys(
+    request: Request,
+    limit: int = Query(DEFAULT_JOURNEY_PAGE_SIZE, ge=1, le=MAX_JOURNEY_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    format: Literal["json", "ndjson"] = "json",
     current_user: Users = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    """Liste tous les trajets validés de l'utilisateur."""
-    return list_validated_journeys_core(session, current_user.id)
+    """Liste les trajets validés de l'utilisateur (paginés ou en flux NDJSON)."""
+    if format == "ndjson":
+        journeys = await stream_validated_journeys_async(
+            session, current_user.id, cursor, since
+        )
+
+        async def lines():
+            async for journey in journeys:
+                yield dumps(journey) + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return await conditional_response(
+        session, request, current_user.id, JOURNEYS_VERSION,
+        f"validated|{limit}|{cursor}|{since.isoformat() if since else None}",
+        lambda: list_validated_journeys_async(session, current_user.id, limit, cursor, since),
+    )
 
 
 @router.get(
     "/{journey_id}",
     response_model=JourneyRead,
     summary="Récupérer un trajet",
-    description="Récupère un trajet par son ID. L'utilisateur ne peut accéder qu'à ses propres trajets."
+    description="""
+    Récupère un trajet par son ID. L'utilisateur ne peut accéder qu'à ses propres trajets.
+
+    La réponse porte un ETag (304 sur `If-None-Match` tant que les trajets
+    de l'utilisateur n'ont pas changé).
+    """
 )
-def get_journey(
+async def get_journey(
+    request: Request,
     journey_id: int,
     current_user: Users = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Récupère un trajet par son ID."""
-    return get_journey_core(session, journey_id, current_user.id)
+    return await conditional_response(
+        session, request, current_user.id, JOURNEYS_VERSION, f"journey|{journey_id}",
+        lambda: get_journey_async(session, journey_id, current_user.id),
+        lambda journey: JourneyRead.model_validate(journey).model_dump_json().encode(),
+    )
 
 
 @router.post(
@@ -102,13 +193,13 @@ def get_journey(
     - Ne peut plus être validé
     """
 )
-def reject_journey(
+async def reject_journey(
     journey_id: int,
     current_user: Users = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Rejette un trajet."""
-    return reject_journey_core(session, journey_id, current_user.id)
+    return await reject_journey_async(session, journey_id, current_user.id)
 
 
 @router.delete(
@@ -121,13 +212,13 @@ def reject_journey(
     Note : Dans un système de production, on préférerait un soft delete.
     """
 )
-def delete_journey(
+async def delete_journey(
     journey_id: int,
     current_user: Users = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Supprime un trajet."""
-    return delete_journey_core(session, journey_id, current_user.id)
+    return await delete_journey_async(session, journey_id, current_user.id)
 
 
 @router.get(
@@ -136,15 +227,23 @@ def delete_journey(
     description="""
     Récupère les statistiques simplifiées de l'utilisateur connecté.
 
-    Calcule :
+    Retourne :
     - Nombre total de trajets validés
     - Distance totale parcourue
     - Score total
+    - Le détail par mode de transport (`by_transport`)
+
+    La réponse porte un ETag (304 sur `If-None-Match` tant que les
+    statistiques n'ont pas été mises à jour).
     """
 )
-def get_my_statistics(
+async def get_my_statistics(
+    request: Request,
     current_user: Users = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Récupère les statistiques de l'utilisateur."""
-    return get_user_statistics_core(session, current_user.id)
+    return await conditional_response(
+        session, request, current_user.id, STATISTICS_VERSION, "statistics",
+        lambda: get_user_statistics_async(session, current_user.id),
+    )
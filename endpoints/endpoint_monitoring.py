@@ -0,0 +1,47 @@
+"""
+Endpoints de supervision du backend (admin uniquement).
+
+Les valeurs sont propres au worker uvicorn qui traite la requete.
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.core_auth import get_current_user, require_admin
+from core.core_metrics import outbox_metric_lines, pool_metric_lines, render_metrics
+from core.core_outbox import get_outbox_status_async
+from core.database import get_async_session, get_pool_status
+from models.model_user import Users
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+
+# /metrics est lu par Prometheus sans token : a restreindre au reseau interne
+metrics_router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/pool")
+async def read_pool_status(current_user: Users = Depends(get_current_user)):
+    """Etat du pool de connexions a la base (admin uniquement)."""
+    require_admin(current_user)
+    return get_pool_status()
+
+
+@router.get("/outbox")
+async def read_outbox_status(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Users = Depends(get_current_user)
+):
+    """Profondeur de la file de traitements differes (admin uniquement)."""
+    require_admin(current_user)
+    return await get_outbox_status_async(session)
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics(session: AsyncSession = Depends(get_async_session)):
+    """Metriques du worker au format texte Prometheus."""
+    extra_lines = pool_metric_lines(get_pool_status()) + outbox_metric_lines(await get_outbox_status_async(session))
+    return PlainTextResponse(
+        render_metrics(extra_lines),
+        media_type="text/plain; version=0.0.4",
+    )
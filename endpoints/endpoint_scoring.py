@@ -0,0 +1,86 @@
+"""
+Endpoints de gestion des règles de score versionnées.
+
+La publication d'une version est réservée aux admins ; les règles actives
+sont consultables par tout utilisateur authentifié (affichage dans l'app).
+"""
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.database import get_async_session
+from core.core_auth import get_current_user, require_admin
+from core.core_scoring_rules import (
+    get_scoring_rule_set_async,
+    list_scoring_rule_sets_async,
+    publish_scoring_rules_async,
+)
+from models.model_scoring import ScoringRuleSetCreate, ScoringRuleSetRead
+from models.model_user import Users
+
+router = APIRouter(prefix="/scoring", tags=["Scoring"])
+
+
+@router.get(
+    "/rules",
+    response_model=ScoringRuleSetRead,
+    summary="Règles de score actives",
+)
+async def read_active_rules(
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Retourne la version active des règles de score."""
+    return await get_scoring_rule_set_async(session)
+
+
+@router.get(
+    "/rules/versions",
+    response_model=list[ScoringRuleSetRead],
+    summary="Historique des règles de score",
+)
+async def list_rule_versions(
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Liste les versions publiées (admin uniquement)."""
+    require_admin(current_user)
+    return await list_scoring_rule_sets_async(session)
+
+
+@router.get(
+    "/rules/{version}",
+    response_model=ScoringRuleSetRead,
+    summary="Récupérer une version des règles de score",
+)
+async def read_rule_version(
+    version: int,
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Retourne une version des règles (admin uniquement)."""
+    require_admin(current_user)
+    return await get_scoring_rule_set_async(session, version)
+
+
+@router.post(
+    "/rules",
+    response_model=ScoringRuleSetRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Publier une version des règles de score",
+    description="""
+    Publie une nouvelle version des règles, qui devient la version active.
+
+    - Les nouveaux trajets sont notés avec cette version (`score_version`)
+    - Les autres workers l'appliquent au plus tard après SCORING_RULES_REFRESH_SECONDS
+    - L'historique n'est pas recalculé : `python manage.py rescore --outdated`
+    """
+)
+async def publish_rules(
+    data: ScoringRuleSetCreate,
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Publie une nouvelle version des règles de score (admin uniquement)."""
+    require_admin(current_user)
+    return await publish_scoring_rules_async(session, data, current_user.id)
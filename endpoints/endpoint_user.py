@@ -1,52 +1,85 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
-from core.database import get_session
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.database import get_async_session
 from core.core_auth import get_current_user, require_admin
 
 from core.core_user import (
-    list_users_core,
-    get_user_core,
-    create_user_core,
-    delete_user_core
+    list_users_async,
+    DEFAULT_USER_PAGE_SIZE,
+    MAX_USER_PAGE_SIZE,
+    get_user_async,
+    create_user_async,
+    delete_user_async,
+    update_user_role_async
 )
 
-from models.model_user import Users, UserRead, UserCreate
+from models.model_role import UserRole
+from models.model_user import Users, UserRead, UserCreate, UserPage, UserRoleUpdate
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.get("", response_model=list[UserRead])
-def get_all_users(
-    session: Session = Depends(get_session),
+@router.get("", response_model=UserPage)
+async def get_all_users(
+    limit: int = Query(DEFAULT_USER_PAGE_SIZE, ge=1, le=MAX_USER_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    id_company: Optional[int] = None,
+    role: Optional[UserRole] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
-    """Liste tous les utilisateurs (admin uniquement)."""
+    """
+    Liste les utilisateurs page par page (admin uniquement, encodage orjson).
+
+    Filtres optionnels : entreprise, role, periode de creation
+    (`created_from` inclus, `created_to` exclu). Renvoyer `next_cursor` dans
+    `cursor` pour la page suivante.
+    """
     require_admin(current_user)
-    return list_users_core(session)
+    return ORJSONResponse(await list_users_async(
+        session, limit, cursor, id_company, role, created_from, created_to
+    ))
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user_by_id(
+async def get_user_by_id(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
     """Recupere un utilisateur par son ID (authentification requise)."""
-    return get_user_core(session, user_id)
+    return await get_user_async(session, user_id)
 
 
 @router.post("", response_model=UserRead)
-def create_user(data: UserCreate, session: Session = Depends(get_session)):
+async def create_user(data: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """Cree un nouvel utilisateur (endpoint public pour inscription)."""
-    return create_user_core(session, data)
+    return await create_user_async(session, data)
+
+
+@router.patch("/{user_id}/role", response_model=UserRead)
+async def update_user_role(
+    user_id: int,
+    data: UserRoleUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Users = Depends(get_current_user)
+):
+    """Modifie le role d'un utilisateur (admin uniquement)."""
+    require_admin(current_user)
+    return await update_user_role_async(session, user_id, data.role)
 
 
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: Users = Depends(get_current_user)
 ):
     """Supprime un utilisateur (admin uniquement)."""
     require_admin(current_user)
-    return delete_user_core(session, user_id)
+    return await delete_user_async(session, user_id)
@@ -0,0 +1,221 @@
+"""
+Commandes d'administration du backend.
+
+Usage :
+    python manage.py rebuild-statistics [--user ID]
+    python manage.py rebuild-leaderboards [--company ID]
+    python manage.py rescore [--outdated | --version V ...] [--restart] [--chunk-size N]
+    python manage.py partition-journeys [--months-ahead N] [--keep-old-table]
+    python manage.py ensure-journey-partitions [--months-ahead N]
+    python manage.py archive-journeys [--older-than-months N] [--dir PATH] [--drop]
+    python manage.py process-outbox [--retry-failed]
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+
+from sqlmodel import Session
+
+from core.database import engine, init_db
+# Tables des reconstructions, du recalcul et de l'outbox creees par
+# init_db() dans main()
+from models import (  # noqa: F401
+    model_company,
+    model_data_version,
+    model_journey,
+    model_leaderboard,
+    model_outbox,
+    model_rescore,
+    model_scoring,
+    model_user,
+    model_user_statistics,
+)
+
+
+def _drain_outbox() -> int:
+    """Applique les evenements outbox en attente."""
+    import core.core_journey  # noqa: F401 (enregistre les handlers)
+    from core.core_outbox import drain_outbox
+
+    return drain_outbox()
+
+
+def rebuild_statistics(args: argparse.Namespace) -> None:
+    """Reconstruit la table user_statistics depuis la table journey."""
+    from core.core_statistics import rebuild_user_statistics
+
+    with Session(engine) as session:
+        rebuild_user_statistics(session, args.user)
+    print("user_statistics rebuilt")
+
+
+def rebuild_leaderboards(args: argparse.Namespace) -> None:
+    """Reconstruit la table company_leaderboard depuis la table journey."""
+    from core.core_leaderboard import rebuild_company_leaderboards
+
+    with Session(engine) as session:
+        rebuild_company_leaderboards(session, args.company)
+    print("company_leaderboard rebuilt")
+
+
+def rescore(args: argparse.Namespace) -> None:
+    """Recalcule les scores des trajets avec la version active des regles."""
+    from core.core_rescore import rescore_journeys
+    from core.core_scoring_rules import seed_scoring_rules
+
+    def progress(checkpoint):
+        print(
+            f"  last_id={checkpoint.last_id} scanned={checkpoint.scanned_rows} "
+            f"updated={checkpoint.updated_rows}",
+            flush=True,
+        )
+
+    options = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+    with Session(engine) as session:
+        seed_scoring_rules(session)
+        checkpoint = rescore_journeys(
+            session,
+            restart=args.restart,
+            progress=progress,
+            versions=args.version,
+            outdated_only=args.outdated,
+            **options
+        )
+        print(
+            f"Rescored {checkpoint.updated_rows} of {checkpoint.scanned_rows} journeys, "
+            "statistics and leaderboards rebuilt"
+        )
+
+
+def partition_journeys(args: argparse.Namespace) -> None:
+    """Convertit la table journey en table partitionnee par mois (PostgreSQL)."""
+    from core.core_partition import partition_journey_table
+
+    options = {"months_ahead": args.months_ahead} if args.months_ahead is not None else {}
+    with Session(engine) as session:
+        result = partition_journey_table(session, keep_old_table=args.keep_old_table, **options)
+    print(
+        f"Copied {result['copied_rows']} journeys into "
+        f"{len(result['partitions'])} monthly partitions"
+    )
+
+
+def ensure_partitions(args: argparse.Namespace) -> None:
+    """Cree les partitions mensuelles a venir de la table journey."""
+    from core.core_partition import ensure_journey_partitions, is_journey_partitioned
+
+    options = {"months_ahead": args.months_ahead} if args.months_ahead is not None else {}
+    with Session(engine) as session:
+        if not is_journey_partitioned(session):
+            print("Table journey is not partitioned, run partition-journeys first")
+            return
+        created = ensure_journey_partitions(session, **options)
+    print(f"Created partitions: {', '.join(created)}" if created else "Partitions up to date")
+
+
+def archive_journeys(args: argparse.Namespace) -> None:
+    """Exporte en Parquet puis detache les partitions anciennes de journey."""
+    from core.core_partition import archive_journey_partitions
+
+    def progress(archive):
+        print(f"  {archive['partition']}: {archive['rows']} journeys -> {archive['path']}", flush=True)
+
+    options = {}
+    if args.older_than_months is not None:
+        options["older_than_months"] = args.older_than_months
+    if args.dir:
+        options["archive_dir"] = args.dir
+    with Session(engine) as session:
+        archives = archive_journey_partitions(session, drop=args.drop, progress=progress, **options)
+    print(f"Archived {len(archives)} partitions")
+
+
+def process_outbox(args: argparse.Namespace) -> None:
+    """Traite les evenements outbox en attente (sans attendre l'API)."""
+    from core.core_outbox import get_outbox_status, retry_failed_events
+
+    if args.retry_failed:
+        with Session(engine) as session:
+            print(f"Requeued {retry_failed_events(session)} failed events")
+    processed = _drain_outbox()
+    with Session(engine) as session:
+        status = get_outbox_status(session)
+    print(
+        f"Processed {processed} events "
+        f"(pending={status['pending']}, failed={status['failed']})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Administration Green Mobility Pass")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-statistics", help="Recalcule les statistiques utilisateur"
+    )
+    rebuild.add_argument("--user", type=int, default=None, help="ID de l'utilisateur")
+    rebuild.set_defaults(handler=rebuild_statistics)
+
+    leaderboards = commands.add_parser(
+        "rebuild-leaderboards", help="Recalcule les classements d'entreprise"
+    )
+    leaderboards.add_argument("--company", type=int, default=None, help="ID de l'entreprise")
+    leaderboards.set_defaults(handler=rebuild_leaderboards)
+
+    rescore_parser = commands.add_parser(
+        "rescore", help="Recalcule les scores des trajets (reprend un recalcul interrompu)"
+    )
+    rescore_parser.add_argument("--restart", action="store_true",
+                                help="Ignore le point de reprise")
+    rescore_filter = rescore_parser.add_mutually_exclusive_group()
+    rescore_filter.add_argument("--outdated", action="store_true",
+                                help="Seulement les trajets notes avec une autre version")
+    rescore_filter.add_argument("--version", type=int, action="append", default=None,
+                                help="Seulement les trajets notes avec cette version")
+    rescore_parser.add_argument("--chunk-size", type=int, default=None,
+                                help="Trajets par transaction (50000 par defaut)")
+    rescore_parser.set_defaults(handler=rescore)
+
+    partition_parser = commands.add_parser(
+        "partition-journeys", help="Partitionne la table journey par mois (PostgreSQL)"
+    )
+    partition_parser.add_argument("--months-ahead", type=int, default=None,
+                                  help="Mois a venir a creer (JOURNEY_PARTITIONS_AHEAD)")
+    partition_parser.add_argument("--keep-old-table", action="store_true",
+                                  help="Conserve la table d'origine (journey_unpartitioned)")
+    partition_parser.set_defaults(handler=partition_journeys)
+
+    ensure_parser = commands.add_parser(
+        "ensure-journey-partitions", help="Cree les partitions des mois a venir"
+    )
+    ensure_parser.add_argument("--months-ahead", type=int, default=None,
+                               help="Mois a venir a creer (JOURNEY_PARTITIONS_AHEAD)")
+    ensure_parser.set_defaults(handler=ensure_partitions)
+
+    archive_parser = commands.add_parser(
+        "archive-journeys", help="Archive en Parquet puis detache les partitions anciennes"
+    )
+    archive_parser.add_argument("--older-than-months", type=int, default=None,
+                                help="Age minimal des partitions (JOURNEY_ARCHIVE_AFTER_MONTHS)")
+    archive_parser.add_argument("--dir", default=None,
+                                help="Repertoire des archives (JOURNEY_ARCHIVE_DIR)")
+    archive_parser.add_argument("--drop", action="store_true",
+                                help="Supprime les tables detachees apres export")
+    archive_parser.set_defaults(handler=archive_journeys)
+
+    outbox_parser = commands.add_parser(
+        "process-outbox", help="Traite les evenements outbox en attente"
+    )
+    outbox_parser.add_argument("--retry-failed", action="store_true",
+                               help="Remet en file les evenements abandonnes")
+    outbox_parser.set_defaults(handler=process_outbox)
+
+    args = parser.parse_args()
+    init_db()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
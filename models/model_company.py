@@ -22,4 +22,16 @@ class CompanyRead(SQLModel):
     id: int
     company_name: str
     domain_name: str
-    company_locate: str
\ No newline at end of file
+    company_locate: str
+
+
+class CompanyPage(SQLModel):
+    """
+    Page d'entreprises (liste admin).
+
+    `next_cursor` est a renvoyer tel quel pour la page suivante (None sur la
+    derniere page). `total_estimate` estime le nombre total d'entreprises.
+    """
+    items: List[CompanyRead]
+    next_cursor: Optional[str] = None
+    total_estimate: int
@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field
+
+
+class UserDataVersion(SQLModel, table=True):
+    """
+    Versions des données d'un utilisateur servies en lecture (voir core_response_cache).
+
+    - journeys_version : incrémentée à chaque création, rejet ou suppression
+      de trajet, dans la transaction de l'écriture
+    - statistics_version : incrémentée à chaque mise à jour des statistiques
+      (traitement outbox, reconstruction)
+
+    Une version inchangée garantit une réponse identique : elle sert d'ETag et
+    de clé du cache de réponses. Absence de ligne : version 0.
+    """
+    __tablename__ = "user_data_version"
+
+    id_user: int = Field(foreign_key="users.id", primary_key=True)
+    journeys_version: int = Field(default=0, nullable=False)
+    statistics_version: int = Field(default=0, nullable=False)
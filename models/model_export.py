@@ -0,0 +1,75 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class ExportFormat(str, Enum):
+    """Format du fichier d'export."""
+    parquet = "parquet"
+    csv = "csv"
+
+
+class ExportStatus(str, Enum):
+    """
+    Avancement d'un export.
+
+    - pending: en attente d'exécution
+    - running: en cours d'écriture
+    - completed: fichier disponible au téléchargement
+    - failed: échec (voir `error`)
+    """
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class CompanyExportJob(SQLModel, table=True):
+    """
+    Export des trajets d'une entreprise (voir core_export).
+
+    L'état est stocké en base : tous les workers peuvent répondre au suivi
+    d'un export lancé par l'un d'eux.
+    """
+    __tablename__ = "company_export_job"
+
+    id: str = Field(primary_key=True, max_length=32)
+    id_company: int = Field(foreign_key="company.id", nullable=False, index=True)
+    format: ExportFormat = Field(nullable=False)
+    status: ExportStatus = Field(default=ExportStatus.pending, nullable=False)
+    date_from: Optional[datetime] = Field(default=None, description="Départs à partir de cette date")
+    date_to: Optional[datetime] = Field(default=None, description="Départs avant cette date")
+    rows: int = Field(default=0, nullable=False, description="Trajets écrits")
+    path: Optional[str] = Field(default=None, max_length=500)
+    error: Optional[str] = Field(default=None, max_length=500)
+    created_by: Optional[int] = Field(default=None, description="ID de l'admin demandeur")
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    updated_at: Optional[datetime] = Field(default=None, description="Dernier signe de vie du job")
+    finished_at: Optional[datetime] = Field(default=None)
+
+
+class CompanyExportCreate(SQLModel):
+    """
+    Schéma de demande d'export.
+
+    `date_from` / `date_to` bornent les départs (ex. une année civile pour
+    un rapport RSE).
+    """
+    format: ExportFormat = ExportFormat.parquet
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
+
+class CompanyExportRead(SQLModel):
+    """Schéma de suivi d'un export."""
+    id: str
+    id_company: int
+    format: ExportFormat
+    status: ExportStatus
+    date_from: Optional[datetime]
+    date_to: Optional[datetime]
+    rows: int
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
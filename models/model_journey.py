@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from models.model_transport_type import TransportType
@@ -15,10 +16,33 @@ class Journey(SQLModel, table=True):
     Pas d'historique de modification pour simplifier la V1.
     """
     __tablename__ = "journey"
+    __table_args__ = (
+        # Statistiques et listing par utilisateur : distance et score sont
+        # inclus pour que l'agrégation soit servie par l'index seul (PostgreSQL)
+        Index(
+            "ix_journey_user_status_departure",
+            "id_user",
+            "status",
+            "time_departure",
+            postgresql_include=["distance_km", "score_journey"],
+        ),
+        # Idempotence des envois de l'app mobile (les NULL ne sont pas comparés)
+        Index(
+            "ux_journey_user_client_journey_id",
+            "id_user",
+            "client_journey_id",
+            unique=True,
+        ),
+    )
 
     # Identifiants
     id: Optional[int] = Field(default=None, primary_key=True)
     id_user: int = Field(foreign_key="users.id", nullable=False, index=True)
+    client_journey_id: Optional[str] = Field(
+        default=None,
+        max_length=64,
+        description="Identifiant généré par l'app mobile (clé d'idempotence)"
+    )
 
     # Cycle de vie
     status: JourneyStatus = Field(
@@ -59,6 +83,11 @@ class Journey(SQLModel, table=True):
         default=None,
         description="Score total attribué"
     )
+    score_version: Optional[int] = Field(
+        default=None,
+        index=True,
+        description="Version des règles de score utilisée (scoring_rule_set)"
+    )
 
     # Dates de gestion
     created_at: datetime = Field(
@@ -81,7 +110,9 @@ class JourneyCreate(SQLModel):
     Schéma de création d'un trajet VALIDÉ.
 
     L'utilisateur envoie uniquement des trajets qu'il a validés depuis l'app mobile.
+    `client_journey_id` (UUID généré par l'app) rend l'envoi idempotent.
     """
+    client_journey_id: Optional[str] = Field(default=None, min_length=1, max_length=64)
     place_departure: str
     place_arrival: str
     time_departure: datetime
@@ -95,6 +126,7 @@ class JourneyRead(SQLModel):
     """Schéma de lecture d'un trajet."""
     id: int
     id_user: int
+    client_journey_id: Optional[str] = None
     status: JourneyStatus
     detection_source: DetectionSource
     place_departure: str
@@ -105,6 +137,41 @@ class JourneyRead(SQLModel):
     duration_minutes: int
     transport_type: TransportType
     score_journey: Optional[int]
+    score_version: Optional[int] = None
     created_at: datetime
     validated_at: Optional[datetime]
-    rejected_at: Optional[datetime]
\ No newline at end of file
+    rejected_at: Optional[datetime]
+
+
+class JourneyPage(SQLModel):
+    """
+    Page de trajets.
+
+    `next_cursor` est à renvoyer tel quel pour obtenir la page suivante,
+    il vaut None sur la dernière page.
+    """
+    items: List[JourneyRead]
+    next_cursor: Optional[str] = None
+
+
+class JourneyBatchItemResult(SQLModel):
+    """
+    Résultat d'un élément d'un envoi groupé de trajets.
+
+    `journey` est renseigné si le trajet a été créé, `error` sinon.
+    `duplicate` indique un trajet déjà envoyé (même `client_journey_id`) :
+    `journey` est alors le trajet existant.
+    `index` correspond à la position de l'élément dans la requête.
+    """
+    index: int
+    journey: Optional[JourneyRead] = None
+    duplicate: bool = False
+    error: Optional[str] = None
+
+
+class JourneyBatchResult(SQLModel):
+    """Schéma de réponse d'un envoi groupé de trajets."""
+    created: int
+    duplicates: int = 0
+    failed: int
+    results: List[JourneyBatchItemResult]
@@ -0,0 +1,73 @@
+from datetime import date
+from enum import Enum
+from typing import List
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class LeaderboardPeriod(str, Enum):
+    """
+    Fenêtre temporelle d'un classement.
+
+    - day: journée calendaire (UTC)
+    - week: semaine ISO, du lundi au dimanche
+    - month: mois calendaire
+    """
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class LeaderboardMetric(str, Enum):
+    """Critère de classement des employés."""
+    score = "score"
+    distance = "distance"
+
+
+class CompanyLeaderboardEntry(SQLModel, table=True):
+    """
+    Totaux précalculés d'un employé pour une fenêtre de classement.
+
+    Une ligne par (entreprise, période, début de fenêtre, utilisateur),
+    mise à jour à chaque création, rejet ou suppression de trajet validé.
+    Les index triés permettent de lire le top K sans agréger la table journey.
+    """
+    __tablename__ = "company_leaderboard"
+    __table_args__ = (
+        Index(
+            "ix_company_leaderboard_score",
+            "id_company", "period", "bucket_start", "total_score",
+        ),
+        Index(
+            "ix_company_leaderboard_distance",
+            "id_company", "period", "bucket_start", "total_distance_km",
+        ),
+    )
+
+    id_company: int = Field(foreign_key="company.id", primary_key=True)
+    period: LeaderboardPeriod = Field(primary_key=True)
+    bucket_start: date = Field(primary_key=True)
+    id_user: int = Field(foreign_key="users.id", primary_key=True)
+
+    total_journeys: int = Field(default=0, nullable=False)
+    total_distance_km: float = Field(default=0.0, nullable=False)
+    total_score: int = Field(default=0, nullable=False)
+
+
+class LeaderboardEntryRead(SQLModel):
+    """Ligne d'un classement."""
+    rank: int
+    id_user: int
+    username: str
+    total_journeys: int
+    total_distance_km: float
+    total_score: int
+
+
+class LeaderboardRead(SQLModel):
+    """Schéma de lecture d'un classement d'entreprise."""
+    id_company: int
+    period: LeaderboardPeriod
+    metric: LeaderboardMetric
+    bucket_start: date
+    entries: List[LeaderboardEntryRead]
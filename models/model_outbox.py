@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, Index, JSON
+from sqlmodel import SQLModel, Field
+
+
+class OutboxEvent(SQLModel, table=True):
+    """
+    Traitement différé écrit dans la transaction de l'écriture qui le déclenche
+    (voir core_outbox).
+
+    Un événement est supprimé une fois traité. En cas d'échec, il est
+    reprogrammé (`available_at`) avec un délai croissant, puis abandonné
+    (`failed_at`) après OUTBOX_MAX_ATTEMPTS tentatives.
+    """
+    __tablename__ = "outbox_event"
+    __table_args__ = (
+        # Lecture des événements à traiter : non abandonnés et échus
+        Index("ix_outbox_event_pending", "failed_at", "available_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    topic: str = Field(max_length=100, nullable=False)
+    payload: dict = Field(sa_column=Column(JSON, nullable=False))
+    attempts: int = Field(default=0, nullable=False)
+    available_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    last_error: Optional[str] = Field(default=None, max_length=500)
+    failed_at: Optional[datetime] = Field(default=None)
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class RefreshTokenFamily(SQLModel, table=True):
+    """
+    Session ouverte par une connexion : chaîne des refresh tokens successifs
+    (voir core_refresh_token).
+
+    Le refresh token porte l'identifiant de la famille (`fid`) et sa
+    génération (`gen`). Chaque rafraîchissement incrémente `generation` :
+    seul le dernier token émis est accepté. Présenter un token déjà utilisé
+    révoque la famille (`revoked_at`). La ligne est supprimée après
+    `expires_at` (expiration du dernier token émis).
+    """
+    __tablename__ = "refresh_token_family"
+    __table_args__ = (
+        # Synchronisation incrémentale des révocations entre workers
+        Index("ix_refresh_token_family_revoked_at", "revoked_at"),
+        # Purge des familles expirées
+        Index("ix_refresh_token_family_expires_at", "expires_at"),
+    )
+
+    id: str = Field(primary_key=True, max_length=32)
+    id_user: int = Field(foreign_key="users.id", index=True, nullable=False)
+    generation: int = Field(default=0, nullable=False)
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    expires_at: datetime = Field(nullable=False)
+    revoked_at: Optional[datetime] = Field(default=None)
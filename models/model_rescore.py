@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class RescoreCheckpoint(SQLModel, table=True):
+    """
+    Avancement d'un recalcul des scores (voir core_rescore).
+
+    `last_id` est mis à jour dans la même transaction que chaque paquet de
+    trajets recalculés : un recalcul interrompu reprend au paquet suivant.
+    """
+    __tablename__ = "rescore_checkpoint"
+
+    job: str = Field(primary_key=True, max_length=50)
+    last_id: int = Field(default=0, nullable=False)
+    scanned_rows: int = Field(default=0, nullable=False)
+    updated_rows: int = Field(default=0, nullable=False)
+    started_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    finished_at: Optional[datetime] = Field(default=None)
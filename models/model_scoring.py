@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import Column, JSON
+from sqlmodel import SQLModel, Field
+from models.model_transport_type import TransportType
+
+
+class DistanceTier(SQLModel):
+    """
+    Palier de bonus distance.
+
+    Le bonus `bonus_per_km` s'applique aux kilomètres compris entre la fin du
+    palier précédent (0 pour le premier) et `up_to_km`. Le dernier palier peut
+    laisser `up_to_km` à None (sans limite).
+    """
+    up_to_km: Optional[float] = Field(default=None, gt=0)
+    bonus_per_km: float
+
+
+class TimeMultiplier(SQLModel):
+    """Multiplicateur appliqué au score des trajets partis entre start_hour et end_hour (exclu)."""
+    start_hour: int = Field(ge=0, le=23)
+    end_hour: int = Field(ge=1, le=24)
+    multiplier: float = Field(ge=0)
+
+
+class ScoringRules(SQLModel):
+    """
+    Règles de calcul du score d'un trajet.
+
+    - Base : score par mode de transport
+    - Bonus distance : `distance_bonus_per_km` par km, ou par paliers si
+      `distance_tiers` est renseigné
+    - Bonus écologique : `eco_bonus` pour les modes de `eco_modes`
+    - Multiplicateurs horaires : appliqués au total selon l'heure de départ
+    """
+    base_scores: Dict[TransportType, int]
+    distance_bonus_per_km: float = 0
+    distance_tiers: List[DistanceTier] = []
+    eco_bonus: int = 0
+    eco_modes: List[TransportType] = []
+    time_multipliers: List[TimeMultiplier] = []
+
+
+class ScoringRuleSet(SQLModel, table=True):
+    """
+    Version publiée des règles de score.
+
+    Les versions ne sont jamais modifiées : la version active est la plus
+    récente. Chaque trajet enregistre la version qui l'a noté
+    (`Journey.score_version`).
+    """
+    __tablename__ = "scoring_rule_set"
+
+    version: Optional[int] = Field(default=None, primary_key=True)
+    rules: dict = Field(sa_column=Column(JSON, nullable=False))
+    comment: Optional[str] = Field(default=None, max_length=200)
+    created_by: Optional[int] = Field(default=None, description="ID de l'admin auteur")
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
+class ScoringRuleSetCreate(SQLModel):
+    """Schéma de publication d'une nouvelle version des règles."""
+    rules: ScoringRules
+    comment: Optional[str] = None
+
+
+class ScoringRuleSetRead(SQLModel):
+    """Schéma de lecture d'une version des règles."""
+    version: int
+    rules: ScoringRules
+    comment: Optional[str]
+    created_by: Optional[int]
+    created_at: datetime
@@ -1,15 +1,18 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from datetime import datetime
-from passlib.context import CryptContext
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 from models.model_role import UserRole
 from models.model_company import Company
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
 
 class Users(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # Liste admin filtree par entreprise, paginee par id
+        Index("ix_users_company_id", "id_company", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(index=True, unique=True, max_length=50, nullable=False)
@@ -21,12 +24,6 @@ class Users(SQLModel, table=True):
     company: Optional[Company] = Relationship(back_populates="users")
     # trajets: List["Trajet"] = Relationship(back_populates="user")
 
-    def set_password(self, password: str):
-        self.password = pwd_context.hash(password)
-
-    def verify_password(self, password: str) -> bool:
-        return pwd_context.verify(password, self.password)
-
 
 class UserCreate(SQLModel):
     username: str
@@ -43,3 +40,56 @@ class UserRead(SQLModel):
     date_creation: datetime
     id_company: Optional[int] = None
 
+
+class UserPage(SQLModel):
+    """
+    Page d'utilisateurs (liste admin).
+
+    `next_cursor` est a renvoyer tel quel pour la page suivante (None sur la
+    derniere page). `total_estimate` estime le nombre d'utilisateurs
+    correspondant aux filtres (estimation PostgreSQL, pas un COUNT exact).
+    """
+    items: List[UserRead]
+    next_cursor: Optional[str] = None
+    total_estimate: int
+
+
+class UserRoleUpdate(SQLModel):
+    role: UserRole
+
+
+class UserImportStatus(str, Enum):
+    """
+    Resultat d'une ligne d'import d'employes.
+
+    - created: utilisateur cree
+    - conflict: username ou email deja utilise en base
+    - invalid: ligne refusee (voir `error`)
+    """
+    created = "created"
+    conflict = "conflict"
+    invalid = "invalid"
+
+
+class UserImportRowResult(SQLModel):
+    """
+    Resultat d'une ligne d'import (`line` : numero de ligne dans le fichier).
+
+    `invite_token` est renseigne pour une ligne sans mot de passe : il sert de
+    mot de passe initial et n'est retourne qu'une fois.
+    """
+    line: int
+    username: Optional[str] = None
+    email: Optional[str] = None
+    status: UserImportStatus
+    id: Optional[int] = None
+    invite_token: Optional[str] = None
+    error: Optional[str] = None
+
+
+class UserImportResult(SQLModel):
+    """Rapport d'import d'employes : totaux et resultat par ligne."""
+    created: int
+    conflicts: int
+    failed: int
+    results: List[UserImportRowResult]
@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from models.model_transport_type import TransportType
+
+
+class UserStatistics(SQLModel, table=True):
+    """
+    Statistiques matérialisées d'un utilisateur, par mode de transport.
+
+    Une ligne par couple (utilisateur, mode de transport) : les totaux d'un
+    utilisateur sont la somme de ses lignes (au plus une par TransportType).
+    Les compteurs ne portent que sur les trajets validés et sont mis à jour
+    après chaque écriture de trajet (voir core_statistics).
+    """
+    __tablename__ = "user_statistics"
+
+    id_user: int = Field(foreign_key="users.id", primary_key=True)
+    transport_type: TransportType = Field(primary_key=True)
+
+    total_journeys: int = Field(default=0, nullable=False)
+    total_distance_km: float = Field(default=0.0, nullable=False)
+    total_score: int = Field(default=0, nullable=False)